@@ -17,16 +17,71 @@ from genemon.world.npc import NPCRegistry
 from genemon.data.npc_loader import NPCLoader
 
 
+def build_late_game_state(save_manager: SaveManager) -> GameState:
+    """
+    Build a realistic late-game state for save benchmarks.
+
+    Full team, 120 stored creatures, 40 trainer teams, 8 badges and a
+    complete pokedex.
+
+    Args:
+        save_manager: SaveManager used to create the base game
+
+    Returns:
+        GameState
+    """
+    import contextlib
+    import io
+    from genemon.core.creature import Badge, Creature
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = save_manager.create_new_game("late_game", "Benchmark", starter_choice=0)
+
+    rng = random.Random(state.seed)
+    species_ids = sorted(state.species_dict)
+
+    def random_creature(min_level: int, max_level: int) -> Creature:
+        species = state.species_dict[rng.choice(species_ids)]
+        return Creature(species=species, level=rng.randint(min_level, max_level), current_hp=0)
+
+    while len(state.player_team.creatures) < 6:
+        state.player_team.add_creature(random_creature(55, 70))
+    state.storage = [random_creature(5, 60) for _ in range(120)]
+
+    for i in range(40):
+        team = Team()
+        for _ in range(rng.randint(2, 6)):
+            team.add_creature(random_creature(10, 65))
+        state.trainer_teams[f"trainer_{i}"] = team
+        state.defeated_trainers.append(f"trainer_{i}")
+
+    state.badges = [
+        Badge(f"badge_{i}", f"Badge {i}", "Flame", f"Leader {i}", "A shiny badge.")
+        for i in range(8)
+    ]
+    state.flags = {f"event_{i}": True for i in range(60)}
+    state.pokedex_seen = set(species_ids)
+    state.pokedex_caught = set(species_ids[:120])
+    state.play_time = 40 * 3600
+    state.money = 98765
+    return state
+
+
 class BenchmarkSuite:
     """
     Comprehensive performance benchmark suite.
 
     Benchmarks:
     - Creature generation (1, 10, 151 creatures)
-    - Sprite generation (front, back, mini)
+    - Sprite pipeline matrix (archetypes x views, shiny, hex, ASCII, downsampling, PNG scales)
     - Battle system (single turn, full battle)
     - Damage calculation
     - Save/load system
+    - Sprite serialization (legacy hex arrays vs compact encoding)
+    - Save codecs (size, encode and decode time for a late-game save)
+    - Journaled autosaves (bytes written and latency vs full rewrites)
+    - Save listing (manifest vs decoding every save)
+    - SQLite backend with a huge storage box (load, save, indexed queries)
     - NPC data loading
     """
 
@@ -53,6 +108,12 @@ class BenchmarkSuite:
         self.benchmark_battle_system(verbose)
         self.benchmark_damage_calculation(verbose)
         self.benchmark_save_load(verbose)
+        self.benchmark_sprite_serialization(verbose)
+        self.benchmark_save_codecs(verbose)
+        self.benchmark_json_backend(verbose)
+        self.benchmark_save_journal(verbose)
+        self.benchmark_save_listing(verbose)
+        self.benchmark_save_sqlite(verbose)
         self.benchmark_npc_loading(verbose)
 
         # Print results
@@ -88,40 +149,134 @@ class BenchmarkSuite:
         if verbose:
             print("  ✓ Creature generation benchmarks complete")
 
+    def _measure_operation(self, name: str, operation, iterations: int, **metadata):
+        """
+        Time an operation and record throughput and allocation metadata.
+
+        The operation is timed without tracing, then run once more under
+        tracemalloc to record the peak traced memory and the number of
+        memory blocks still allocated afterwards.
+
+        Args:
+            name: Benchmark name
+            operation: Zero-argument callable
+            iterations: Number of timed calls
+            **metadata: Extra metadata for the result
+        """
+        import time
+        import tracemalloc
+
+        operation()  # Warm up caches and imports
+
+        with self.profiler.measure(name):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                operation()
+            elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            operation()
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+
+        metadata.update({
+            "iterations": iterations,
+            "ops_per_second": iterations / elapsed if elapsed > 0 else 0.0,
+            "peak_kb": peak / 1024,
+            "retained_blocks": retained_blocks
+        })
+        self.profiler.add_metadata(name, metadata)
+
     def benchmark_sprite_generation(self, verbose: bool = True):
-        """Benchmark sprite generation performance."""
+        """
+        Benchmark the sprite pipeline as a matrix of operations.
+
+        Covers rasterizing each view for every archetype, normal vs shiny
+        sprite sets, hex conversion, ASCII rendering, downsampling and PNG
+        encoding at several scales. Each result records ops_per_second,
+        peak_kb and retained_blocks metadata.
+        """
         if verbose:
             print("Benchmarking sprite generation...")
 
-        sprite_gen = SpriteGenerator()
-
-        # Front sprite (56x56)
-        with self.profiler.measure("sprite_gen_front"):
-            for _ in range(20):
-                sprite_gen.generate_front_sprite(
-                    archetype="quadruped",
-                    primary_color=(200, 100, 50),
-                    secondary_color=(100, 50, 200)
+        from genemon.creatures.generator import ARCHETYPES
+        from genemon.sprites.indexed import IndexedSprite
+        from genemon.sprites.png import encode_indexed_png
+
+        sprite_gen = SpriteGenerator(12345)
+        types = ["Flame", "Beast"]
+        palette = sprite_gen._get_palette(types)
+
+        # Rasterizer: every view for every archetype
+        views = (
+            ("front", sprite_gen._generate_front_sprite),
+            ("back", sprite_gen._generate_back_sprite),
+            ("mini", sprite_gen._generate_mini_sprite),
+        )
+        for archetype in ARCHETYPES:
+            for view, rasterize in views:
+                self._measure_operation(
+                    f"sprite_raster_{view}_{archetype}",
+                    lambda rasterize=rasterize, archetype=archetype: rasterize(palette, archetype),
+                    iterations=5, archetype=archetype, view=view
                 )
 
-        # Back sprite (56x56)
-        with self.profiler.measure("sprite_gen_back"):
-            for _ in range(20):
-                sprite_gen.generate_back_sprite(
-                    archetype="quadruped",
-                    primary_color=(200, 100, 50),
-                    secondary_color=(100, 50, 200)
-                )
+        # Full sprite sets: uncached normal vs shiny derived by palette swap
+        def normal_set():
+            sprite_gen._indexed_cache.clear()
+            return sprite_gen.generate_indexed_sprites(1, types, "quadruped")
+
+        self._measure_operation("sprite_set_normal", normal_set, iterations=10)
+        self._measure_operation(
+            "sprite_set_shiny",
+            lambda: sprite_gen.generate_shiny_indexed_sprites(1, types, "quadruped"),
+            iterations=200
+        )
+
+        # Hex conversion
+        indexed = sprite_gen.generate_indexed_sprites(1, types, "quadruped")['front']
+        hex_sprite = indexed.to_hex_array()
+        self._measure_operation("sprite_to_hex", indexed.to_hex_array, iterations=100)
+        self._measure_operation(
+            "sprite_from_hex", lambda: IndexedSprite.from_hex_array(hex_sprite), iterations=100
+        )
+
+        # ASCII rendering and downsampling
+        for scale in (1, 0.5, 0.25):
+            self._measure_operation(
+                f"sprite_ascii_x{scale}",
+                lambda scale=scale: sprite_gen.sprite_to_ascii(hex_sprite, scale),
+                iterations=50, scale=scale
+            )
+        for scale in (0.5, 0.25):
+            self._measure_operation(
+                f"sprite_downsample_x{scale}",
+                lambda scale=scale: sprite_gen._downsample_sprite(hex_sprite, scale),
+                iterations=100, scale=scale
+            )
 
-        # Mini sprite (16x16)
-        with self.profiler.measure("sprite_gen_mini"):
-            for _ in range(20):
-                sprite_gen.generate_mini_sprite(
-                    archetype="quadruped",
-                    primary_color=(200, 100, 50)
-                )
+        # PNG encoding
+        for scale in (1, 2, 4, 8):
+            self._measure_operation(
+                f"sprite_png_x{scale}",
+                lambda scale=scale: encode_indexed_png(indexed, scale),
+                iterations=20, scale=scale
+            )
 
         if verbose:
+            print(f"  {'operation':<34}{'ops/s':>12}{'peak KB':>10}{'blocks':>8}")
+            for name in ["sprite_raster_front_quadruped", "sprite_raster_mini_quadruped",
+                         "sprite_set_normal", "sprite_set_shiny", "sprite_to_hex",
+                         "sprite_from_hex", "sprite_ascii_x1", "sprite_ascii_x0.5",
+                         "sprite_downsample_x0.5", "sprite_png_x1", "sprite_png_x4"]:
+                meta = self.profiler.get_result(name).metadata
+                print(f"  {name:<34}{meta['ops_per_second']:>12,.0f}"
+                      f"{meta['peak_kb']:>10.1f}{meta['retained_blocks']:>8}")
             print("  ✓ Sprite generation benchmarks complete")
 
     def benchmark_battle_system(self, verbose: bool = True):
@@ -242,6 +397,226 @@ class BenchmarkSuite:
         if verbose:
             print("  ✓ Save/load benchmarks complete")
 
+    def benchmark_sprite_serialization(self, verbose: bool = True):
+        """Benchmark species save size and load time, legacy vs compact sprites."""
+        if verbose:
+            print("Benchmarking sprite serialization...")
+
+        import json
+        import tempfile
+        from genemon.core.creature import CreatureSpecies
+
+        generator = CreatureGenerator(12345)
+        sprite_gen = SpriteGenerator(12345)
+        save_manager = SaveManager(tempfile.mkdtemp())
+        all_species = generator.generate_all_creatures()
+        for species in all_species:
+            species.sprite_data = sprite_gen.generate_creature_sprites(
+                species.id, species.types, save_manager._determine_archetype(species)
+            )
+
+        compact = {str(s.id): s.to_dict() for s in all_species}
+        # Legacy format: sprites as nested arrays of hex strings
+        legacy = {
+            key: dict(data, sprite_data=species.sprite_data)
+            for (key, data), species in zip(compact.items(), all_species)
+        }
+
+        for label, species_data in (("legacy", legacy), ("compact", compact)):
+            text = json.dumps({'species': species_data}, indent=2)
+            name = f"sprite_serialization_{label}_load"
+            with self.profiler.measure(name):
+                loaded = json.loads(text)
+                for data in loaded['species'].values():
+                    CreatureSpecies.from_dict(data)
+            self.profiler.add_metadata(name, {"save_bytes": len(text)})
+
+        if verbose:
+            legacy_result = self.profiler.get_result("sprite_serialization_legacy_load")
+            compact_result = self.profiler.get_result("sprite_serialization_compact_load")
+            print(f"  Save size: {legacy_result.metadata['save_bytes']:,} -> "
+                  f"{compact_result.metadata['save_bytes']:,} bytes")
+            print(f"  Load time: {legacy_result.duration * 1000:.1f}ms -> "
+                  f"{compact_result.duration * 1000:.1f}ms")
+            print("  ✓ Sprite serialization benchmarks complete")
+
+    def benchmark_save_codecs(self, verbose: bool = True):
+        """Benchmark save codecs on a realistic late-game save."""
+        if verbose:
+            print("Benchmarking save codecs...")
+
+        import tempfile
+        from genemon.core.save_codecs import SAVE_CODECS, load_save_data
+
+        save_manager = SaveManager(tempfile.mkdtemp())
+        state = build_late_game_state(save_manager)
+        data = state.to_dict()
+        save_manager._externalize_sprites(data)
+
+        for name, codec in SAVE_CODECS.items():
+            with self.profiler.measure(f"save_codec_{name}_encode"):
+                for _ in range(5):
+                    raw = codec.encode(data)
+            with self.profiler.measure(f"save_codec_{name}_decode"):
+                for _ in range(5):
+                    load_save_data(raw)
+            self.profiler.add_metadata(f"save_codec_{name}_encode", {"save_bytes": len(raw)})
+
+        if verbose:
+            print(f"  {'codec':<10}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}")
+            for name in SAVE_CODECS:
+                encode = self.profiler.get_result(f"save_codec_{name}_encode")
+                decode = self.profiler.get_result(f"save_codec_{name}_decode")
+                print(f"  {name:<10}{encode.metadata['save_bytes']:>12,}"
+                      f"{encode.duration * 200:>12.2f}{decode.duration * 200:>12.2f}")
+            print("  ✓ Save codec benchmarks complete")
+
+    def benchmark_json_backend(self, verbose: bool = True):
+        """Benchmark JSON save encoding/decoding, stdlib json vs the active backend."""
+        if verbose:
+            print("Benchmarking JSON backend...")
+
+        import json
+        import tempfile
+        from genemon.core import json_io
+
+        save_manager = SaveManager(tempfile.mkdtemp())
+        state = build_late_game_state(save_manager)
+        data = state.to_dict()
+        save_manager._externalize_sprites(data)
+
+        with self.profiler.measure("json_stdlib_encode"):
+            for _ in range(5):
+                raw = json.dumps(data, indent=2).encode('utf-8')
+        with self.profiler.measure("json_stdlib_decode"):
+            for _ in range(5):
+                json.loads(raw)
+        with self.profiler.measure("json_backend_encode"):
+            for _ in range(5):
+                raw = json_io.dumpb(data, pretty=True)
+        with self.profiler.measure("json_backend_decode"):
+            for _ in range(5):
+                json_io.loads(raw)
+        self.profiler.add_metadata("json_backend_encode", {"backend": json_io.JSON_BACKEND})
+
+        if verbose:
+            print(f"  {'backend':<10}{'encode ms':>12}{'decode ms':>12}")
+            for label, key in (("json", "stdlib"), (json_io.JSON_BACKEND, "backend")):
+                encode = self.profiler.get_result(f"json_{key}_encode")
+                decode = self.profiler.get_result(f"json_{key}_decode")
+                print(f"  {label:<10}{encode.duration * 200:>12.2f}{decode.duration * 200:>12.2f}")
+            print("  ✓ JSON backend benchmarks complete")
+
+    def benchmark_save_journal(self, verbose: bool = True):
+        """Benchmark autosaves of small changes, full rewrite vs journal."""
+        if verbose:
+            print("Benchmarking journaled autosaves...")
+
+        import contextlib
+        import io
+        import os
+        import tempfile
+
+        for label, journal in (("full", False), ("journal", True)):
+            save_dir = tempfile.mkdtemp()
+            save_manager = SaveManager(save_dir, journal=journal)
+            state = build_late_game_state(save_manager)
+            # Bytes written per save: journal growth, or the whole rewritten file
+            path = os.path.join(save_dir, "late_game.journal" if journal else "late_game.json")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                save_manager.save_game(state)
+                written = 0
+                name = f"autosave_{label}"
+                with self.profiler.measure(name):
+                    for step in range(20):
+                        before = os.path.getsize(path) if journal else 0
+                        state.player_x = step
+                        state.items["potion"] = step
+                        save_manager.save_game(state)
+                        written += os.path.getsize(path) - before
+            self.profiler.add_metadata(name, {"bytes_per_save": written // 20})
+
+        if verbose:
+            for label in ("full", "journal"):
+                result = self.profiler.get_result(f"autosave_{label}")
+                print(f"  {label:<8} {result.metadata['bytes_per_save']:>10,} bytes/save "
+                      f"{result.duration * 50:>8.1f} ms/save")
+            print("  ✓ Journaled autosave benchmarks complete")
+
+    def benchmark_save_listing(self, verbose: bool = True, save_count: int = 30):
+        """Benchmark listing save summaries, decoding every save vs the manifest."""
+        if verbose:
+            print("Benchmarking save listing...")
+
+        import contextlib
+        import io
+        import tempfile
+
+        save_dir = tempfile.mkdtemp()
+        save_manager = SaveManager(save_dir, codec="zlib")
+        state = build_late_game_state(save_manager)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(save_count):
+                state.save_name = f"save_{i:03d}"
+                save_manager.save_game(state)
+
+        # Without a manifest every save is decoded and summarized
+        with self.profiler.measure("save_listing_rebuild"):
+            SaveManager(save_dir).rebuild_manifest()
+
+        # A fresh manager (e.g. at game start) reads only the manifest
+        with self.profiler.measure("save_listing_manifest"):
+            for _ in range(10):
+                SaveManager(save_dir).list_save_info()
+
+        if verbose:
+            rebuild = self.profiler.get_result("save_listing_rebuild").duration * 1000
+            manifest = self.profiler.get_result("save_listing_manifest").duration * 100
+            print(f"  {save_count} saves: decode all {rebuild:.1f} ms, manifest {manifest:.2f} ms")
+            print("  ✓ Save listing benchmarks complete")
+
+    def benchmark_save_sqlite(self, verbose: bool = True, storage_count: int = 50000):
+        """Benchmark the sqlite backend with a very large storage box."""
+        if verbose:
+            print(f"Benchmarking sqlite saves ({storage_count:,} stored creatures)...")
+
+        import contextlib
+        import io
+        import tempfile
+
+        save_dir = tempfile.mkdtemp()
+        save_manager = SaveManager(save_dir, backend="sqlite")
+        state = build_late_game_state(save_manager)
+        rng = random.Random(state.seed)
+        records = [c.to_dict() for c in state.storage]
+        state.storage = [dict(rng.choice(records), level=rng.randint(1, 100))
+                         for _ in range(storage_count)]
+        # Records are written as-is, like untouched storage from a loaded save
+        from genemon.core.storage import LazyCreatureList
+        state.storage = LazyCreatureList(state.storage, state.species_dict)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.profiler.measure("sqlite_first_save"):
+                save_manager.save_game(state)
+            with self.profiler.measure("sqlite_load"):
+                loaded = SaveManager(save_dir, backend="sqlite").load_game("late_game")
+            loaded.storage[5].level = 50
+            loaded.storage.pop(0)
+            loaded.items["potion"] = 1
+            with self.profiler.measure("sqlite_save_after_changes"):
+                save_manager.save_game(loaded)
+        with self.profiler.measure("sqlite_query_storage"):
+            matches = save_manager.query_storage("late_game", min_level=95, shiny=False)
+        save_manager.close()
+
+        if verbose:
+            for name in ("sqlite_first_save", "sqlite_load", "sqlite_save_after_changes",
+                         "sqlite_query_storage"):
+                print(f"  {name:<26} {self.profiler.get_result(name).duration * 1000:>8.1f} ms")
+            print(f"  query matched {len(matches):,} creatures")
+            print("  ✓ SQLite save benchmarks complete")
+
     def benchmark_npc_loading(self, verbose: bool = True):
         """Benchmark NPC data loading performance."""
         if verbose:
@@ -0,0 +1,81 @@
+"""
+Autosave scheduling.
+
+GameState tracks which sections changed since the last save. The scheduler
+is ticked after every player action; it skips saving while nothing is dirty
+and writes at most once per interval, so a burst of changes (a battle,
+shopping, walking around) collapses into a single background save.
+"""
+
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from .save_system import GameState, SaveManager
+
+
+DEFAULT_AUTOSAVE_INTERVAL = 30.0
+
+
+class AutosaveScheduler:
+    """Rate-limited autosaves of dirty game states."""
+
+    def __init__(self, save_manager: SaveManager,
+                 interval: float = DEFAULT_AUTOSAVE_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the scheduler.
+
+        Args:
+            save_manager: SaveManager used for background saves
+            interval: Minimum seconds between autosaves
+            clock: Monotonic time source (replaceable in tests)
+        """
+        self.save_manager = save_manager
+        self.interval = interval
+        self.clock = clock
+        self._last_save = clock()
+
+        # Statistics
+        self.saves = 0
+        self.skipped_clean = 0
+        self.deferred = 0
+
+    def tick(self, state: GameState) -> Optional[Future]:
+        """
+        Autosave the state if it changed and the interval has passed.
+
+        Args:
+            state: Current game state
+
+        Returns:
+            Future of the background save, or None if no save was started
+        """
+        if not state.is_dirty:
+            self.skipped_clean += 1
+            return None
+        if self.clock() - self._last_save < self.interval:
+            self.deferred += 1  # Saved together with later changes
+            return None
+        return self._save(state)
+
+    def flush(self, state: GameState) -> Optional[Future]:
+        """
+        Autosave the state now if it has unsaved changes.
+
+        Args:
+            state: Current game state
+
+        Returns:
+            Future of the background save, or None if nothing changed
+        """
+        if not state.is_dirty:
+            self.skipped_clean += 1
+            return None
+        return self._save(state)
+
+    def _save(self, state: GameState) -> Future:
+        """Start a background save and restart the interval."""
+        self._last_save = self.clock()
+        self.saves += 1
+        return self.save_manager.save_game_async(state)
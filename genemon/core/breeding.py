@@ -211,14 +211,14 @@ class Egg:
     @classmethod
     def from_dict(cls, data: dict, species: CreatureSpecies) -> 'Egg':
         """Create egg from dictionary."""
-        inherited_moves = [Move.from_dict(m) for m in data.get('inherited_moves', [])]
+        inherited_moves = [Move.from_dict(m) for m in data['inherited_moves']]
 
         egg = cls(
             species=species,
-            is_shiny=data.get('is_shiny', False),
+            is_shiny=data['is_shiny'],
             inherited_moves=inherited_moves
         )
 
-        egg.steps_to_hatch = data.get('steps_to_hatch', 1000)
+        egg.steps_to_hatch = data['steps_to_hatch']
 
         return egg
@@ -5,6 +5,7 @@ Configuration system for game settings.
 import json
 import os
 from typing import Optional
+from . import json_io
 from ..ui.colors import ColorSupport
 
 
@@ -17,6 +18,7 @@ class GameConfig:
     DEFAULT_CONFIG = {
         "colors_enabled": True,
         "auto_save": True,
+        "auto_save_interval": 30,  # Minimum seconds between autosaves
         "battle_animations": True,
         "show_type_effectiveness": True,
         "confirm_run": True,
@@ -47,7 +49,7 @@ class GameConfig:
 
         try:
             with open(self.config_path, 'r') as f:
-                loaded_settings = json.load(f)
+                loaded_settings = json_io.load(f)
                 # Merge with defaults to handle new settings
                 self.settings.update(loaded_settings)
 
@@ -71,7 +73,7 @@ class GameConfig:
         """
         try:
             with open(self.config_path, 'w') as f:
-                json.dump(self.settings, f, indent=2)
+                json_io.dump(self.settings, f, pretty=True)
             return True
         except IOError as e:
             print(f"Warning: Could not save config: {e}")
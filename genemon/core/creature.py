@@ -2,10 +2,12 @@
 Creature data model and related classes.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace, InitVar
+from operator import attrgetter
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 import json
+from ..sprites.codec import encode_sprite_set, decode_sprite_set, is_encoded_sprite_set
 
 
 class StatusEffect(Enum):
@@ -96,33 +98,23 @@ class Move:
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Move':
-        """Create move from dictionary."""
-        status_effect_val = data.get('status_effect')
-        if status_effect_val:
-            data['status_effect'] = StatusEffect(status_effect_val)
-        # Default values for backward compatibility
-        if 'crit_rate' not in data:
-            data['crit_rate'] = 0
-        if 'multi_hit' not in data:
-            data['multi_hit'] = [1, 1]
-        if 'recoil_percent' not in data:
-            data['recoil_percent'] = 0
-        if 'priority' not in data:
-            data['priority'] = 0
-        if 'stat_changes' not in data:
-            data['stat_changes'] = None
-        if 'stat_change_target' not in data:
-            data['stat_change_target'] = "self"
-        if 'stat_change_chance' not in data:
-            data['stat_change_chance'] = 100
-        if 'is_contact' not in data:
-            data['is_contact'] = True  # Default to contact for backward compatibility
-        # Convert list back to tuple for multi_hit
-        if isinstance(data.get('multi_hit'), list):
-            data['multi_hit'] = tuple(data['multi_hit'])
+        """Create move from a current-schema dictionary (see save_migrations)."""
+        data = dict(data)  # Leave the caller's (possibly shared) record untouched
+        if data['status_effect']:
+            data['status_effect'] = StatusEffect(data['status_effect'])
+        data['multi_hit'] = tuple(data['multi_hit'])
         return cls(**data)
 
 
+# Every Move field except the current PP
+_move_identity = attrgetter(*(f.name for f in fields(Move) if f.name != 'pp'))
+
+
+def _same_move(move: Move, base: Move) -> bool:
+    """Check whether a move is an unmodified copy of base (PP aside)."""
+    return move.name == base.name and _move_identity(move) == _move_identity(base)
+
+
 @dataclass
 class Ability:
     """Represents a creature's passive ability."""
@@ -229,7 +221,8 @@ class CreatureSpecies:
             'flavor_text': self.flavor_text,
             'evolution_level': self.evolution_level,
             'evolves_into': self.evolves_into,
-            'sprite_data': self.sprite_data,
+            # Sprites are stored as a compact indexed+zlib base64 string
+            'sprite_data': encode_sprite_set(self.sprite_data) if self.sprite_data else None,
             'is_legendary': self.is_legendary
         }
         # Add learnset if present
@@ -248,6 +241,9 @@ class CreatureSpecies:
         """Create species from dictionary."""
         data['base_stats'] = CreatureStats.from_dict(data['base_stats'])
         data['moves'] = [Move.from_dict(m) for m in data['moves']]
+        # Decode compact sprites; legacy hex arrays are used as-is
+        if is_encoded_sprite_set(data.get('sprite_data')):
+            data['sprite_data'] = decode_sprite_set(data['sprite_data'])
         # Deserialize learnset if present
         if 'learnset' in data and data['learnset']:
             data['learnset'] = {int(level): Move.from_dict(move) for level, move in data['learnset'].items()}
@@ -317,8 +313,13 @@ class Creature:
     special: int = field(init=False)
     speed: int = field(init=False)
 
-    def __post_init__(self):
+    # Moves to use instead of copies of the species' moves (e.g. when loading)
+    initial_moves: InitVar[Optional[List[Move]]] = None
+
+    def __post_init__(self, initial_moves: Optional[List[Move]] = None):
         """Calculate initial stats based on level and base stats."""
+        if initial_moves is not None:
+            self.moves = initial_moves
         # Copy moves from species if not already set
         if not self.moves:
             import copy
@@ -532,8 +533,19 @@ class Creature:
 
         return True, ""
 
-    def to_dict(self) -> dict:
-        """Convert creature to dictionary for serialization."""
+    def to_dict(self, species_dict: Optional[Dict[int, CreatureSpecies]] = None) -> dict:
+        """
+        Convert creature to dictionary for serialization.
+
+        Args:
+            species_dict: Species the record will be loaded with (a save's
+                species). Moves are saved as references only if this
+                creature's species is the one in species_dict, so creatures
+                traded in from another seed keep their moves; by default
+                references are against the creature's own species (e.g.
+                trade packages, which carry it)
+        """
+        refs = species_dict is None or species_dict.get(self.species.id) is self.species
         result = {
             'species_id': self.species.id,
             'level': self.level,
@@ -541,7 +553,7 @@ class Creature:
             'max_hp': self.max_hp,
             'exp': self.exp,
             'nickname': self.nickname,
-            'moves': [m.to_dict() for m in self.moves],
+            'moves': [self._move_record(m) if refs else m.to_dict() for m in self.moves],
             'status': self.status.value,
             'status_turns': self.status_turns,
             'is_shiny': self.is_shiny
@@ -551,29 +563,110 @@ class Creature:
             result['held_item'] = self.held_item.to_dict()
         return result
 
+    def _move_record(self, move: Move) -> dict:
+        """
+        Serialize one of this creature's moves.
+
+        Moves copied from the species' moves, its learnset or a TM are saved
+        as a reference to that move plus its name, type and current PP;
+        other moves (e.g. kept from before evolving) are saved in full.
+
+        Args:
+            move: One of the creature's moves
+
+        Returns:
+            Move reference or full move dictionary
+        """
+        ref = None
+        for index, base in enumerate(self.species.moves):
+            if _same_move(move, base):
+                ref = {'species_move': index}
+                break
+        if ref is None and self.species.learnset:
+            for level, base in self.species.learnset.items():
+                if _same_move(move, base):
+                    ref = {'learnset': level}
+                    break
+        if ref is None:
+            from .items import ITEMS, TM_IDS
+            tm_id = TM_IDS.get(move.name)
+            if tm_id is not None and _same_move(move, ITEMS[tm_id].tm_move):
+                ref = {'tm': tm_id}
+        if ref is None:
+            return move.to_dict()
+        ref.update(name=move.name, type=move.type, pp=move.pp)
+        return ref
+
+    @staticmethod
+    def _move_from_record(record: dict, species: CreatureSpecies) -> Move:
+        """
+        Restore a move saved by _move_record().
+
+        A reference that no longer resolves to a move of its saved name and
+        type (the species changed since saving) is looked up by name and
+        type among the species' moves, its learnset and the TMs instead.
+        References saved without a name and type are trusted.
+
+        Args:
+            record: Move reference or full move dictionary
+            species: Species of the creature the move belongs to
+
+        Returns:
+            Move
+
+        Raises:
+            KeyError: If a reference matches no move of the species or TM
+        """
+        from .items import ITEMS, TM_IDS
+        if 'species_move' in record:
+            index = record['species_move']
+            base = species.moves[index] if 0 <= index < len(species.moves) else None
+        elif 'learnset' in record:
+            base = (species.learnset or {}).get(int(record['learnset']))
+        elif 'tm' in record:
+            item = ITEMS.get(record['tm'])
+            base = item.tm_move if item is not None else None
+        else:
+            return Move.from_dict(record)
+
+        if 'name' not in record:
+            if base is None:
+                raise KeyError(f"Move reference {record} not found")
+            return replace(base, pp=record['pp'])
+        if base is None or base.name != record['name'] or base.type != record['type']:
+            tm_id = TM_IDS.get(record['name'])
+            candidates = list(species.moves) + list((species.learnset or {}).values())
+            if tm_id is not None:
+                candidates.append(ITEMS[tm_id].tm_move)
+            base = next((move for move in candidates
+                         if move.name == record['name'] and move.type == record['type']), None)
+            if base is None:
+                raise KeyError(f"Move '{record['name']}' ({record['type']}) not found "
+                               f"for {species.name}")
+        return replace(base, pp=record['pp'])
+
     @classmethod
     def from_dict(cls, data: dict, species: CreatureSpecies) -> 'Creature':
         """Create creature from dictionary and species reference."""
+        # Restore moves with their PP if saved (skips copying the species' moves)
+        moves = ([cls._move_from_record(m, species) for m in data['moves']]
+                 if data.get('moves') else None)
         creature = cls(
             species=species,
             level=data['level'],
             current_hp=data['current_hp'],
-            exp=data.get('exp', 0),
-            nickname=data.get('nickname'),
-            is_shiny=data.get('is_shiny', False)
+            exp=data['exp'],
+            nickname=data['nickname'],
+            is_shiny=data['is_shiny'],
+            initial_moves=moves
         )
         # Override max_hp from saved data if needed
         if 'max_hp' in data and data['max_hp'] != creature.max_hp:
             creature.max_hp = data['max_hp']
 
-        # Restore moves with their PP if saved
-        if 'moves' in data:
-            creature.moves = [Move.from_dict(m) for m in data['moves']]
-
         # Restore status effect
-        if 'status' in data:
-            creature.status = StatusEffect(data['status'])
-            creature.status_turns = data.get('status_turns', 0)
+        creature.status = StatusEffect(data['status'])
+        creature.status_turns = data['status_turns']
 
         # Restore held item if saved
         if 'held_item' in data and data['held_item']:
@@ -626,17 +719,17 @@ class Team:
             creature.heal()
             creature.restore_pp()
 
-    def to_dict(self) -> dict:
-        """Convert team to dictionary for serialization."""
+    def to_dict(self, species_dict: Optional[Dict[int, CreatureSpecies]] = None) -> dict:
+        """Convert team to dictionary for serialization (see Creature.to_dict())."""
         return {
-            'creatures': [c.to_dict() for c in self.creatures],
+            'creatures': [c.to_dict(species_dict) for c in self.creatures],
             'max_size': self.max_size
         }
 
     @classmethod
     def from_dict(cls, data: dict, species_dict: Dict[int, CreatureSpecies]) -> 'Team':
         """Create team from dictionary and species lookup."""
-        team = cls(max_size=data.get('max_size', 6))
+        team = cls(max_size=data['max_size'])
         for creature_data in data['creatures']:
             species = species_dict[creature_data['species_id']]
             creature = Creature.from_dict(creature_data, species)
@@ -5,6 +5,7 @@ Main game engine and game loop.
 import random
 from typing import Optional
 from .save_system import GameState, SaveManager
+from .autosave import AutosaveScheduler, DEFAULT_AUTOSAVE_INTERVAL
 from .creature import Creature, Team, Badge
 from .trading import TradeManager
 from .shiny import create_creature_with_shiny_check, get_shiny_indicator, get_shiny_text
@@ -25,10 +26,14 @@ class Game:
         """Initialize the game engine."""
         # Initialize configuration first
         from .config import init_config
-        init_config()
+        config = init_config()
 
         self.state: Optional[GameState] = None
         self.save_manager = SaveManager()
+        self.autosave = AutosaveScheduler(
+            self.save_manager,
+            interval=config.get("auto_save_interval", DEFAULT_AUTOSAVE_INTERVAL)
+        )
         self.trade_manager = TradeManager()
         self.world = World()
         self.npc_registry = NPCRegistry()
@@ -65,6 +70,7 @@ class Game:
             self._load_game()
         elif choice == 2:
             self.running = False
+            self.save_manager.close()
             print("\nThanks for playing!")
 
     def _new_game(self):
@@ -107,7 +113,7 @@ class Game:
 
     def _load_game(self):
         """Load an existing game."""
-        saves = self.save_manager.list_saves()
+        saves = self.save_manager.list_save_info()
 
         if not saves:
             print("\nNo save files found!")
@@ -115,13 +121,21 @@ class Game:
             return
 
         print("\nAvailable saves:")
-        for i, save in enumerate(saves, 1):
-            print(f"{i}. {save}")
+        for i, info in enumerate(saves, 1):
+            if 'error' in info:
+                print(f"{i}. {info['save_name']} (unreadable)")
+                continue
+            hours, minutes = divmod(info['play_time'] // 60, 60)
+            print(f"{i}. {info['save_name']} - {info['player_name']}, "
+                  f"{info['current_location']}, {info['badges']} badges, "
+                  f"{hours}:{minutes:02d} played")
 
         choice = self.display.get_menu_choice(len(saves))
-        save_name = saves[choice]
+        save_name = saves[choice]['save_name']
 
         self.state = self.save_manager.load_game(save_name)
+        if not self.state:
+            self.state = self.menu_manager.show_recovery_menu(self.save_manager, save_name)
 
         if self.state:
             print(f"\nWelcome back, {self.state.player_name}!")
@@ -168,8 +182,10 @@ class Game:
                 self._handle_movement(location, npcs)
             elif choice == 1:
                 self.menu_manager.show_team_menu(self.state)
+                self.state.mark_dirty('team')
             elif choice == 2:
                 self.menu_manager.show_items_menu(self.state)
+                self.state.mark_dirty('items', 'team')
             elif choice == 3:
                 self.menu_manager.show_badges(self.state)
             elif choice == 4:
@@ -189,8 +205,13 @@ class Game:
                 print("\nGame saved!")
                 input("Press Enter to continue...")
             elif choice == 11:
+                self._autosave()
+                self.save_manager.flush_saves()
                 self.state = None  # Exit to main menu
 
+            if self.state:
+                self._autosave_tick()
+
     def _handle_movement(self, location: Location, npcs: list):
         """Handle player movement."""
         print("\nMove: [W] Up  [S] Down  [A] Left  [D] Right  [X] Cancel")
@@ -239,11 +260,13 @@ class Game:
             choice = input("> ").strip().lower()
             if choice == 'y':
                 self.menu_manager.show_shop_menu(self.state, npc)
+                self.state.mark_dirty('items')
         elif npc.is_healer:
             print("\nWould you like me to heal your creatures? (y/n)")
             choice = input("> ").strip().lower()
             if choice == 'y':
                 self.state.player_team.heal_all()
+                self.state.mark_dirty('team')
                 print("\nYour creatures are fully healed!")
                 input("Press Enter to continue...")
         elif npc.id == "move_relearner":
@@ -319,12 +342,14 @@ class Game:
             # Generate and store a new team for this trainer
             trainer_team = self._generate_trainer_team(npc)
             self.state.trainer_teams[npc.id] = trainer_team
+            self.state.mark_dirty('trainers')
 
         result = self._battle(trainer_team, is_wild=False)
 
         if result == BattleResult.PLAYER_WIN:
             npc.has_been_defeated = True
             self.state.defeated_trainers.append(npc.id)
+            self.state.mark_dirty('progress')
 
             # Award badge if this is a gym leader
             if npc.is_gym_leader and npc.badge_id:
@@ -350,6 +375,7 @@ class Game:
             description=npc.badge_description
         )
         self.state.badges.append(badge)
+        self.state.mark_dirty('progress')
 
         # Celebratory message
         self.display.clear_screen()
@@ -416,6 +442,7 @@ class Game:
 
             # Mark as seen in pokedex
             self.state.pokedex_seen.add(evolved_species.id)
+            self.state.mark_dirty('team', 'progress')
 
         else:
             print(f"\n{creature.species.name} did not evolve.")
@@ -447,6 +474,7 @@ class Game:
 
             if choice == 0:  # Yes
                 creature.learn_move(learnable_move)
+                self.state.mark_dirty('team')
                 print(f"\n{creature.get_display_name()} learned {learnable_move.name}!")
                 input("Press Enter to continue...")
             else:
@@ -470,6 +498,7 @@ class Game:
                 # Replace the chosen move
                 old_move_name = creature.moves[choice].name
                 creature.learn_move(learnable_move, replace_index=choice)
+                self.state.mark_dirty('team')
                 print(f"\n{creature.get_display_name()} forgot {old_move_name} and learned {learnable_move.name}!")
                 input("Press Enter to continue...")
             else:
@@ -867,6 +896,9 @@ class Game:
         elif battle.result == BattleResult.RAN_AWAY:
             print("\n*** Got away safely! ***")
 
+        # Battles change HP, PP, experience, items, captures and the pokedex
+        self.state.mark_dirty('team', 'storage', 'items', 'progress')
+
         input("\nPress Enter to continue...")
         return battle.result
 
@@ -959,17 +991,15 @@ class Game:
             if not trading_ui.show_trading_menu():
                 break
 
-        # Auto-save after trading
-        self.save_manager.save_game(self.state)
+        # Auto-save after trading (written in the background)
+        self.state.mark_dirty('team', 'storage', 'progress')
+        self._autosave()
         print("\nProgress saved!")
         input("Press Enter to continue...")
 
     def _show_breeding_menu(self):
         """Show the breeding center menu."""
         while True:
-            # Combine team and storage for parent selection
-            available_creatures = list(self.state.player_team.creatures) + self.state.storage
-
             action = self.breeding_ui.show_breeding_menu(
                 self.state.breeding_center,
                 self.state.player_team.creatures,
@@ -979,6 +1009,10 @@ class Game:
             if action is None:
                 break
             elif action == "start_breeding":
+                # Combine team and storage for parent selection
+                # (loads every stored creature, so only when actually breeding)
+                available_creatures = (list(self.state.player_team.creatures)
+                                       + list(self.state.storage))
                 self._handle_start_breeding(available_creatures)
             elif action == "collect_egg":
                 self._handle_collect_egg()
@@ -990,7 +1024,33 @@ class Game:
                 self.breeding_ui.show_eggs(self.state.breeding_center)
 
         # Auto-save after breeding activities
-        self.save_manager.save_game(self.state)
+        self.state.mark_dirty('team', 'storage', 'progress', 'breeding')
+        self._autosave()
+
+    def _autosave(self):
+        """Save unsaved changes now, in the background, if auto-save is on."""
+        from .config import get_config
+        if not get_config().get("auto_save", True):
+            return
+        future = self.autosave.flush(self.state)
+        if future is not None:
+            future.add_done_callback(self._report_autosave_error)
+
+    def _autosave_tick(self):
+        """Autosave after an action if changes are pending and the interval passed."""
+        from .config import get_config
+        if not get_config().get("auto_save", True):
+            return
+        future = self.autosave.tick(self.state)
+        if future is not None:
+            future.add_done_callback(self._report_autosave_error)
+
+    @staticmethod
+    def _report_autosave_error(future):
+        """Print the error of a failed background save."""
+        error = future.exception()
+        if error is not None:
+            print(f"\nError saving game: {error}")
 
     def _handle_start_breeding(self, available_creatures):
         """Handle starting a new breeding pair."""
@@ -477,6 +477,9 @@ def _create_tms() -> Dict[str, Item]:
 # Add TMs to ITEMS
 ITEMS.update(_create_tms())
 
+# TM item ID by move name, used to save taught moves as references
+TM_IDS = {item.tm_move.name: item_id for item_id, item in ITEMS.items() if item.tm_move}
+
 
 def get_item(item_id: str) -> Optional[Item]:
     """Get an item by ID."""
@@ -0,0 +1,134 @@
+"""
+JSON encoding and decoding.
+
+Saves, trades, trade history, config and NPC data are all JSON. This module
+uses orjson when it is installed and the standard library json module
+otherwise. Both backends write the same layout (compact, or indented by two
+spaces) and text that decodes to the same values, so files written by
+either one load with the other. The bytes are the same unless the data
+holds floats: orjson writes exponents without a sign or padding (1e20,
+1e-7 where json writes 1e+20, 1e-07). Anything that hashes encoded JSON
+(see save_codecs.section_checksum()) must allow for either form.
+
+Differences from json:
+    - dumpb() writes non-ASCII text as UTF-8 instead of \\u escapes (dumps()
+      and dump() escape it as json does, so text files stay safe in any
+      locale encoding)
+    - With orjson, integers beyond 64 bits decode as floats, and NaN and
+      infinities encode as null; Genemon never stores such values
+"""
+
+import json
+from typing import IO, Any, Union
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+_COMPACT_SEPARATORS = (',', ':')
+
+if orjson is not None:
+    # Convert int keys like json does; leave types json rejects to json
+    _ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS |
+                       orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Encode list subclasses (e.g. storage.StorageRecords) as lists; reject other types."""
+    if isinstance(obj, list):
+        return list(obj)
+    raise TypeError
+
+
+def _stdlib_dumps(obj: Any, pretty: bool) -> str:
+    """Encode with the json module."""
+    if pretty:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=_COMPACT_SEPARATORS)
+
+
+def dumpb(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Encode a value as UTF-8 JSON.
+
+    Args:
+        obj: Value to encode
+        pretty: Indent by two spaces (otherwise no whitespace at all)
+
+    Returns:
+        Encoded JSON
+
+    Raises:
+        TypeError: If the value is not JSON serializable
+        ValueError: If the value contains a circular reference
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_orjson_default,
+                                option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if pretty else 0))
+        except TypeError:
+            pass  # Values orjson rejects (huge integers, subclasses) go through json
+    return _stdlib_dumps(obj, pretty).encode('utf-8')
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    """
+    Encode a value as ASCII JSON text.
+
+    Args:
+        obj: Value to encode
+        pretty: Indent by two spaces (otherwise no whitespace at all)
+
+    Returns:
+        Encoded JSON
+
+    Raises:
+        TypeError: If the value is not JSON serializable
+        ValueError: If the value contains a circular reference
+    """
+    if orjson is not None:
+        try:
+            raw = orjson.dumps(obj, default=_orjson_default,
+                               option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if pretty else 0))
+        except TypeError:
+            pass
+        else:
+            if raw.isascii():
+                return raw.decode('ascii')
+    return _stdlib_dumps(obj, pretty)
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    Decode JSON.
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        Decoded value
+
+    Raises:
+        json.JSONDecodeError: If the data is not valid JSON
+        UnicodeDecodeError: If bytes are not valid UTF-8
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # Retry with json: it accepts NaN literals, and reports errors
+    return json.loads(data)
+
+
+def dump(obj: Any, f: IO[str], pretty: bool = False) -> None:
+    """Encode a value as ASCII JSON text into a text file."""
+    f.write(dumps(obj, pretty))
+
+
+def load(f: IO) -> Any:
+    """Decode JSON read from a text or binary file."""
+    return loads(f.read())
@@ -0,0 +1,344 @@
+"""
+Rotating save backups.
+
+Every save can keep its last N versions for rollback. Backups are not file
+copies: each save section (see save_codecs.SAVE_SECTIONS) is encoded as
+compact JSON and stored once in a content-addressed chunk store, keyed by
+its SHA-256 digest, and a backup is just the list of digests of its
+sections. Sections that did not change between saves (the species roster,
+trainer teams, most of storage) are shared by every backup, so keeping 20
+backups costs little more than one save.
+
+Layout under the backup directory (save_dir/backups):
+    chunks/<first two hex digits>/<remaining digits>.chunk
+        zlib-compressed section JSON
+    <save_name>.backups
+        JSON index: {'version': 1, 'next_id': int, 'backups': [...]}, each
+        backup with id, saved_at, created_at, size and sections (section
+        name -> list of chunk digests)
+
+Stored creatures are chunked by storage box (after a chunk holding the
+section's other keys, such as the box sizes), so changing a creature stores
+only its box instead of the whole storage.
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Set, Tuple
+
+from . import json_io
+from .exceptions import SaveFileCorruptedError
+from .save_codecs import STORAGE_SECTION, split_sections, split_storage
+from .save_writer import atomic_write, replacement_mode
+
+
+BACKUP_INDEX_VERSION = 1
+BACKUP_INDEX_EXTENSION = ".backups"
+
+
+class ChunkStore:
+    """
+    Stores byte strings as files named by their content digest.
+
+    Layout: <root>/<first two hex digits>/<remaining digits>.chunk, each file
+    holding the zlib-compressed chunk.
+    """
+
+    def __init__(self, root: str, compression_level: int = 6):
+        """
+        Initialize a chunk store.
+
+        Directories are created lazily on the first write.
+
+        Args:
+            root: Store directory
+            compression_level: zlib level for new chunks
+        """
+        self.root = root
+        self.compression_level = compression_level
+
+    def _path(self, digest: str) -> str:
+        """Get the file path for a digest."""
+        return os.path.join(self.root, digest[:2], digest[2:] + ".chunk")
+
+    def has(self, digest: str) -> bool:
+        """Check whether a chunk is stored."""
+        return os.path.exists(self._path(digest))
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a chunk if not already present.
+
+        Args:
+            data: Chunk contents
+
+        Returns:
+            Content digest of the chunk
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            # Write to a temp file and rename so readers never see partial data
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(zlib.compress(data, self.compression_level))
+                os.chmod(tmp_path, replacement_mode(path))
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        Load a chunk by digest.
+
+        Raises:
+            KeyError: If the chunk is not in the store
+            ValueError: If the stored file is corrupt
+        """
+        try:
+            with open(self._path(digest), 'rb') as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            raise KeyError(f"Chunk not found in store: {digest}")
+        except zlib.error as e:
+            raise ValueError(f"Corrupt chunk {digest}: {e}")
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupt chunk {digest}: digest mismatch")
+        return data
+
+    def remove(self, digests: Iterable[str]) -> int:
+        """
+        Delete chunks.
+
+        Returns:
+            Number of chunks deleted
+        """
+        removed = 0
+        for digest in digests:
+            try:
+                os.remove(self._path(digest))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def size(self) -> int:
+        """Total size in bytes of the stored chunk files."""
+        total = 0
+        for directory, _, filenames in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in filenames)
+        return total
+
+
+class SaveBackups:
+    """The last N versions of each save, stored as deduplicated sections."""
+
+    def __init__(self, root: str, keep: int):
+        """
+        Initialize backups.
+
+        Args:
+            root: Backup directory (e.g. "saves/backups")
+            keep: Backups kept per save; older ones are dropped when a new
+                one is added
+
+        Raises:
+            ValueError: If keep is less than 1
+        """
+        if keep < 1:
+            raise ValueError("At least one backup must be kept")
+        self.root = root
+        self.keep = keep
+        self.chunks = ChunkStore(os.path.join(root, "chunks"))
+
+    def _index_path(self, save_name: str) -> str:
+        """Get the index file path of a save."""
+        return os.path.join(self.root, save_name + BACKUP_INDEX_EXTENSION)
+
+    def _read_index(self, save_name: str) -> dict:
+        """Read a save's index, treating a missing or damaged file as empty."""
+        try:
+            with open(self._index_path(save_name), 'rb') as f:
+                index = json_io.load(f)
+        except (OSError, ValueError):
+            index = None
+        if not isinstance(index, dict) or index.get('version') != BACKUP_INDEX_VERSION:
+            return {'version': BACKUP_INDEX_VERSION, 'next_id': 1, 'backups': []}
+        return index
+
+    def _write_index(self, save_name: str, index: dict) -> None:
+        """Write a save's index, or delete it if no backups are left."""
+        if index['backups']:
+            os.makedirs(self.root, exist_ok=True)
+            atomic_write(self._index_path(save_name), json_io.dumpb(index))
+        elif os.path.exists(self._index_path(save_name)):
+            os.remove(self._index_path(save_name))
+
+    def _put_section(self, name: str, part: dict) -> Tuple[List[str], int]:
+        """
+        Store a section's chunks.
+
+        Returns:
+            (chunk digests, total bytes of chunk JSON)
+        """
+        rest, boxes, _ = split_storage(part) if name == STORAGE_SECTION else (part, None, False)
+        if boxes is not None:
+            # Records read from a sqlite save are still JSON text
+            chunks = [json_io.dumpb(rest)] + [
+                json_io.dumpb([json_io.loads(r) if isinstance(r, str) else r for r in box])
+                for box in boxes
+            ]
+        else:
+            chunks = [json_io.dumpb(part)]
+        return [self.chunks.put(chunk) for chunk in chunks], sum(len(chunk) for chunk in chunks)
+
+    def add(self, save_name: str, data: dict) -> int:
+        """
+        Back up a save, dropping the oldest backups beyond keep.
+
+        Args:
+            save_name: Save name
+            data: Save dictionary as written
+
+        Returns:
+            ID of the new backup
+        """
+        sections = {}
+        size = 0
+        for name, part in split_sections(data):
+            sections[name], section_size = self._put_section(name, part)
+            size += section_size
+        index = self._read_index(save_name)
+        backup = {
+            'id': index['next_id'],
+            'saved_at': data.get('saved_at'),
+            'created_at': datetime.now().isoformat(),
+            'size': size,
+            'sections': sections,
+        }
+        index['next_id'] += 1
+        index['backups'].append(backup)
+        dropped = index['backups'][:-self.keep]
+        index['backups'] = index['backups'][-self.keep:]
+        self._write_index(save_name, index)
+        if dropped:
+            self._collect(_chunk_digests(dropped))
+        return backup['id']
+
+    def list(self, save_name: str) -> List[dict]:
+        """
+        List a save's backups, newest first.
+
+        Returns:
+            Dictionaries with id, saved_at, created_at and size (bytes of
+            section JSON the backup restores)
+        """
+        return [{key: backup[key] for key in ('id', 'saved_at', 'created_at', 'size')}
+                for backup in reversed(self._read_index(save_name)['backups'])]
+
+    def restore(self, save_name: str, backup_id: int) -> dict:
+        """
+        Reassemble the save data of a backup.
+
+        Args:
+            save_name: Save name
+            backup_id: ID from list()
+
+        Returns:
+            Save dictionary
+
+        Raises:
+            KeyError: If the backup does not exist
+            SaveFileCorruptedError: If a chunk is missing or damaged
+        """
+        for backup in self._read_index(save_name)['backups']:
+            if backup['id'] == backup_id:
+                break
+        else:
+            raise KeyError(f"No backup {backup_id} of save '{save_name}'")
+
+        data = {}
+        try:
+            for name, digests in backup['sections'].items():
+                parts = [json_io.loads(self.chunks.get(digest)) for digest in digests]
+                if name == 'storage':
+                    data.update(parts[0])
+                    data['storage'] = [record for part in parts[1:] for record in part]
+                else:
+                    for part in parts:
+                        data.update(part)
+        except (KeyError, ValueError) as e:
+            raise SaveFileCorruptedError(f"Backup {backup_id} of save '{save_name}' is damaged: {e}")
+        return data
+
+    def remove(self, save_name: str) -> None:
+        """Delete every backup of a save."""
+        index = self._read_index(save_name)
+        digests = _chunk_digests(index['backups'])
+        index['backups'] = []
+        self._write_index(save_name, index)
+        self._collect(digests)
+
+    def _backed_up_saves(self) -> List[str]:
+        """Names of the saves that have a backup index."""
+        try:
+            filenames = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return [filename[:-len(BACKUP_INDEX_EXTENSION)] for filename in filenames
+                if filename.endswith(BACKUP_INDEX_EXTENSION)]
+
+    def section_parts(self, name: str) -> Iterator[object]:
+        """
+        Decode the chunks of one section across every save's backups.
+
+        Chunks shared by several backups are decoded once; missing or
+        damaged chunks are skipped.
+
+        Args:
+            name: Section name (see save_codecs.SAVE_SECTIONS)
+
+        Yields:
+            Decoded chunks (the section dictionary for unchunked sections)
+        """
+        digests = set()
+        for save_name in self._backed_up_saves():
+            for backup in self._read_index(save_name)['backups']:
+                digests.update(backup['sections'].get(name, ()))
+        for digest in digests:
+            try:
+                yield json_io.loads(self.chunks.get(digest))
+            except (KeyError, ValueError):
+                continue
+
+    def _referenced_chunks(self) -> Set[str]:
+        """Digests referenced by any save's backups."""
+        referenced = set()
+        for save_name in self._backed_up_saves():
+            referenced |= _chunk_digests(self._read_index(save_name)['backups'])
+        return referenced
+
+    def _collect(self, candidates: Set[str]) -> int:
+        """
+        Delete candidate chunks no backup references any more.
+
+        Returns:
+            Number of chunks deleted
+        """
+        if not candidates:
+            return 0
+        return self.chunks.remove(candidates - self._referenced_chunks())
+
+
+def _chunk_digests(backups: List[dict]) -> Set[str]:
+    """Collect the chunk digests of backups."""
+    return {digest for backup in backups
+            for digests in backup['sections'].values() for digest in digests}
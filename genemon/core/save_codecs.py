@@ -0,0 +1,878 @@
+"""
+Save file codecs.
+
+A codec turns the dictionary produced by GameState.to_dict() into bytes and
+back. Every format except plain JSON starts with a magic header, so
+load_save_data() picks the right codec without being told which one wrote
+the file.
+
+Formats:
+    json     Indented JSON (the original format)
+    compact  JSON without whitespace
+    zlib     Compact JSON compressed with zlib, after the b'GSZ1' magic
+    gzip     Compact JSON in a gzip stream (detected by the gzip magic)
+    binary   Sectioned container (b'GSAV' magic) with a struct-packed section
+             table; each section holds part of the save as zlib-compressed
+             compact JSON, except that the team and storage creatures are
+             fixed-layout struct records (see save_records)
+
+Each codec writes its own file extension (.json, .cjson, .savz, .savgz,
+.sav). Saves are still identified by content, so compact, zlib and gzip
+saves written under the .json and .sav extensions of earlier versions load.
+
+Every format records a CRC-32 per section (SAVE_SECTIONS): the binary format
+in its section table, the JSON formats in a 'checksums' member written first.
+verify_save_data() checks them without building game objects, and
+recover_save_data() salvages the intact sections of a damaged save.
+
+Stored creatures are checksummed per storage box, and the binary format
+stores each box as its own section (BOX_SECTION + box number). Checksums and
+binary payloads are cached by box record list (see storage.StorageRecords),
+so saving re-encodes only the boxes that changed.
+
+Binary saves can also be opened with MappedBinarySave, which maps the file
+into memory and decodes sections only when they are asked for.
+"""
+
+import gzip
+import json
+import mmap
+import re
+import struct
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from . import json_io
+from .exceptions import SaveFileCorruptedError
+from .save_records import PACKED_MARKER, decode_packed_section, encode_packed_section
+from .storage import StorageRecords, packed_box_sizes
+from ..sprites.indexed import IdentityCache
+
+
+DEFAULT_SAVE_CODEC = "json"
+
+# Top-level save keys grouped into sections (checksummed separately, and
+# stored separately by the binary format). Keys not listed here belong to
+# the 'progress' section.
+SAVE_SECTIONS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('header', ('version', 'save_name', 'player_name', 'play_time', 'current_location',
+                'player_x', 'player_y', 'seed', 'saved_at', 'roster')),
+    ('species', ('species',)),
+    ('team', ('player_team',)),
+    ('storage', ('storage', 'storage_boxes')),
+    ('trainers', ('trainer_teams', 'defeated_trainers')),
+    ('pokedex', ('pokedex_seen', 'pokedex_caught')),
+    ('progress', ()),
+)
+
+# Key holding the section checksums of single-document (JSON) saves
+CHECKSUMS_KEY = 'checksums'
+
+# Storage boxes: binary section name prefix (followed by the box number),
+# and the key of the per-box checksums in CHECKSUMS_KEY. The storage
+# section itself then covers only its other keys (the box sizes).
+STORAGE_SECTION = 'storage'
+BOX_SECTION = 'storage:'
+BOX_CHECKSUMS_KEY = 'boxes'
+# Number of box sections, recorded in the binary storage section
+_BOX_COUNT_KEY = 'box_sections'
+
+# Checksums and binary payloads of storage boxes, by box record list
+_box_cache = IdentityCache(4096)
+
+
+def _dumps_compact(data) -> bytes:
+    """Encode data as compact UTF-8 JSON."""
+    return json_io.dumpb(data)
+
+
+def _loads(raw: bytes):
+    """Decode UTF-8 JSON, reporting failures as corrupt save data."""
+    try:
+        return json_io.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise SaveFileCorruptedError(f"Invalid save data: {e}")
+
+
+def split_sections(data: dict) -> List[Tuple[str, dict]]:
+    """
+    Group top-level save keys into named sections (see SAVE_SECTIONS).
+
+    Args:
+        data: Save dictionary
+
+    Returns:
+        List of (section name, dictionary of that section's keys)
+    """
+    assigned = {CHECKSUMS_KEY}
+    sections = []
+    for section, keys in SAVE_SECTIONS:
+        if keys:
+            part = {key: data[key] for key in keys if key in data}
+            assigned.update(keys)
+        else:
+            part = {key: value for key, value in data.items() if key not in assigned}
+        sections.append((section, part))
+    return sections
+
+
+def split_storage(part: dict) -> Tuple[dict, Optional[List[list]], bool]:
+    """
+    Split the storage section into its other keys and each box's records.
+
+    Args:
+        part: Storage section dictionary from split_sections()
+
+    Returns:
+        (section without 'storage', list of each box's records or None if
+        the section holds no record list, whether the box lists are the
+        ones kept by storage.StorageRecords and can be cached by identity)
+    """
+    records = part.get('storage')
+    if not isinstance(records, list):
+        return part, None, False
+    rest = {key: value for key, value in part.items() if key != 'storage'}
+    boxes = getattr(records, 'boxes', None)
+    if boxes is not None and sum(len(box) for box in boxes) == len(records):
+        return rest, boxes, True
+    sizes = rest.get('storage_boxes')
+    if (not isinstance(sizes, list) or
+            not all(type(size) is int and size >= 0 for size in sizes) or
+            sum(sizes) != len(records)):
+        sizes = packed_box_sizes(len(records))
+    boxes = []
+    start = 0
+    for size in sizes:
+        boxes.append(records[start:start + size])
+        start += size
+    return rest, boxes, False
+
+
+def _cached_box(box: list, key, shared: bool, compute):
+    """Get what compute(box) returns, cached by box identity if shared."""
+    value = _box_cache.get(box, key) if shared else None
+    if value is None:
+        value = compute(box)
+        if shared:
+            _box_cache.put(box, value, key)
+    return value
+
+
+def section_checksum(part, stdlib: bool = False) -> int:
+    """
+    Compute the CRC-32 of a section's compact ASCII JSON.
+
+    Args:
+        part: Section dictionary from split_sections() (or a storage box's
+            record list)
+        stdlib: Encode with the json module rather than the active backend
+            (for saves written without orjson, should float formatting differ)
+
+    Returns:
+        Checksum
+    """
+    if stdlib:
+        text = json.dumps(part, separators=(',', ':'))
+    else:
+        text = json_io.dumps(part)
+    return zlib.crc32(text.encode('ascii'))
+
+
+def section_checksums(data: dict) -> dict:
+    """
+    Compute the checksum of every section of a save dictionary.
+
+    Returns:
+        Section name -> checksum, plus BOX_CHECKSUMS_KEY -> list of each
+        storage box's checksum
+    """
+    checksums = {}
+    for name, part in split_sections(data):
+        if name == STORAGE_SECTION:
+            part, boxes, shared = split_storage(part)
+            if boxes is not None:
+                checksums[BOX_CHECKSUMS_KEY] = [
+                    _cached_box(box, 'checksum', shared, section_checksum) for box in boxes
+                ]
+        checksums[name] = section_checksum(part)
+    return checksums
+
+
+def damaged_sections(data: dict) -> List[str]:
+    """
+    Compare a decoded save against its recorded section checksums.
+
+    Args:
+        data: Save dictionary including CHECKSUMS_KEY
+
+    Returns:
+        Names of sections that are missing or do not match their checksum
+        (empty for saves written before checksums were recorded)
+    """
+    checksums = data.get(CHECKSUMS_KEY)
+    if not isinstance(checksums, dict):
+        return []
+
+    def intact(part, expected) -> bool:
+        return (section_checksum(part) == expected or
+                section_checksum(part, stdlib=True) == expected)
+
+    damaged = []
+    for name, part in split_sections(data):
+        expected = checksums.get(name)
+        if expected is None:
+            continue
+        box_checksums = checksums.get(BOX_CHECKSUMS_KEY)
+        if name == STORAGE_SECTION and isinstance(box_checksums, list):
+            # Checked box by box (older saves checksum the whole section)
+            part, boxes, _ = split_storage(part)
+            if boxes is None or len(boxes) != len(box_checksums) or not all(
+                    intact(box, box_checksum) for box, box_checksum in zip(boxes, box_checksums)):
+                damaged.append(name)
+                continue
+        if not intact(part, expected):
+            damaged.append(name)
+    return damaged
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def salvage_json_object(text: bytes) -> dict:
+    """
+    Decode the complete top-level members of a truncated or damaged JSON object.
+
+    Args:
+        text: UTF-8 JSON text of an object, possibly cut off or corrupted
+
+    Returns:
+        Dictionary of the members before the first damaged one
+    """
+    text = text.decode('utf-8', errors='replace')
+    decoder = json.JSONDecoder()
+    data = {}
+
+    def skip(pos: int) -> int:
+        return _WHITESPACE.match(text, pos).end()
+
+    try:
+        pos = skip(0)
+        if text[pos] != '{':
+            return data
+        pos += 1
+        while True:
+            pos = skip(pos)
+            key, pos = decoder.raw_decode(text, pos)
+            pos = skip(pos)
+            if not isinstance(key, str) or text[pos] != ':':
+                break
+            value, pos = decoder.raw_decode(text, skip(pos + 1))
+            data[key] = value
+            pos = skip(pos)
+            if text[pos] != ',':
+                break
+            pos += 1
+    except (ValueError, IndexError):
+        pass  # The rest of the document is damaged
+    return data
+
+
+class SaveCodec:
+    """Base class for save codecs."""
+
+    # Registry name, file extension and magic header (b'' if none)
+    name = ""
+    extension = ".sav"
+    magic = b""
+
+    def __init__(self, compression_level: int = 6):
+        """
+        Initialize the codec.
+
+        Args:
+            compression_level: zlib compression level (0-9) for compressing codecs
+        """
+        self.compression_level = compression_level
+
+    def encode(self, data: dict) -> bytes:
+        """Encode a save dictionary."""
+        raise NotImplementedError
+
+    def decode(self, raw: bytes) -> dict:
+        """
+        Decode a save dictionary, checking its section checksums.
+
+        Raises:
+            SaveFileCorruptedError: If the data cannot be decoded or a
+                section is damaged
+        """
+        raise NotImplementedError
+
+    def verify(self, raw: bytes) -> List[str]:
+        """
+        Check a save's section checksums without building any game objects.
+
+        Returns:
+            Names of damaged sections (empty if the save is intact)
+
+        Raises:
+            SaveFileCorruptedError: If the save cannot be read at all
+        """
+        raise NotImplementedError
+
+    def recover(self, raw: bytes) -> Tuple[dict, List[str]]:
+        """
+        Decode the intact sections of a damaged save.
+
+        Returns:
+            (save dictionary without the damaged sections' keys,
+             names of the damaged sections)
+        """
+        raise NotImplementedError
+
+    def matches(self, raw: bytes) -> bool:
+        """Check whether raw data was written by this codec."""
+        return bool(self.magic) and raw.startswith(self.magic)
+
+
+class JsonCodec(SaveCodec):
+    """
+    Indented JSON, readable and compatible with every older save.
+
+    Subclasses change the indentation or compress the document by
+    overriding pretty, wrap(), unwrap() and unwrap_partial(). Section
+    checksums are stored first in the document, so they survive truncation.
+    """
+
+    name = "json"
+    extension = ".json"
+    pretty = True
+
+    def wrap(self, text: bytes) -> bytes:
+        """Turn the JSON document into file contents."""
+        return text
+
+    def unwrap(self, raw: bytes) -> bytes:
+        """Get the JSON document back from file contents."""
+        return raw
+
+    def unwrap_partial(self, raw: bytes) -> bytes:
+        """Get as much of the JSON document as possible from damaged contents."""
+        return raw
+
+    def encode(self, data: dict) -> bytes:
+        document = {CHECKSUMS_KEY: section_checksums(data)}
+        document.update((key, value) for key, value in data.items() if key != CHECKSUMS_KEY)
+        return self.wrap(json_io.dumpb(document, pretty=self.pretty))
+
+    def decode(self, raw: bytes) -> dict:
+        data = _loads(self.unwrap(raw))
+        damaged = damaged_sections(data)
+        if damaged:
+            raise SaveFileCorruptedError(f"Save sections damaged: {', '.join(damaged)}")
+        data.pop(CHECKSUMS_KEY, None)
+        return data
+
+    def verify(self, raw: bytes) -> List[str]:
+        return damaged_sections(_loads(self.unwrap(raw)))
+
+    def recover(self, raw: bytes) -> Tuple[dict, List[str]]:
+        data = salvage_json_object(self.unwrap_partial(raw))
+        if isinstance(data.get(CHECKSUMS_KEY), dict):
+            lost = damaged_sections(data)
+        else:
+            # Without checksums only sections cut off entirely are known lost
+            lost = [name for name, part in split_sections(data) if not part]
+        for name, part in split_sections(data):
+            if name in lost:
+                for key in part:
+                    del data[key]
+        data.pop(CHECKSUMS_KEY, None)
+        return data, lost
+
+    def matches(self, raw: bytes) -> bool:
+        return raw.lstrip()[:1] == b'{'
+
+
+class CompactJsonCodec(JsonCodec):
+    """JSON without indentation or spaces."""
+
+    name = "compact"
+    extension = ".cjson"
+    pretty = False
+
+
+class ZlibJsonCodec(JsonCodec):
+    """zlib-compressed compact JSON."""
+
+    name = "zlib"
+    extension = ".savz"
+    magic = b'GSZ1'
+    pretty = False
+
+    def wrap(self, text: bytes) -> bytes:
+        return self.magic + zlib.compress(text, self.compression_level)
+
+    def unwrap(self, raw: bytes) -> bytes:
+        try:
+            return zlib.decompress(raw[len(self.magic):])
+        except zlib.error as e:
+            raise SaveFileCorruptedError(f"Invalid compressed save: {e}")
+
+    def unwrap_partial(self, raw: bytes) -> bytes:
+        return _decompress_partial(raw[len(self.magic):], zlib.MAX_WBITS)
+
+    def matches(self, raw: bytes) -> bool:
+        return raw.startswith(self.magic)
+
+
+class GzipJsonCodec(JsonCodec):
+    """gzip-compressed compact JSON (readable with standard gzip tools)."""
+
+    name = "gzip"
+    extension = ".savgz"
+    magic = b'\x1f\x8b'
+    pretty = False
+
+    def wrap(self, text: bytes) -> bytes:
+        # mtime=0 keeps output deterministic for identical saves
+        return gzip.compress(text, self.compression_level, mtime=0)
+
+    def unwrap(self, raw: bytes) -> bytes:
+        try:
+            return gzip.decompress(raw)
+        except (OSError, EOFError, zlib.error) as e:
+            raise SaveFileCorruptedError(f"Invalid compressed save: {e}")
+
+    def unwrap_partial(self, raw: bytes) -> bytes:
+        return _decompress_partial(raw, zlib.MAX_WBITS | 16)
+
+    def matches(self, raw: bytes) -> bool:
+        return raw.startswith(self.magic)
+
+
+def _decompress_partial(raw: bytes, wbits: int) -> bytes:
+    """Decompress as much of a damaged zlib/gzip stream as possible."""
+    decompressor = zlib.decompressobj(wbits)
+    output = []
+    chunk = 4096
+    try:
+        for pos in range(0, len(raw), chunk):
+            output.append(decompressor.decompress(raw[pos:pos + chunk]))
+    except zlib.error:
+        pass  # Keep what came before the damage
+    return b''.join(output)
+
+
+class BinaryCodec(SaveCodec):
+    """
+    Sectioned binary save format.
+
+    Layout (big-endian):
+        magic (4s), format version (u16), section count (u16)
+        section table: name length (u8), name, offset (u32), length (u32),
+            CRC-32 of the payload (u32, format version 2+)
+        section payloads: zlib-compressed compact JSON objects, or (for
+            sections with creature lists, format version 3+) packed records
+            from save_records.encode_packed_section()
+
+    From format version 4 each storage box is its own section
+    (BOX_SECTION + box number, after the storage section), so a damaged
+    box is detected on its own and the payloads of unchanged boxes are
+    reused from the last save instead of being encoded again.
+
+    Sections can be located, verified and decoded individually via
+    read_section_table(), section_groups() and read_sections(). Version 1
+    files (without CRCs) still load; their sections are verified by
+    decompressing them. Version 2-3 files (storage in one section) still
+    load.
+    """
+
+    name = "binary"
+    magic = b'GSAV'
+    FORMAT_VERSION = 4
+
+    _HEADER = struct.Struct('>4sHH')
+    _ENTRIES = {1: struct.Struct('>II'), 2: struct.Struct('>III'), 3: struct.Struct('>III'),
+                4: struct.Struct('>III')}
+
+    def split_sections(self, data: dict) -> List[Tuple[str, dict]]:
+        """Group top-level save keys into named sections."""
+        return split_sections(data)
+
+    def _compress_section(self, section: str, part) -> Tuple[bytes, int]:
+        """Get the payload of a section and its CRC."""
+        payload = zlib.compress(encode_packed_section(section, part) or _dumps_compact(part),
+                                self.compression_level)
+        return payload, zlib.crc32(payload)
+
+    def _compress_box(self, records: list) -> Tuple[bytes, int]:
+        """Get the payload of a storage box section and its CRC."""
+        return self._compress_section(STORAGE_SECTION, {'storage': records})
+
+    @property
+    def _box_key(self) -> tuple:
+        """Key of this codec's box payloads in the box cache."""
+        return ('binary', self.compression_level)
+
+    def encode(self, data: dict) -> bytes:
+        payloads = []
+        for section, part in self.split_sections(data):
+            boxes = None
+            if section == STORAGE_SECTION:
+                part, boxes, shared = split_storage(part)
+                if boxes is not None:
+                    part = dict(part, **{_BOX_COUNT_KEY: len(boxes)})
+            payloads.append((section.encode('ascii'),) + self._compress_section(section, part))
+            for number, box in enumerate(boxes or ()):
+                payloads.append((f"{BOX_SECTION}{number}".encode('ascii'),) + _cached_box(
+                    box, self._box_key, shared, self._compress_box))
+
+        entry = self._ENTRIES[self.FORMAT_VERSION]
+        table_size = sum(1 + len(name) + entry.size for name, _, _ in payloads)
+        offset = self._HEADER.size + table_size
+        parts = [self._HEADER.pack(self.magic, self.FORMAT_VERSION, len(payloads))]
+        for name, payload, crc in payloads:
+            parts.append(bytes([len(name)]) + name + entry.pack(offset, len(payload), crc))
+            offset += len(payload)
+        parts.extend(payload for _, payload, _ in payloads)
+        return b''.join(parts)
+
+    def read_section_table(self, raw, strict: bool = True) -> Dict[str, Tuple[int, int, Optional[int]]]:
+        """
+        Parse the section table.
+
+        Args:
+            raw: Encoded save (bytes, or a buffer such as an mmap)
+            strict: Raise for sections extending past the end of the data
+                (otherwise they are left out)
+
+        Returns:
+            Dictionary of section name -> (offset, length, CRC-32 or None
+            for version 1 files)
+
+        Raises:
+            SaveFileCorruptedError: If the header or table is malformed
+        """
+        try:
+            magic, version, count = self._HEADER.unpack_from(raw, 0)
+            if magic != self.magic:
+                raise SaveFileCorruptedError("Not a binary save file")
+            if version not in self._ENTRIES:
+                raise SaveFileCorruptedError(f"Unsupported binary save version {version}")
+            entry = self._ENTRIES[version]
+
+            pos = self._HEADER.size
+            table = {}
+            for _ in range(count):
+                name_length = raw[pos]
+                name = bytes(raw[pos + 1:pos + 1 + name_length]).decode('ascii')
+                pos += 1 + name_length
+                offset, length, *crc = entry.unpack_from(raw, pos)
+                pos += entry.size
+                if offset + length > len(raw):
+                    if strict:
+                        raise SaveFileCorruptedError(f"Save section '{name}' is truncated")
+                    continue
+                table[name] = (offset, length, crc[0] if crc else None)
+            return table
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise SaveFileCorruptedError(f"Invalid binary save header: {e}")
+
+    @staticmethod
+    def section_groups(table: Dict[str, Tuple[int, int, Optional[int]]]
+                       ) -> Dict[str, Dict[str, Tuple[int, int, Optional[int]]]]:
+        """
+        Group a section table by save section (storage with its boxes).
+
+        Args:
+            table: Section table from read_section_table()
+
+        Returns:
+            Dictionary of SAVE_SECTIONS name -> {table entry name: entry}
+        """
+        groups: Dict[str, Dict[str, Tuple[int, int, Optional[int]]]] = {}
+        for name, entry in table.items():
+            group = STORAGE_SECTION if name.startswith(BOX_SECTION) else name
+            groups.setdefault(group, {})[name] = entry
+        return groups
+
+    def _read_group(self, raw, name: str, entries: Dict[str, Tuple[int, int, Optional[int]]],
+                    keep_boxes: bool = False) -> dict:
+        """
+        Verify and decode a section and (for storage) its box sections.
+
+        Args:
+            raw: Encoded save
+            name: SAVE_SECTIONS name
+            entries: The section's table entries (see section_groups())
+            keep_boxes: Return storage as StorageRecords and cache each
+                box's payload and CRC by its record list, so saving the
+                boxes again unchanged reuses them
+
+        Raises:
+            SaveFileCorruptedError: If the section or a box is missing or damaged
+        """
+        if name not in entries:
+            raise SaveFileCorruptedError(f"Save section '{name}' is missing")
+        data = self._read_section(raw, name, *entries[name])
+        if name != STORAGE_SECTION or _BOX_COUNT_KEY not in data:
+            return data  # Storage in one section before format version 4
+        boxes = []
+        for box_name in self._box_names(data.pop(_BOX_COUNT_KEY), entries):
+            offset, length, crc = entries[box_name]
+            box = self._read_section(raw, box_name, offset, length, crc).get('storage')
+            if not isinstance(box, list):
+                raise SaveFileCorruptedError(f"Save section '{box_name}' is corrupt")
+            if keep_boxes and crc is not None:
+                # The payload decodes to box whatever level compressed it
+                _box_cache.put(box, (bytes(raw[offset:offset + length]), crc), self._box_key)
+            boxes.append(box)
+        data['storage'] = (StorageRecords(boxes) if keep_boxes else
+                           [record for box in boxes for record in box])
+        return data
+
+    @staticmethod
+    def _box_names(count, entries: Dict[str, Tuple[int, int, Optional[int]]]) -> List[str]:
+        """
+        Get the names of a storage section's box sections, in order.
+
+        Raises:
+            SaveFileCorruptedError: If boxes are missing
+        """
+        names = [f"{BOX_SECTION}{number}" for number in range(count)] if type(count) is int else []
+        if type(count) is not int or len(entries) != count + 1 or any(n not in entries for n in names):
+            raise SaveFileCorruptedError(f"Save section '{STORAGE_SECTION}' is missing boxes")
+        return names
+
+    def _read_section(self, raw, name: str, offset: int, length: int,
+                      crc: Optional[int]) -> dict:
+        """Verify and decode one section payload."""
+        payload = raw[offset:offset + length]
+        if crc is not None and zlib.crc32(payload) != crc:
+            raise SaveFileCorruptedError(f"Save section '{name}' is damaged (checksum mismatch)")
+        try:
+            text = zlib.decompress(payload)
+            if text.startswith(PACKED_MARKER):
+                return decode_packed_section(text)
+            return _loads(text)
+        except (zlib.error, ValueError) as e:
+            raise SaveFileCorruptedError(f"Save section '{name}' is corrupt: {e}")
+
+    def read_sections(self, raw, names=None) -> dict:
+        """
+        Decode some or all sections of a binary save.
+
+        Args:
+            raw: Encoded save (bytes, or a buffer such as an mmap)
+            names: SAVE_SECTIONS names to decode (default: all; storage
+                includes its boxes)
+
+        Returns:
+            Dictionary of the top-level save keys held by those sections
+
+        Raises:
+            SaveFileCorruptedError: If a requested section is damaged
+        """
+        data = {}
+        for name, entries in self.section_groups(self.read_section_table(raw)).items():
+            if names is not None and name not in names:
+                continue
+            data.update(self._read_group(raw, name, entries))
+        return data
+
+    def decode(self, raw: bytes) -> dict:
+        return self.read_sections(raw)
+
+    def verify(self, raw: bytes) -> List[str]:
+        groups = self.section_groups(self.read_section_table(raw, strict=False))
+        damaged = []
+        for name, _ in SAVE_SECTIONS:
+            entries = groups.get(name, {})
+            if name not in entries:
+                damaged.append(name)
+                continue
+            try:
+                if not all(crc is not None for _, _, crc in entries.values()):
+                    self._read_group(raw, name, entries)  # Verified by decoding
+                elif any(zlib.crc32(raw[offset:offset + length]) != crc
+                         for offset, length, crc in entries.values()):
+                    damaged.append(name)
+                elif len(entries) > 1:
+                    # Box sections: check none is missing (from the small storage section)
+                    self._box_names(self._read_section(raw, name, *entries[name]).get(
+                        _BOX_COUNT_KEY), entries)
+            except SaveFileCorruptedError:
+                damaged.append(name)
+        return damaged
+
+    def recover(self, raw: bytes) -> Tuple[dict, List[str]]:
+        try:
+            groups = self.section_groups(self.read_section_table(raw, strict=False))
+        except SaveFileCorruptedError:
+            return {}, [name for name, _ in SAVE_SECTIONS]
+        data = {}
+        lost = []
+        for name, _ in SAVE_SECTIONS:
+            try:
+                data.update(self._read_group(raw, name, groups.get(name, {})))
+            except SaveFileCorruptedError:
+                lost.append(name)
+        return data, lost
+
+
+class MappedBinarySave:
+    """
+    A binary save file mapped into memory, decoding sections on demand.
+
+    Opening the file parses only the section table; each section's CRC is
+    checked when it is read, and it is decompressed from a memoryview slice
+    of the mapping, so sections that are never read cost nothing. The
+    mapping stays valid if the file is replaced on disk, and is released by
+    close().
+
+    Storage is read as StorageRecords whose box payloads are cached, so the
+    first save after loading encodes only the boxes changed since.
+    """
+
+    def __init__(self, path: str, codec: Optional['BinaryCodec'] = None):
+        """
+        Map a binary save file.
+
+        Args:
+            path: Save file path
+            codec: Binary codec to read with (default: the registered one)
+
+        Raises:
+            SaveFileCorruptedError: If the file is not a binary save
+        """
+        self.codec = codec or SAVE_CODECS['binary']
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file
+                raise SaveFileCorruptedError("Not a binary save file")
+        self._view = memoryview(self._map)
+        try:
+            self.table = self.codec.read_section_table(self._view)
+            # Save section -> its table entries (storage with its boxes)
+            self.sections = self.codec.section_groups(self.table)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def checksummed(self) -> bool:
+        """Whether every section has a CRC (format version 2+)."""
+        return all(crc is not None for _, _, crc in self.table.values())
+
+    @property
+    def closed(self) -> bool:
+        """Whether the mapping has been released."""
+        return self._view is None
+
+    def read(self, names=None) -> dict:
+        """
+        Decode some or all sections.
+
+        Args:
+            names: SAVE_SECTIONS names to decode (default: all; storage
+                includes its boxes)
+
+        Returns:
+            Dictionary of the top-level save keys held by those sections
+
+        Raises:
+            SaveFileCorruptedError: If a section fails its checksum or
+                cannot be decoded
+            ValueError: If the mapping is closed
+        """
+        if self._view is None:
+            raise ValueError("Mapped save is closed")
+        data = {}
+        for name, entries in self.sections.items():
+            if names is None or name in names:
+                data.update(self.codec._read_group(self._view, name, entries, keep_boxes=True))
+        return data
+
+    def close(self) -> None:
+        """Release the mapping."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._map.close()
+
+    def __enter__(self) -> 'MappedBinarySave':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+SAVE_CODECS: Dict[str, SaveCodec] = {
+    codec.name: codec for codec in (
+        JsonCodec(), CompactJsonCodec(), ZlibJsonCodec(), GzipJsonCodec(), BinaryCodec()
+    )
+}
+
+# Extensions of every save format, used to find saves regardless of codec
+SAVE_EXTENSIONS = tuple(sorted({codec.extension for codec in SAVE_CODECS.values()}))
+
+
+def get_codec(name: str) -> SaveCodec:
+    """
+    Look up a codec by name.
+
+    Raises:
+        ValueError: If the codec is unknown
+    """
+    try:
+        return SAVE_CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown save codec '{name}' (available: {', '.join(SAVE_CODECS)})")
+
+
+def detect_codec(raw: bytes) -> SaveCodec:
+    """
+    Find the codec that wrote raw save data from its magic header.
+
+    Raises:
+        SaveFileCorruptedError: If no codec recognizes the data
+    """
+    for codec in SAVE_CODECS.values():
+        if codec.magic and codec.matches(raw):
+            return codec
+    if SAVE_CODECS['json'].matches(raw):
+        return SAVE_CODECS['json']
+    raise SaveFileCorruptedError("Unrecognized save file format")
+
+
+def load_save_data(raw: bytes) -> dict:
+    """Decode save data written by any codec."""
+    return detect_codec(raw).decode(raw)
+
+
+def verify_save_data(raw: bytes) -> List[str]:
+    """
+    Check the section checksums of save data written by any codec.
+
+    Returns:
+        Names of damaged sections (empty if the save is intact)
+
+    Raises:
+        SaveFileCorruptedError: If the data cannot be read at all
+    """
+    return detect_codec(raw).verify(raw)
+
+
+def recover_save_data(raw: bytes) -> Tuple[dict, List[str]]:
+    """
+    Decode the intact sections of damaged save data written by any codec.
+
+    Returns:
+        (save dictionary of the intact sections, names of lost sections)
+
+    Raises:
+        SaveFileCorruptedError: If the format cannot be recognized
+    """
+    return detect_codec(raw).recover(raw)
@@ -0,0 +1,212 @@
+"""
+Append-only save journals.
+
+In journal mode a save is a base snapshot (a regular save file) plus a
+journal of deltas against it. Each autosave appends one line describing the
+values that changed since the previous save; loading replays the journal on
+top of the snapshot. Once the journal grows past a threshold it is compacted
+into a fresh snapshot.
+
+Journal format (UTF-8, one JSON object per line):
+    {"journal_id": "<id>", "version": 1}          header; id matches the
+                                                   snapshot's 'journal_id'
+    {"set": [[path, value], ...], "del": [path, ...]}   one delta per save
+
+A path is a list of dict keys and list indices from the top of the save
+dictionary. A torn final line (e.g. after a crash) is ignored on replay.
+"""
+
+import os
+from typing import Any, List, Optional, Tuple
+
+from . import json_io
+from .exceptions import SaveFileCorruptedError
+
+
+JOURNAL_VERSION = 1
+JOURNAL_EXTENSION = ".journal"
+
+# Snapshot key linking a snapshot to its journal
+JOURNAL_ID_KEY = 'journal_id'
+
+# Journal size at which the next save is written as a fresh snapshot
+DEFAULT_JOURNAL_COMPACT_BYTES = 256 * 1024
+
+Path = List[Any]
+
+
+def diff_save_data(old: dict, new: dict) -> Tuple[List[Tuple[Path, Any]], List[Path]]:
+    """
+    Compute the changes between two save dictionaries.
+
+    Dictionaries are compared key by key and equal-length lists (list
+    subclasses such as StorageRecords included) element by element, so
+    changing one creature's HP records only that value. Other changes
+    replace the whole value.
+
+    Args:
+        old: Previously saved data
+        new: Current data
+
+    Returns:
+        (list of (path, new value), list of deleted paths)
+    """
+    sets: List[Tuple[Path, Any]] = []
+    deletes: List[Path] = []
+
+    def walk(before, after, path):
+        if type(before) is dict and type(after) is dict:
+            for key, value in after.items():
+                if key not in before:
+                    sets.append((path + [key], value))
+                elif before[key] != value:
+                    walk(before[key], value, path + [key])
+            deletes.extend(path + [key] for key in before if key not in after)
+        elif isinstance(before, list) and isinstance(after, list) and len(before) == len(after):
+            for i, (a, b) in enumerate(zip(before, after)):
+                if a != b:
+                    walk(a, b, path + [i])
+        else:
+            sets.append((path, after))
+
+    walk(old, new, [])
+    return sets, deletes
+
+
+def apply_save_delta(data: dict, record: dict) -> None:
+    """
+    Apply one journal record to save data in place.
+
+    Args:
+        data: Save dictionary
+        record: Journal record with 'set' and 'del' entries
+
+    Raises:
+        SaveFileCorruptedError: If a path does not exist in data
+    """
+    try:
+        for path, value in record.get('set', []):
+            if not path:
+                raise SaveFileCorruptedError("Journal replaces the whole save")
+            target = data
+            for key in path[:-1]:
+                target = target[key]
+            target[path[-1]] = value
+        for path in record.get('del', []):
+            target = data
+            for key in path[:-1]:
+                target = target[key]
+            del target[path[-1]]
+    except (KeyError, IndexError, TypeError) as e:
+        raise SaveFileCorruptedError(f"Journal does not match its snapshot: {e}")
+
+
+class SaveJournal:
+    """An append-only journal file next to a save snapshot."""
+
+    def __init__(self, path: str):
+        """
+        Initialize a journal.
+
+        Args:
+            path: Journal file path (e.g. saves/name.journal)
+        """
+        self.path = path
+
+    def exists(self) -> bool:
+        """Check whether the journal file exists."""
+        return os.path.exists(self.path)
+
+    def size(self) -> int:
+        """Get the journal size in bytes (0 if missing)."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def start(self, journal_id: str) -> None:
+        """Start a new, empty journal for a snapshot."""
+        from .save_writer import atomic_write
+
+        header = json_io.dumps({JOURNAL_ID_KEY: journal_id, 'version': JOURNAL_VERSION}) + "\n"
+        atomic_write(self.path, header.encode('utf-8'))
+
+    def append(self, sets: List[Tuple[Path, Any]], deletes: List[Path]) -> int:
+        """
+        Append a delta record.
+
+        Args:
+            sets: (path, value) pairs from diff_save_data()
+            deletes: Deleted paths from diff_save_data()
+
+        Returns:
+            Number of bytes written
+        """
+        line = json_io.dumps({'set': sets, 'del': deletes}) + "\n"
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        return len(line)
+
+    def read_records(self, journal_id: str) -> Optional[List[dict]]:
+        """
+        Read the delta records for a snapshot.
+
+        Args:
+            journal_id: The snapshot's journal ID
+
+        Returns:
+            List of records, or None if the journal is missing or belongs to
+            another snapshot
+
+        Raises:
+            SaveFileCorruptedError: If a record other than the last is damaged
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                lines = f.read().split("\n")
+        except FileNotFoundError:
+            return None
+
+        try:
+            header = json_io.loads(lines[0])
+        except ValueError:
+            return None
+        if header.get(JOURNAL_ID_KEY) != journal_id:
+            return None
+
+        records = []
+        entries = [line for line in lines[1:] if line]
+        for i, line in enumerate(entries):
+            try:
+                records.append(json_io.loads(line))
+            except ValueError:
+                if i == len(entries) - 1:
+                    break  # Torn write of the newest record
+                raise SaveFileCorruptedError(f"Journal record {i + 1} is damaged")
+        return records
+
+    def verify(self) -> bool:
+        """
+        Check that the journal's records decode, without applying them.
+
+        Returns:
+            True if the journal is missing or only its newest record is torn
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                lines = [line for line in f.read().split(b"\n") if line]
+        except FileNotFoundError:
+            return True
+        for i, line in enumerate(lines):
+            try:
+                json_io.loads(line)
+            except ValueError:
+                return i == len(lines) - 1
+        return True
+
+    def remove(self) -> None:
+        """Delete the journal file if present."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,233 @@
+"""
+Bulk save maintenance.
+
+Validates, migrates, re-encodes or compacts every save in a directory,
+spreading the saves over a pool of worker processes. Each worker opens its
+own quiet SaveManager and handles saves as save data (see
+SaveManager.maintain_save()), so no game objects are built and nothing is
+printed per save. The manifest is written once, by the parent process, and
+compact finishes by deleting stored sprites and sprite packs no save uses
+(SaveManager.collect_garbage()).
+
+Usage:
+    python -m genemon.core.save_maintenance validate --dir saves
+    python -m genemon.core.save_maintenance recode --codec binary --jobs 4
+    python -m genemon.core.save_maintenance migrate --quiet --report report.json
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from typing import Callable, List, Optional, Sequence
+
+from . import json_io
+from .save_codecs import DEFAULT_SAVE_CODEC, SAVE_CODECS
+from .save_system import MAINTENANCE_OPERATIONS, SAVE_BACKENDS, SaveManager
+
+
+# Saves handed to a worker at a time
+_CHUNK_SIZE = 8
+
+# The worker process's manager (set by _init_worker)
+_worker_manager: Optional[SaveManager] = None
+
+
+def _open_manager(save_dir: str, codec: str, backend: str) -> SaveManager:
+    """Open a quiet manager for maintenance (no sprite resolution is needed)."""
+    return SaveManager(save_dir, codec=codec, backend=backend, verbose=False)
+
+
+def _init_worker(save_dir: str, codec: str, backend: str) -> None:
+    """Open the worker process's save manager."""
+    global _worker_manager
+    _worker_manager = _open_manager(save_dir, codec, backend)
+
+
+def _maintain_in_worker(task) -> dict:
+    """Run one maintenance task in a worker process."""
+    save_name, operation = task
+    return _worker_manager.maintain_save(save_name, operation)
+
+
+def run_maintenance(save_dir: str, operation: str, save_names: Optional[Sequence[str]] = None,
+                    codec: str = DEFAULT_SAVE_CODEC, backend: str = "file",
+                    jobs: Optional[int] = None,
+                    progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    Run a maintenance operation over many saves.
+
+    Args:
+        save_dir: Save directory
+        operation: One of MAINTENANCE_OPERATIONS
+        save_names: Saves to process (default: every save in save_dir)
+        codec: Codec that recode writes
+        backend: Backend that recode writes ("file" or "sqlite")
+        jobs: Worker processes (default: CPU count; 1 runs in this process)
+        progress: Called with (saves done, total) after each save
+
+    Returns:
+        Report dictionary with operation, save_dir, jobs, seconds, saves,
+        ok, failed, changed, bytes_before, bytes_after, collected (the
+        SaveManager.collect_garbage() report of compact, otherwise None) and
+        results (one SaveManager.maintain_save() report per save, without
+        summaries, ordered by save name)
+
+    Raises:
+        ValueError: If the operation, codec or backend is unknown
+    """
+    if operation not in MAINTENANCE_OPERATIONS:
+        raise ValueError(f"Unknown maintenance operation '{operation}' "
+                         f"(available: {', '.join(MAINTENANCE_OPERATIONS)})")
+    start = time.perf_counter()
+    manager = _open_manager(save_dir, codec, backend)
+    names = sorted(save_names if save_names is not None else manager.list_saves())
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(names) or 1))
+    tasks = [(save_name, operation) for save_name in names]
+
+    results = []
+    if jobs == 1:
+        reports = (manager.maintain_save(*task) for task in tasks)
+        for report in reports:
+            results.append(report)
+            if progress:
+                progress(len(results), len(tasks))
+    else:
+        with multiprocessing.Pool(jobs, initializer=_init_worker,
+                                  initargs=(save_dir, codec, backend)) as pool:
+            for report in pool.imap_unordered(_maintain_in_worker, tasks, _CHUNK_SIZE):
+                results.append(report)
+                if progress:
+                    progress(len(results), len(tasks))
+
+    summaries = [report.pop('summary') for report in results]
+    summaries = [summary for summary in summaries if summary is not None]
+    if summaries:
+        manager.update_manifest(summaries)
+    collected = manager.collect_garbage() if operation == "compact" else None
+    manager.close()
+
+    results.sort(key=lambda report: report['save_name'])
+    return {
+        'operation': operation,
+        'save_dir': save_dir,
+        'jobs': jobs,
+        'seconds': round(time.perf_counter() - start, 3),
+        'saves': len(results),
+        'ok': sum(1 for report in results if report['ok']),
+        'failed': sum(1 for report in results if not report['ok']),
+        'changed': sum(1 for report in results if report['changed']),
+        'bytes_before': sum(report['bytes_before'] for report in results),
+        'bytes_after': sum(report['bytes_after'] for report in results),
+        'collected': collected,
+        'results': results,
+    }
+
+
+class ProgressBar:
+    """A single-line progress bar redrawn in place on a terminal."""
+
+    def __init__(self, stream=None, width: int = 30):
+        """
+        Initialize the progress bar.
+
+        Args:
+            stream: Output stream (default: sys.stderr)
+            width: Bar width in characters
+        """
+        self.stream = stream or sys.stderr
+        self.width = width
+
+    def __call__(self, done: int, total: int) -> None:
+        filled = self.width * done // total if total else self.width
+        self.stream.write(f"\r[{'#' * filled}{'.' * (self.width - filled)}] {done}/{total}")
+        if done >= total:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def format_report(report: dict) -> List[str]:
+    """
+    Describe a maintenance report for the terminal.
+
+    Args:
+        report: Report from run_maintenance()
+
+    Returns:
+        Lines of text: failed saves, a summary line, then what compact
+        deleted
+    """
+    lines = [f"  {r['save_name']}: {r['error']}" for r in report['results'] if not r['ok']]
+    lines.append(
+        f"{report['operation']}: {report['saves']} saves, {report['ok']} ok, "
+        f"{report['failed']} failed, {report['changed']} rewritten "
+        f"({report['bytes_before']:,} -> {report['bytes_after']:,} bytes) "
+        f"in {report['seconds']:.2f}s with {report['jobs']} jobs"
+    )
+    collected = report.get('collected')
+    if collected and collected['error']:
+        lines.append(f"unused sprites kept: {collected['error']}")
+    elif collected:
+        lines.append(f"removed {collected['sprites_removed']} unused sprites and "
+                     f"{collected['packs_removed']} sprite packs "
+                     f"({collected['bytes_freed']:,} bytes)")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m genemon.core.save_maintenance",
+        description="Validate, migrate, re-encode or compact a directory of Genemon saves."
+    )
+    parser.add_argument("operation", choices=MAINTENANCE_OPERATIONS)
+    parser.add_argument("saves", nargs="*", help="Save names (default: every save)")
+    parser.add_argument("--dir", default="saves", help="Save directory (default: saves)")
+    parser.add_argument("--codec", default=DEFAULT_SAVE_CODEC, choices=sorted(SAVE_CODECS),
+                        help="Format written by recode")
+    parser.add_argument("--backend", default="file", choices=SAVE_BACKENDS,
+                        help="Backend written by recode")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Print nothing; the exit status reports failures")
+    parser.add_argument("--json", action="store_true",
+                        help="Print the report as JSON instead of text")
+    parser.add_argument("--report", metavar="PATH", help="Also write the JSON report to PATH")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the save maintenance command line.
+
+    Returns:
+        Exit status: 0 if every save succeeded, 1 if any failed, 2 if the
+        save directory does not exist
+    """
+    args = build_parser().parse_args(argv)
+    if not os.path.isdir(args.dir):
+        if not args.quiet:
+            print(f"Save directory not found: {args.dir}", file=sys.stderr)
+        return 2
+
+    show_progress = not args.quiet and not args.json and sys.stderr.isatty()
+    report = run_maintenance(
+        args.dir, args.operation, save_names=args.saves or None,
+        codec=args.codec, backend=args.backend, jobs=args.jobs,
+        progress=ProgressBar() if show_progress else None
+    )
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json_io.dump(report, f, pretty=True)
+    if args.json and not args.quiet:
+        print(json_io.dumps(report, pretty=True))
+    elif not args.quiet:
+        print("\n".join(format_report(report)))
+    return 1 if report['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
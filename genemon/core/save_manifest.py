@@ -0,0 +1,144 @@
+"""
+Save manifest index.
+
+Listing saves with their player name, location, badges and play time would
+otherwise mean decoding every save file. The manifest keeps a small summary
+of each save in one file (save_dir/saves.manifest), updated whenever a save
+is written and rebuilt from the save files when it is missing or stale.
+
+Each entry records the size and modification time of the save's files, so a
+save changed outside the manager (copied in, restored, written by another
+process) is noticed and re-summarized.
+"""
+
+import os
+from typing import Dict, Optional, Tuple
+
+from . import json_io
+from .save_writer import atomic_write
+
+
+# Version 2 added each save's seed to its summary
+MANIFEST_VERSION = 2
+MANIFEST_FILENAME = "saves.manifest"
+
+# (snapshot size, snapshot mtime_ns, journal size)
+FileSignature = Tuple[int, int, int]
+
+
+def file_signature(save_path: str, journal_path: str) -> Optional[FileSignature]:
+    """
+    Get the signature of a save's files.
+
+    Args:
+        save_path: Snapshot file path
+        journal_path: Journal file path
+
+    Returns:
+        Signature tuple, or None if the snapshot does not exist
+    """
+    try:
+        stat = os.stat(save_path)
+    except OSError:
+        return None
+    try:
+        journal_size = os.path.getsize(journal_path)
+    except OSError:
+        journal_size = 0
+    return (stat.st_size, stat.st_mtime_ns, journal_size)
+
+
+def summarize_save(data: dict) -> dict:
+    """
+    Extract the fields shown in a save browser.
+
+    Args:
+        data: Save dictionary (from GameState.to_dict() or a save file)
+
+    Returns:
+        Summary dictionary
+    """
+    team = data.get('player_team', {}).get('creatures', [])
+    return {
+        'save_name': data.get('save_name'),
+        'player_name': data.get('player_name', "Player"),
+        'play_time': data.get('play_time', 0),
+        'current_location': data.get('current_location'),
+        'badges': len(data.get('badges', [])),
+        'team_levels': [c.get('level', 1) for c in team],
+        'pokedex_caught': len(data.get('pokedex_caught', [])),
+        'money': data.get('money', 0),
+        'seed': data.get('seed'),
+        'saved_at': data.get('saved_at')
+    }
+
+
+class SaveManifest:
+    """Summaries of every save in a directory, stored in a single file."""
+
+    def __init__(self, save_dir: str):
+        """
+        Initialize the manifest.
+
+        Args:
+            save_dir: Save directory holding the manifest file
+        """
+        self.path = os.path.join(save_dir, MANIFEST_FILENAME)
+        self._entries: Optional[Dict[str, dict]] = None
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        """Entries by save name, read from disk on first use."""
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> Dict[str, dict]:
+        """Read the manifest file, treating a missing or damaged file as empty."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json_io.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != MANIFEST_VERSION:
+            return {}
+        saves = data.get('saves')
+        return saves if isinstance(saves, dict) else {}
+
+    def write(self) -> None:
+        """Write the manifest file."""
+        data = {'version': MANIFEST_VERSION, 'saves': self.entries}
+        atomic_write(self.path, json_io.dumpb(data))
+
+    def get(self, save_name: str, signature: Optional[FileSignature]) -> Optional[dict]:
+        """
+        Get a save's summary if it is still current.
+
+        Args:
+            save_name: Save name
+            signature: Current file_signature() of the save
+
+        Returns:
+            Summary, or None if missing or recorded for different files
+        """
+        entry = self.entries.get(save_name)
+        if entry is None or signature is None or tuple(entry.get('files', ())) != signature:
+            return None
+        return entry['summary']
+
+    def update(self, save_name: str, summary: dict, signature: FileSignature) -> None:
+        """Record a save's summary (call write() to persist)."""
+        self.entries[save_name] = {'files': list(signature), 'summary': summary}
+
+    def remove(self, save_name: str) -> bool:
+        """
+        Forget a save (call write() to persist).
+
+        Returns:
+            True if the save had an entry
+        """
+        return self.entries.pop(save_name, None) is not None
+
+    def clear(self) -> None:
+        """Forget every save (call write() to persist)."""
+        self._entries = {}
@@ -0,0 +1,239 @@
+"""
+Save schema versions and migrations.
+
+Every save records the schema version it was written with. Loading runs the
+registered migrations from that version up to SAVE_SCHEMA_VERSION in one
+pass over the raw save dictionary, before any objects are built, so the
+from_dict() methods only ever see current data and need no defaults for
+fields older saves lacked.
+
+Versions:
+    1  Saves written before schema versioning ('version': '0.1.0'); any
+       field added since the first release may be missing
+    2  Game state, team, creature, move and egg records carry every field
+       (held items, learnsets, TM lists, abilities and the storage box
+       sizes 'storage_boxes' stay optional)
+
+To change the save format, bump SAVE_SCHEMA_VERSION and register a
+migration from the previous version with @migration.
+"""
+
+from typing import Callable, Dict
+
+from . import json_io
+from .exceptions import SaveFileVersionError
+
+
+SAVE_SCHEMA_VERSION = 2
+
+# Schema of saves whose 'version' is the pre-versioning '0.1.0' string
+LEGACY_SCHEMA_VERSION = 1
+
+# Migrations by the version they upgrade from; each upgrades data in place
+MIGRATIONS: Dict[int, Callable[[dict], None]] = {}
+
+
+def migration(from_version: int) -> Callable:
+    """
+    Register a migration from from_version to from_version + 1.
+
+    Args:
+        from_version: Schema version the migration upgrades
+
+    Returns:
+        Decorator registering the function
+    """
+    def register(func: Callable[[dict], None]) -> Callable[[dict], None]:
+        if from_version in MIGRATIONS:
+            raise ValueError(f"A migration from schema {from_version} is already registered")
+        MIGRATIONS[from_version] = func
+        return func
+    return register
+
+
+def schema_version(data: dict) -> int:
+    """Get the schema version of save data."""
+    version = data.get('version')
+    return version if isinstance(version, int) else LEGACY_SCHEMA_VERSION
+
+
+def migrate_save_data(data: dict) -> int:
+    """
+    Upgrade save data to the current schema in place.
+
+    Args:
+        data: Save dictionary, as read from disk
+
+    Returns:
+        Number of migrations applied (0 if the data was current)
+
+    Raises:
+        SaveFileVersionError: If the save is from a newer version of the
+            game, or no migration path exists
+    """
+    version = schema_version(data)
+    if version > SAVE_SCHEMA_VERSION:
+        raise SaveFileVersionError(
+            f"Save uses schema {version}; this version of the game reads up to "
+            f"schema {SAVE_SCHEMA_VERSION}"
+        )
+    applied = 0
+    while version < SAVE_SCHEMA_VERSION:
+        step = MIGRATIONS.get(version)
+        if step is None:
+            raise SaveFileVersionError(f"No migration from save schema {version}")
+        step(data)
+        version += 1
+        applied += 1
+    data['version'] = SAVE_SCHEMA_VERSION
+    return applied
+
+
+# Defaults for fields missing from records written before schema 2
+_STATE_DEFAULTS = {
+    'save_name': 'default',
+    'player_name': 'Player',
+    'play_time': 0,
+    'current_location': 'town_starter',
+    'player_x': 10,
+    'player_y': 10,
+    'seed': 0,
+    'species': {},
+    'storage': [],
+    'badges': [],
+    'flags': {},
+    'defeated_trainers': [],
+    'pokedex_seen': [],
+    'pokedex_caught': [],
+    'trainer_teams': {},
+    'items': {"potion": 5, "ether": 3, "capture_ball": 10},
+    'money': 1000,
+    'breeding_eggs': [],
+}
+_MOVE_DEFAULTS = {
+    'status_effect': None,
+    'status_chance': 0,
+    'crit_rate': 0,
+    'multi_hit': [1, 1],
+    'recoil_percent': 0,
+    'priority': 0,
+    'stat_changes': None,
+    'stat_change_target': "self",
+    'stat_change_chance': 100,
+    'is_contact': True,
+}
+_CREATURE_DEFAULTS = {
+    'exp': 0,
+    'nickname': None,
+    'status': "none",
+    'status_turns': 0,
+    'is_shiny': False,
+}
+_EGG_DEFAULTS = {
+    'is_shiny': False,
+    'inherited_moves': [],
+    'steps_to_hatch': 1000,
+}
+
+
+def _fill(record: dict, defaults: dict) -> dict:
+    """Add missing fields to a record (copying mutable defaults)."""
+    for key, value in defaults.items():
+        if key not in record:
+            record[key] = value.copy() if isinstance(value, (dict, list)) else value
+    return record
+
+
+def _upgrade_move_v1(record: dict) -> dict:
+    """Fill a schema 1 move record (references need nothing)."""
+    if 'name' in record:
+        _fill(record, _MOVE_DEFAULTS)
+    return record
+
+
+def _upgrade_species_v1(record: dict) -> dict:
+    """Fill the moves of a schema 1 species record."""
+    for move in record.get('moves', []):
+        _upgrade_move_v1(move)
+    for move in (record.get('learnset') or {}).values():
+        _upgrade_move_v1(move)
+    return record
+
+
+def _upgrade_creature_v1(record: dict) -> dict:
+    """Fill a schema 1 creature record."""
+    _fill(record, _CREATURE_DEFAULTS)
+    for move in record.get('moves') or []:
+        _upgrade_move_v1(move)
+    return record
+
+
+def _upgrade_team_v1(record: dict) -> dict:
+    """Fill a schema 1 team record."""
+    record.setdefault('max_size', 6)
+    for creature in record['creatures']:
+        _upgrade_creature_v1(creature)
+    return record
+
+
+@migration(1)
+def _migrate_v1_to_v2(data: dict) -> None:
+    """Add every field that later releases added with a default."""
+    _fill(data, _STATE_DEFAULTS)
+    for species in data['species'].values():
+        _upgrade_species_v1(species)
+    _upgrade_team_v1(data.setdefault('player_team', {'creatures': []}))
+    for team in data['trainer_teams'].values():
+        _upgrade_team_v1(team)
+    # Stored creatures of sqlite saves arrive as JSON text
+    data['storage'] = [_upgrade_creature_v1(json_io.loads(record) if isinstance(record, str)
+                                            else record)
+                       for record in data['storage']]
+    for egg in data['breeding_eggs']:
+        _fill(egg, _EGG_DEFAULTS)
+        for move in egg['inherited_moves']:
+            _upgrade_move_v1(move)
+
+
+def fill_missing_fields(data: dict) -> dict:
+    """
+    Add defaults for top-level fields missing from current save data.
+
+    Used when recovering a damaged save whose lost sections must be
+    replaced by a fresh start (an empty team, no badges, ...).
+
+    Args:
+        data: Save dictionary of the current schema
+
+    Returns:
+        The dictionary, filled in place
+    """
+    _fill(data, _STATE_DEFAULTS)
+    data.setdefault('player_team', {'creatures': [], 'max_size': 6})
+    return data
+
+
+def upgrade_species_record(record: dict) -> dict:
+    """
+    Upgrade a species record from outside a save (a trade or export file).
+
+    Args:
+        record: Species dictionary of any schema version
+
+    Returns:
+        The record, upgraded in place
+    """
+    return _upgrade_species_v1(record)
+
+
+def upgrade_creature_record(record: dict) -> dict:
+    """
+    Upgrade a creature record from outside a save (a trade file).
+
+    Args:
+        record: Creature dictionary of any schema version
+
+    Returns:
+        The record, upgraded in place
+    """
+    return _upgrade_creature_v1(record)
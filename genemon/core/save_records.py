@@ -0,0 +1,278 @@
+"""
+Fixed-layout binary creature records.
+
+The binary save format stores the creature lists of the team and storage
+sections as struct-packed records instead of JSON objects: every creature
+record from Creature.to_dict() has the same keys, so spelling them out for
+each of thousands of stored creatures is most of the section's size.
+
+Packed section (before zlib compression):
+    marker (b'\\x01'), skeleton length (u32), skeleton (compact JSON),
+    creature table (one _CREATURE per creature), move table (one _MOVE per
+    move of the packed creatures, in creature order)
+
+The skeleton is {'part': the section dictionary with each packed list
+replaced by its length, 'packed': the key paths of those lists, 'strings':
+string table, 'extras': JSON values}. Strings (status, nicknames, TM IDs,
+move names and types) are stored once and referenced by index. Values that
+do not fit the layout go to 'extras', in creature order: the extra keys of
+a creature flagged _FLAG_EXTRAS (held items, full move dictionaries), or
+the whole record of a creature flagged _FLAG_JSON (missing fields, values
+out of range, records still encoded as JSON text). Decoding gives back
+records equal to the ones encoded.
+"""
+
+import struct
+from typing import Dict, List, Optional, Tuple
+
+from . import json_io
+
+
+# First byte of a packed section payload (JSON payloads start with '{')
+PACKED_MARKER = b'\x01'
+
+# Creature lists packed per section, as key paths from the section dictionary
+PACKED_LISTS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    'team': (('player_team', 'creatures'),),
+    'storage': (('storage',),),
+}
+
+# species_id, level, current_hp, max_hp, exp, status (string index),
+# status_turns, nickname (string index + 1, 0 for None), flags, move count
+_CREATURE = struct.Struct('>IHiiIHHHBB')
+# kind, key (species move index, learnset level or TM string index), pp,
+# name and type (string indices)
+_MOVE = struct.Struct('>BHHHH')
+_LENGTH = struct.Struct('>I')
+
+_FLAG_SHINY = 1
+_FLAG_EXTRAS = 2
+_FLAG_JSON = 4
+
+# Move kinds; full move dictionaries go to the creature's extras
+_MOVE_FULL = 0
+_MOVE_TM = 3
+_MOVE_KINDS = {'species_move': 1, 'learnset': 2, 'tm': _MOVE_TM}
+_MOVE_KEYS = {kind: key for key, kind in _MOVE_KINDS.items()}
+
+_CREATURE_KEYS = ('species_id', 'level', 'current_hp', 'max_hp', 'exp', 'nickname',
+                  'moves', 'status', 'status_turns', 'is_shiny')
+_JSON_RECORD = _CREATURE.pack(0, 0, 0, 0, 0, 0, 0, 0, _FLAG_JSON, 0)
+
+_U16 = 0xFFFF
+_U32 = 0xFFFFFFFF
+_I32 = 0x7FFFFFFF
+
+
+class _StringTable:
+    """Strings of a section, each stored once and referenced by index."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def index(self, text: str) -> Optional[int]:
+        """Get the index of a string, or None if the table is full."""
+        index = self._index.get(text)
+        if index is None:
+            if len(self.strings) >= _U16:
+                return None
+            index = self._index[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+
+def _is_int(value, low: int, high: int) -> bool:
+    """Check for an int (not bool) in [low, high]."""
+    return type(value) is int and low <= value <= high
+
+
+def _pack_move(move, strings: _StringTable) -> Optional[bytes]:
+    """Pack a move reference from Creature._move_record(), or None for full moves."""
+    if (type(move) is not dict or len(move) != 4 or not _is_int(move.get('pp'), 0, _U16) or
+            not isinstance(move.get('name'), str) or not isinstance(move.get('type'), str)):
+        return None
+    for key, value in move.items():
+        kind = _MOVE_KINDS.get(key)
+        if kind is None:
+            continue
+        if kind == _MOVE_TM:
+            value = strings.index(value) if isinstance(value, str) else None
+        name, move_type = strings.index(move['name']), strings.index(move['type'])
+        if not _is_int(value, 0, _U16) or name is None or move_type is None:
+            return None
+        return _MOVE.pack(kind, value, move['pp'], name, move_type)
+    return None
+
+
+def _pack_creature(record, strings: _StringTable, moves_out: List[bytes],
+                   extras_out: list) -> Optional[bytes]:
+    """
+    Pack a creature record, appending its moves and extras.
+
+    Returns:
+        The creature table entry, or None (nothing appended) if the record
+        does not fit the layout
+    """
+    if type(record) is not dict or any(key not in record for key in _CREATURE_KEYS):
+        return None
+    nickname, moves, status = record['nickname'], record['moves'], record['status']
+    if not (_is_int(record['species_id'], 0, _U32) and _is_int(record['level'], 0, _U16) and
+            _is_int(record['current_hp'], -_I32, _I32) and
+            _is_int(record['max_hp'], -_I32, _I32) and _is_int(record['exp'], 0, _U32) and
+            _is_int(record['status_turns'], 0, _U16) and type(record['is_shiny']) is bool and
+            isinstance(status, str) and (nickname is None or isinstance(nickname, str)) and
+            type(moves) is list and len(moves) <= 0xFF):
+        return None
+    status_index = strings.index(status)
+    nickname_index = 0 if nickname is None else strings.index(nickname)
+    if status_index is None or nickname_index is None:
+        return None
+
+    packed_moves = []
+    full_moves = []
+    for move in moves:
+        packed = _pack_move(move, strings)
+        if packed is None:
+            full_moves.append(move)
+            packed = _MOVE.pack(_MOVE_FULL, 0, 0, 0, 0)
+        packed_moves.append(packed)
+    extras = ({key: value for key, value in record.items() if key not in _CREATURE_KEYS}
+              if len(record) > len(_CREATURE_KEYS) else {})
+    if full_moves:
+        extras['moves'] = full_moves
+
+    moves_out.extend(packed_moves)
+    flags = _FLAG_SHINY if record['is_shiny'] else 0
+    if extras:
+        flags |= _FLAG_EXTRAS
+        extras_out.append(extras)
+    return _CREATURE.pack(
+        record['species_id'], record['level'], record['current_hp'], record['max_hp'],
+        record['exp'], status_index, record['status_turns'],
+        0 if nickname is None else nickname_index + 1, flags, len(moves)
+    )
+
+
+def _lookup(part: dict, path: Tuple[str, ...]):
+    """Get the value at a key path, or None if it is missing."""
+    value = part
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _replace(part: dict, path: Tuple[str, ...], value) -> dict:
+    """Copy the dictionaries along a key path, replacing the value at its end."""
+    if len(path) == 1:
+        return {**part, path[0]: value}
+    return {**part, path[0]: _replace(part[path[0]], path[1:], value)}
+
+
+def encode_packed_section(name: str, part: dict) -> Optional[bytes]:
+    """
+    Encode a section with its creature lists as fixed-layout records.
+
+    Args:
+        name: Section name (see save_codecs.SAVE_SECTIONS)
+        part: Section dictionary
+
+    Returns:
+        Packed payload (uncompressed), or None if the section has no
+        creature list to pack
+    """
+    paths = [path for path in PACKED_LISTS.get(name, ())
+             if type(_lookup(part, path)) is list]
+    if not paths:
+        return None
+    strings = _StringTable()
+    creatures: List[bytes] = []
+    moves: List[bytes] = []
+    extras: list = []
+    skeleton_part = part
+    for path in paths:
+        records = _lookup(part, path)
+        for record in records:
+            entry = _pack_creature(record, strings, moves, extras)
+            if entry is None:
+                entry = _JSON_RECORD
+                extras.append(record)
+            creatures.append(entry)
+        skeleton_part = _replace(skeleton_part, path, len(records))
+    skeleton = json_io.dumpb({'part': skeleton_part, 'packed': [list(p) for p in paths],
+                              'strings': strings.strings, 'extras': extras})
+    return b''.join([PACKED_MARKER, _LENGTH.pack(len(skeleton)), skeleton] + creatures + moves)
+
+
+def decode_packed_section(raw) -> dict:
+    """
+    Decode a payload from encode_packed_section().
+
+    Args:
+        raw: Uncompressed payload (bytes or memoryview)
+
+    Returns:
+        Section dictionary
+
+    Raises:
+        ValueError: If the payload is malformed
+    """
+    try:
+        (length,) = _LENGTH.unpack_from(raw, len(PACKED_MARKER))
+        pos = len(PACKED_MARKER) + _LENGTH.size
+        skeleton = json_io.loads(bytes(raw[pos:pos + length]))
+        pos += length
+        part, strings = skeleton['part'], skeleton['strings']
+        paths = [tuple(path) for path in skeleton['packed']]
+        counts = [_lookup(part, path) for path in paths]
+
+        end = pos + sum(counts) * _CREATURE.size
+        entries = list(_CREATURE.iter_unpack(raw[pos:end]))
+        moves = list(_MOVE.iter_unpack(raw[end:]))
+        if sum(entry[-1] for entry in entries) != len(moves):
+            raise ValueError("move table does not match the creatures")
+        extras = iter(skeleton['extras'])
+
+        records = []
+        move_pos = 0
+        for (species_id, level, current_hp, max_hp, exp, status, status_turns,
+             nickname, flags, move_count) in entries:
+            if flags & _FLAG_JSON:
+                records.append(next(extras))
+                continue
+            record_moves = [
+                None if kind == _MOVE_FULL else
+                {_MOVE_KEYS[kind]: strings[key] if kind == _MOVE_TM else key,
+                 'name': strings[name], 'type': strings[move_type], 'pp': pp}
+                for kind, key, pp, name, move_type in moves[move_pos:move_pos + move_count]
+            ]
+            move_pos += move_count
+            record = {
+                'species_id': species_id,
+                'level': level,
+                'current_hp': current_hp,
+                'max_hp': max_hp,
+                'exp': exp,
+                'nickname': strings[nickname - 1] if nickname else None,
+                'moves': record_moves,
+                'status': strings[status],
+                'status_turns': status_turns,
+                'is_shiny': bool(flags & _FLAG_SHINY),
+            }
+            if flags & _FLAG_EXTRAS:
+                extra = dict(next(extras))
+                full_moves = iter(extra.pop('moves', ()))
+                record['moves'] = [next(full_moves) if move is None else move
+                                   for move in record_moves]
+                record.update(extra)
+            records.append(record)
+
+        start = 0
+        for path, count in zip(paths, counts):
+            part = _replace(part, path, records[start:start + count])
+            start += count
+    except (struct.error, IndexError, KeyError, TypeError, StopIteration) as e:
+        raise ValueError(f"Malformed creature records: {e}")
+    return part
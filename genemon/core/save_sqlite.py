@@ -0,0 +1,548 @@
+"""
+SQLite save backend.
+
+Stores a save in a SQLite database (save_dir/<name>.db) instead of a single
+encoded file, so saves with very large storage boxes only write the rows
+that changed and storage can be searched with indexed SQL queries.
+
+Tables:
+    state          Remaining top-level save keys (JSON values)
+    species        Species by ID (JSON)
+    creatures      Team and storage creatures, one row each, with indexed
+                   species_id, level and is_shiny columns
+    items          Item counts by name
+    flags          Story flags by name (JSON values)
+    trainer_teams  Trainer teams by NPC ID (JSON)
+
+Stored creatures are read back as JSON text and only decoded when hydrated
+(see LazyCreatureList). The store remembers what it last wrote: creature
+records that are the same objects as last time (e.g. untouched storage) are
+skipped without being serialized; everything else is serialized and compared
+by BLAKE2b digest of the stored text.
+"""
+
+import bisect
+import hashlib
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import json_io
+from .exceptions import SaveFileCorruptedError
+
+
+SQLITE_EXTENSION = ".db"
+SQLITE_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS species (id INTEGER PRIMARY KEY, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS creatures (
+    id INTEGER PRIMARY KEY,
+    container TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    species_id INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    is_shiny INTEGER NOT NULL,
+    nickname TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS creatures_slot
+    ON creatures (container, position, species_id, level, is_shiny);
+CREATE INDEX IF NOT EXISTS creatures_species ON creatures (species_id);
+CREATE INDEX IF NOT EXISTS creatures_level ON creatures (level);
+CREATE INDEX IF NOT EXISTS creatures_shiny ON creatures (is_shiny);
+CREATE TABLE IF NOT EXISTS items (name TEXT PRIMARY KEY, count INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS flags (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS trainer_teams (npc_id TEXT PRIMARY KEY, data TEXT NOT NULL);
+"""
+
+# Keyed tables: save key -> (table, key column, value column)
+_KEYED_TABLES = {
+    'species': ('species', 'id', 'data'),
+    'items': ('items', 'name', 'count'),
+    'flags': ('flags', 'name', 'value'),
+    'trainer_teams': ('trainer_teams', 'npc_id', 'data'),
+}
+
+# Spacing of creature sort positions
+POSITION_GAP = 1024
+
+# Creature containers, in load order
+TEAM = "team"
+STORAGE = "storage"
+
+# Internal state keys
+_SCHEMA_KEY = "__schema__"
+_TEAM_SIZE_KEY = "__team_max_size__"
+
+
+def _dumps(value) -> str:
+    """Encode a value as compact JSON."""
+    return json_io.dumps(value)
+
+
+def _digest(value) -> bytes:
+    """Digest of a stored column value, for detecting changed rows."""
+    text = value if isinstance(value, str) else repr(value)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SqliteSaveStore:
+    """A save stored in a SQLite database."""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) a save database.
+
+        Args:
+            path: Database file path
+
+        Raises:
+            SaveFileCorruptedError: If the file is not a save database
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        try:
+            # Writes may come from the background save writer thread
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+                row = self._conn.execute(
+                    "SELECT value FROM state WHERE key = ?", (_SCHEMA_KEY,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("INSERT INTO state VALUES (?, ?)",
+                                       (_SCHEMA_KEY, str(SQLITE_SCHEMA_VERSION)))
+                elif row[0] != str(SQLITE_SCHEMA_VERSION):
+                    raise SaveFileCorruptedError(f"Unsupported save database schema {row[0]}")
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Invalid save database: {e}")
+        self._reset_index()
+
+    def _reset_index(self) -> None:
+        """Forget what was last written; it is re-read before the next write."""
+        self._indexed = False
+        # PRAGMA data_version when indexed; changes when another connection writes
+        self._data_version = None
+        # table -> key -> digest of the stored value
+        self._keyed: Dict[str, Dict[Any, bytes]] = {}
+        # rowid -> [record object or None, container, position, digest of data]
+        self._rows: Dict[int, list] = {}
+        # id(record) -> rowid, for records written or loaded by this store
+        self._row_by_record: Dict[int, int] = {}
+        # container -> rowids in order
+        self._order: Dict[str, List[int]] = {}
+
+    def _remember_record(self, rowid: int, record: Optional[dict]) -> None:
+        """Point a creature row at the record object it now holds."""
+        row = self._rows[rowid]
+        if row[0] is not None and self._row_by_record.get(id(row[0])) == rowid:
+            del self._row_by_record[id(row[0])]
+        row[0] = record
+        if record is not None:
+            self._row_by_record[id(record)] = rowid
+
+    def _load_index(self) -> None:
+        """Read the digests of the stored rows (when writing before any read)."""
+        self._reset_index()
+        for table, key_column, value_column in _KEYED_TABLES.values():
+            self._keyed[table] = {
+                key: _digest(value) for key, value in
+                self._conn.execute(f"SELECT {key_column}, {value_column} FROM {table}")
+            }
+        self._keyed['state'] = {
+            key: _digest(value) for key, value in self._conn.execute("SELECT key, value FROM state")
+        }
+        for rowid, container, position, data in self._conn.execute(
+                "SELECT id, container, position, data FROM creatures ORDER BY container, position"):
+            self._rows[rowid] = [None, container, position, _digest(data)]
+            self._order.setdefault(container, []).append(rowid)
+        self._mark_indexed()
+
+    def _mark_indexed(self) -> None:
+        """Record that the index matches the database as of now."""
+        self._indexed = True
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _index_is_current(self) -> bool:
+        """Check that no other connection wrote since the index was built."""
+        return (self._indexed and
+                self._conn.execute("PRAGMA data_version").fetchone()[0] == self._data_version)
+
+    def read(self) -> dict:
+        """
+        Read the whole save.
+
+        Returns:
+            Save dictionary, as written by write(), except that stored
+            creatures are JSON text records
+
+        Raises:
+            SaveFileCorruptedError: If the database cannot be read
+        """
+        with self._lock:
+            try:
+                return self._read()
+            except (sqlite3.DatabaseError, ValueError) as e:
+                self._reset_index()
+                raise SaveFileCorruptedError(f"Invalid save database: {e}")
+
+    def _read(self) -> dict:
+        self._reset_index()
+        conn = self._conn
+        data = {}
+        state_digests = {}
+        for key, value in conn.execute("SELECT key, value FROM state"):
+            state_digests[key] = _digest(value)
+            if key != _SCHEMA_KEY:
+                data[key] = json_io.loads(value)
+        self._keyed['state'] = state_digests
+        team_size = data.pop(_TEAM_SIZE_KEY, 6)
+
+        for save_key, (table, key_column, value_column) in _KEYED_TABLES.items():
+            values = {}
+            digests = {}
+            for key, value in conn.execute(f"SELECT {key_column}, {value_column} FROM {table}"):
+                digests[key] = _digest(value)
+                values[str(key)] = json_io.loads(value) if isinstance(value, str) else value
+            self._keyed[table] = digests
+            data[save_key] = values
+
+        containers = {TEAM: [], STORAGE: []}
+        for rowid, container, position, text in conn.execute(
+                "SELECT id, container, position, data FROM creatures ORDER BY container, position"):
+            # Storage stays JSON text until hydrated; the team is always loaded
+            record = json_io.loads(text) if container == TEAM else text
+            containers.setdefault(container, []).append(record)
+            self._rows[rowid] = [record, container, position, _digest(text)]
+            self._row_by_record[id(record)] = rowid
+            self._order.setdefault(container, []).append(rowid)
+        data['player_team'] = {'creatures': containers[TEAM], 'max_size': team_size}
+        data['storage'] = containers[STORAGE]
+
+        self._mark_indexed()
+        return data
+
+    def write(self, data: dict) -> int:
+        """
+        Write a save, touching only rows that changed.
+
+        Args:
+            data: Save dictionary (from GameState.to_dict())
+
+        Returns:
+            Number of rows inserted, updated or deleted
+        """
+        with self._lock:
+            if not self._index_is_current():
+                self._load_index()
+            try:
+                with self._conn:
+                    return self._write(data)
+            except BaseException:
+                self._reset_index()  # The transaction was rolled back
+                raise
+
+    def _write(self, data: dict) -> int:
+        conn = self._conn
+        changes = 0
+        state = {}
+        for key, value in data.items():
+            if key in _KEYED_TABLES or key in ('player_team', 'storage'):
+                continue
+            state[key] = _dumps(value)
+        team = data.get('player_team', {})
+        state[_TEAM_SIZE_KEY] = _dumps(team.get('max_size', 6))
+        state[_SCHEMA_KEY] = str(SQLITE_SCHEMA_VERSION)
+        changes += self._sync_keyed('state', 'key', 'value', state)
+
+        for save_key, (table, key_column, value_column) in _KEYED_TABLES.items():
+            values = data.get(save_key, {})
+            if table == 'species':
+                rows = {int(k): _dumps(v) for k, v in values.items()}
+            elif table == 'items':
+                rows = dict(values)
+            else:
+                rows = {k: _dumps(v) for k, v in values.items()}
+            changes += self._sync_keyed(table, key_column, value_column, rows)
+
+        changes += self._sync_creatures(conn, [
+            (TEAM, team.get('creatures', [])),
+            (STORAGE, data.get('storage', [])),
+        ])
+        return changes
+
+    def _sync_keyed(self, table: str, key_column: str, value_column: str,
+                    rows: Dict[Any, Any]) -> int:
+        """Write the changed rows of a key/value table."""
+        previous = self._keyed.setdefault(table, {})
+        changed = [(key, value) for key, value in rows.items()
+                   if previous.get(key) != _digest(value)]
+        deleted = [(key,) for key in previous if key not in rows]
+        if changed:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({key_column}, {value_column}) VALUES (?, ?)",
+                changed
+            )
+        if deleted:
+            self._conn.executemany(f"DELETE FROM {table} WHERE {key_column} = ?", deleted)
+        self._keyed[table] = {key: _digest(value) for key, value in rows.items()}
+        return len(changed) + len(deleted)
+
+    def _sync_creatures(self, conn, containers: List[Tuple[str, list]]) -> int:
+        """Write the changed creature rows."""
+        rows = self._rows
+        claimed = set()
+        plans = []
+
+        # Records already stored by this store are matched by identity
+        for container, records in containers:
+            matched = []
+            for record in records:
+                rowid = self._row_by_record.get(id(record))
+                row = rows.get(rowid)
+                if row is not None and row[0] is record and rowid not in claimed:
+                    claimed.add(rowid)
+                    matched.append(rowid)
+                else:
+                    matched.append(None)
+            plans.append((container, records, matched))
+
+        # Other records are matched by content, so they are not rewritten
+        # when they move; changed records reuse the row previously at their
+        # index, and the rest are inserted
+        unmatched = []
+        by_digest: Dict[bytes, List[int]] = {}
+        for order in self._order.values():
+            # Reversed, so pop() hands out equal records in their old order
+            for rowid in reversed(order):
+                if rowid not in claimed:
+                    by_digest.setdefault(rows[rowid][3], []).append(rowid)
+        for container, records, matched in plans:
+            for i, rowid in enumerate(matched):
+                if rowid is not None:
+                    continue
+                original = records[i]
+                text = original if isinstance(original, str) else _dumps(original)
+                digest = _digest(text)
+                candidates = by_digest.get(digest)
+                while candidates and candidates[-1] in claimed:
+                    candidates.pop()
+                if candidates:
+                    rowid = candidates.pop()
+                    claimed.add(rowid)
+                    matched[i] = rowid
+                    self._remember_record(rowid, original)
+                else:
+                    unmatched.append((container, records, matched, i, text, digest))
+
+        updated = []
+        inserted = []
+        next_rowid = max(rows, default=0) + 1
+        for container, records, matched, i, text, digest in unmatched:
+            original = records[i]
+            previous_order = self._order.get(container, [])
+            rowid = previous_order[i] if i < len(previous_order) else None
+            if rowid is not None and rowid not in claimed:
+                rows[rowid][3] = digest
+                updated.append(self._creature_columns(original, text) + (rowid,))
+            else:
+                rowid = next_rowid
+                next_rowid += 1
+                rows[rowid] = [None, container, None, digest]
+                inserted.append([rowid, container, None] +
+                                list(self._creature_columns(original, text)))
+            claimed.add(rowid)
+            matched[i] = rowid
+            self._remember_record(rowid, original)
+
+        deleted = [rowid for rowid in rows if rowid not in claimed]
+        for rowid in deleted:
+            self._remember_record(rowid, None)
+            del rows[rowid]
+
+        # Positions are sort keys with gaps, so removing or inserting a
+        # creature does not renumber the rest of the box
+        moved = []
+        for container, _, matched in plans:
+            for rowid, position in self._assign_positions(container, matched):
+                row = rows[rowid]
+                if row[2] is not None:
+                    moved.append((container, position, rowid))
+                row[1], row[2] = container, position
+            self._order[container] = matched
+        for row in inserted:
+            row[2] = rows[row[0]][2]
+
+        if deleted:
+            conn.executemany("DELETE FROM creatures WHERE id = ?", [(r,) for r in deleted])
+        if moved:
+            conn.executemany("UPDATE creatures SET container = ?, position = ? WHERE id = ?", moved)
+        if updated:
+            conn.executemany(
+                "UPDATE creatures SET species_id = ?, level = ?, is_shiny = ?, nickname = ?, "
+                "data = ? WHERE id = ?", updated
+            )
+        if inserted:
+            conn.executemany("INSERT INTO creatures VALUES (?, ?, ?, ?, ?, ?, ?, ?)", inserted)
+        return len(deleted) + len(moved) + len(updated) + len(inserted)
+
+    @staticmethod
+    def _creature_columns(record, text: str) -> tuple:
+        """Get the indexed columns and data of a creature row."""
+        if isinstance(record, str):
+            record = json_io.loads(text)
+        return (record['species_id'], record.get('level', 1),
+                int(bool(record.get('is_shiny'))), record.get('nickname'), text)
+
+    def _assign_positions(self, container: str, order: List[int]) -> List[Tuple[int, int]]:
+        """
+        Choose sort positions for rows in the given order.
+
+        The longest run of rows whose existing positions already increase
+        keeps them; the others get positions between their neighbours. The
+        container is renumbered only when a gap is too small.
+
+        Returns:
+            List of (rowid, new position) for rows that need one
+        """
+        rows = self._rows
+        keep = [False] * len(order)
+        # Longest increasing subsequence of existing positions (patience sorting)
+        tails: List[int] = []      # smallest tail position of each run length
+        tail_index: List[int] = []  # index in order of that tail
+        previous = [-1] * len(order)
+        for i, rowid in enumerate(order):
+            row = rows[rowid]
+            if row[1] != container or row[2] is None:
+                continue
+            length = bisect.bisect_left(tails, row[2])
+            if length == len(tails):
+                tails.append(row[2])
+                tail_index.append(i)
+            else:
+                tails[length] = row[2]
+                tail_index[length] = i
+            previous[i] = tail_index[length - 1] if length else -1
+        i = tail_index[-1] if tail_index else -1
+        while i >= 0:
+            keep[i] = True
+            i = previous[i]
+
+        changes = []
+        i = 0
+        while i < len(order):
+            if keep[i]:
+                i += 1
+                continue
+            start = i
+            while i < len(order) and not keep[i]:
+                i += 1
+            count = i - start
+            low = rows[order[start - 1]][2] if start > 0 else None
+            high = rows[order[i]][2] if i < len(order) else None
+            if low is None and high is None:
+                low, step = 0, POSITION_GAP
+            elif high is None:
+                step = POSITION_GAP
+            elif low is None:
+                low, step = high - (count + 1) * POSITION_GAP, POSITION_GAP
+            else:
+                step = (high - low) // (count + 1)
+                if step < 1:
+                    return [(rowid, n * POSITION_GAP) for n, rowid in enumerate(order)]
+            changes.extend((order[start + n], low + (n + 1) * step) for n in range(count))
+        return changes
+
+    @staticmethod
+    def _filters(species_id: Optional[int], min_level: Optional[int],
+                 max_level: Optional[int], shiny: Optional[bool]) -> Tuple[List[str], List[Any]]:
+        """Build SQL conditions for creature filters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if species_id is not None:
+            clauses.append("species_id = ?")
+            params.append(species_id)
+        if min_level is not None:
+            clauses.append("level >= ?")
+            params.append(min_level)
+        if max_level is not None:
+            clauses.append("level <= ?")
+            params.append(max_level)
+        if shiny is not None:
+            clauses.append("is_shiny = ?")
+            params.append(int(shiny))
+        return clauses, params
+
+    def query_creatures(self, container: str = STORAGE, species_id: Optional[int] = None,
+                        min_level: Optional[int] = None, max_level: Optional[int] = None,
+                        shiny: Optional[bool] = None,
+                        limit: Optional[int] = None) -> List[Tuple[int, dict]]:
+        """
+        Find stored creatures with an indexed query.
+
+        Args:
+            container: "storage" or "team"
+            species_id: Only this species
+            min_level: Minimum level (inclusive)
+            max_level: Maximum level (inclusive)
+            shiny: Only shiny (True) or non-shiny (False) creatures
+            limit: Maximum number of results
+
+        Returns:
+            List of (index in the container, creature record), in order
+        """
+        clauses, params = self._filters(species_id, min_level, max_level, shiny)
+        # Rank every row of the container (from the covering slot index),
+        # then fetch data only for the rows that match
+        sql = (
+            "SELECT ranked.idx, creatures.data FROM ("
+            "SELECT id, species_id, level, is_shiny, "
+            "ROW_NUMBER() OVER (ORDER BY position) - 1 AS idx "
+            "FROM creatures WHERE container = ?) AS ranked "
+            "JOIN creatures ON creatures.id = ranked.id"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(f"ranked.{clause}" for clause in clauses)
+        sql += " ORDER BY ranked.idx"
+        params = [container] + params
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [(index, json_io.loads(text))
+                    for index, text in self._conn.execute(sql, params)]
+
+    def count_creatures(self, container: str = STORAGE, species_id: Optional[int] = None,
+                        min_level: Optional[int] = None, max_level: Optional[int] = None,
+                        shiny: Optional[bool] = None) -> int:
+        """Count the creatures in a container matching the given filters."""
+        clauses, params = self._filters(species_id, min_level, max_level, shiny)
+        sql = "SELECT COUNT(*) FROM creatures WHERE " + " AND ".join(["container = ?"] + clauses)
+        with self._lock:
+            return self._conn.execute(sql, [container] + params).fetchone()[0]
+
+    def verify(self) -> List[str]:
+        """
+        Check the database's integrity (PRAGMA quick_check).
+
+        Returns:
+            Problems found (empty if the database is intact)
+        """
+        with self._lock:
+            try:
+                problems = [row[0] for row in self._conn.execute("PRAGMA quick_check")]
+            except sqlite3.DatabaseError as e:
+                return [str(e)]
+        return [] if problems == ["ok"] else problems
+
+    def vacuum(self) -> None:
+        """Rebuild the database file, reclaiming space left by deleted rows."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
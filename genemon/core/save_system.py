@@ -2,23 +2,99 @@
 Save and load game state system.
 """
 
-import json
+import copy
 import os
-from typing import Optional, Dict, List
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Callable, Optional, Dict, List, Collection, Set, Tuple
 from datetime import datetime
+from . import json_io
 from .creature import Team, CreatureSpecies, Creature, Badge
-from ..creatures.generator import CreatureGenerator
-from ..sprites.generator import SpriteGenerator
+from .save_journal import (
+    DEFAULT_JOURNAL_COMPACT_BYTES, JOURNAL_EXTENSION, JOURNAL_ID_KEY,
+    SaveJournal, apply_save_delta, diff_save_data
+)
+from .save_backups import SaveBackups
+from .save_manifest import SaveManifest, file_signature, summarize_save
+from .save_migrations import (
+    SAVE_SCHEMA_VERSION, fill_missing_fields, migrate_save_data, schema_version,
+    upgrade_species_record
+)
+from .save_writer import BackgroundSaveWriter, atomic_write
+from .storage import PagedStorage, creature_records, storage_box_sizes
+from .save_codecs import (
+    DEFAULT_SAVE_CODEC, SAVE_EXTENSIONS, SAVE_SECTIONS, BinaryCodec, MappedBinarySave, SaveCodec,
+    detect_codec, get_codec, load_save_data, recover_save_data, verify_save_data
+)
+from .exceptions import SaveFileCorruptedError
+from .save_sqlite import SQLITE_EXTENSION, SqliteSaveStore
+from ..creatures.roster import (
+    GENERATOR_VERSION, RosterCache, determine_archetype, sprite_pack_seed
+)
+from ..sprites.store import SpriteStore, SPRITE_REFS_KEY
 from .breeding import BreedingCenter, Egg
 
 
+# Save backends: "file" writes one encoded file per save (see save_codecs),
+# "sqlite" a database per save (see save_sqlite)
+SAVE_BACKENDS = ("file", "sqlite")
+
+# Extensions of saves written by any backend
+ALL_SAVE_EXTENSIONS = SAVE_EXTENSIONS + (SQLITE_EXTENSION,)
+
+# Operations of SaveManager.maintain_save()
+MAINTENANCE_OPERATIONS = ("validate", "migrate", "recode", "compact")
+
+# Sections of a game state tracked for unsaved changes
+DIRTY_SECTIONS = ('position', 'team', 'storage', 'items', 'flags', 'progress', 'trainers',
+                  'breeding')
+
+# Save sections (see save_codecs.SAVE_SECTIONS) that a state loaded from a
+# binary save decodes on first access, with the attributes they set
+DEFERRABLE_SECTIONS = {
+    'storage': ('storage',),
+    'trainers': ('trainer_teams', 'defeated_trainers'),
+    'pokedex': ('pokedex_seen', 'pokedex_caught'),
+}
+
+# Attributes whose reassignment marks a section dirty. In-place changes
+# (e.g. items['potion'] -= 1) must be reported with GameState.mark_dirty().
+_TRACKED_ATTRIBUTES = {
+    'current_location': 'position',
+    'player_x': 'position',
+    'player_y': 'position',
+    'player_team': 'team',
+    'storage': 'storage',
+    'items': 'items',
+    'money': 'items',
+    'flags': 'flags',
+    'badges': 'progress',
+    'defeated_trainers': 'progress',
+    'pokedex_seen': 'progress',
+    'pokedex_caught': 'progress',
+    'trainer_teams': 'trainers',
+    'breeding_center': 'breeding',
+}
+
+
 class GameState:
     """
     Complete game state for a save file.
+
+    Tracks which sections changed since the last save (see mark_dirty()),
+    so autosaves can be skipped when nothing changed.
+
+    A state loaded with deferred sections (see from_dict()) decodes them the
+    first time one of their attributes is read or assigned.
     """
 
     def __init__(self):
         """Initialize a new game state."""
+        self._dirty = set()
+        # attribute -> (section, loader) of sections not decoded yet
+        self._deferred: Dict[str, Tuple[str, Callable[[], dict]]] = {}
         self.save_name: str = "default"
         self.player_name: str = "Player"
         self.play_time: int = 0  # In seconds
@@ -32,7 +108,7 @@ class GameState:
 
         # Player's team and storage
         self.player_team: Team = Team()
-        self.storage: list = []  # Stored creatures
+        self.storage: PagedStorage = PagedStorage()  # Stored creatures, in boxes
 
         # Game progress flags
         self.badges: List[Badge] = []  # List of Badge objects
@@ -55,10 +131,116 @@ class GameState:
         # Breeding center
         self.breeding_center: BreedingCenter = BreedingCenter()
 
-    def to_dict(self) -> dict:
-        """Serialize game state to dictionary."""
+        # Fingerprint of the seed's roster once species_dict is known to match it
+        self.roster_fingerprint: Optional[str] = None
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set yet, i.e. of deferred sections,
+        # which are checked against their CRCs only now
+        deferred = self.__dict__.get('_deferred')
+        if deferred and name in deferred:
+            self.load_deferred(deferred[name][0])
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__.get('_deferred', ()):
+            # Decode the whole section first, so its other attributes stay consistent
+            self.load_deferred(self._deferred[name][0])
+        super().__setattr__(name, value)
+        section = _TRACKED_ATTRIBUTES.get(name)
+        if section is not None:
+            self._dirty.add(section)
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether anything changed since the last save."""
+        return bool(self._dirty)
+
+    @property
+    def dirty_sections(self) -> frozenset:
+        """Sections changed since the last save."""
+        return frozenset(self._dirty)
+
+    def mark_dirty(self, *sections: str) -> None:
+        """
+        Record unsaved changes.
+
+        Args:
+            sections: Changed sections from DIRTY_SECTIONS (default: all)
+
+        Raises:
+            ValueError: If a section is unknown
+        """
+        unknown = set(sections) - set(DIRTY_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown state sections: {', '.join(sorted(unknown))}")
+        self._dirty.update(sections or DIRTY_SECTIONS)
+
+    @property
+    def deferred_sections(self) -> frozenset:
+        """Sections not decoded yet."""
+        return frozenset(section for section, _ in self._deferred.values())
+
+    def load_deferred(self, *sections: str) -> None:
+        """
+        Decode deferred sections now.
+
+        Args:
+            sections: Sections to decode (default: all deferred sections)
+
+        Raises:
+            SaveFileCorruptedError: If a section cannot be decoded
+        """
+        for section in sections or self.deferred_sections:
+            loaders = [loader for s, loader in self._deferred.values() if s == section]
+            if not loaders:
+                continue
+            data = loaders[0]()
+            for attribute in DEFERRABLE_SECTIONS[section]:
+                del self._deferred[attribute]
+            dirty = set(self._dirty)
+            self._apply_section(section, data)
+            self._dirty = dirty  # Decoding is not a change
+
+    def _apply_section(self, section: str, data: dict) -> None:
+        """Set the attributes of a deferrable section from save data."""
+        if section == 'storage':
+            # Stored creatures are hydrated when their box is first accessed
+            self.storage = PagedStorage(data['storage'], self.species_dict,
+                                        box_sizes=data.get('storage_boxes'))
+        elif section == 'trainers':
+            self.defeated_trainers = data['defeated_trainers']
+            self.trainer_teams = {
+                npc_id: Team.from_dict(team_data, self.species_dict)
+                for npc_id, team_data in data['trainer_teams'].items()
+            }
+        elif section == 'pokedex':
+            self.pokedex_seen = set(data['pokedex_seen'])
+            self.pokedex_caught = set(data['pokedex_caught'])
+
+    def clear_dirty(self) -> frozenset:
+        """
+        Mark the state as saved.
+
+        Returns:
+            The sections that were dirty
+        """
+        sections, self._dirty = frozenset(self._dirty), set()
+        return sections
+
+    def to_dict(self, skip_species: Collection[int] = (), raw_records: bool = False) -> dict:
+        """
+        Serialize game state to dictionary.
+
+        Args:
+            skip_species: Species IDs to leave out of 'species' (e.g. species
+                regenerated from the seed on load)
+            raw_records: Leave stored creatures loaded as JSON text (from a
+                sqlite save) encoded, for writing back to the same backend
+        """
         return {
-            'version': '0.1.0',
+            'version': SAVE_SCHEMA_VERSION,
             'save_name': self.save_name,
             'player_name': self.player_name,
             'play_time': self.play_time,
@@ -69,95 +251,243 @@ class GameState:
             'species': {
                 str(k): v.to_dict()
                 for k, v in self.species_dict.items()
+                if k not in skip_species
             },
-            'player_team': self.player_team.to_dict(),
-            'storage': [c.to_dict() for c in self.storage],
+            'player_team': self.player_team.to_dict(self.species_dict),
+            'storage': creature_records(self.storage, raw=raw_records,
+                                        species_dict=self.species_dict),
+            'storage_boxes': storage_box_sizes(self.storage),
             'badges': [b.to_dict() for b in self.badges],
-            'flags': self.flags,
-            'defeated_trainers': self.defeated_trainers,
+            'flags': dict(self.flags),
+            'defeated_trainers': list(self.defeated_trainers),
             'pokedex_seen': list(self.pokedex_seen),
             'pokedex_caught': list(self.pokedex_caught),
             'trainer_teams': {
-                npc_id: team.to_dict()
+                npc_id: team.to_dict(self.species_dict)
                 for npc_id, team in self.trainer_teams.items()
             },
-            'items': self.items,
+            'items': dict(self.items),
             'money': self.money,
             'breeding_eggs': [egg.to_dict() for egg in self.breeding_center.eggs]
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> 'GameState':
-        """Deserialize game state from dictionary."""
+    def from_dict(cls, data: dict,
+                  species_dict: Optional[Dict[int, CreatureSpecies]] = None,
+                  loaders: Optional[Dict[str, Callable[[], dict]]] = None) -> 'GameState':
+        """
+        Deserialize game state from dictionary.
+
+        Args:
+            data: Dictionary from to_dict(), of any schema version (older
+                data is upgraded in place first)
+            species_dict: Base species (e.g. the regenerated roster); species
+                stored in data are added on top
+            loaders: Sections of DEFERRABLE_SECTIONS to decode on first
+                access instead, each with a function returning its save data
+                (of the current schema; data then need not hold its keys)
+
+        Raises:
+            SaveFileVersionError: If the data is from a newer version of the game
+        """
+        migrate_save_data(data)
         state = cls()
 
-        state.save_name = data.get('save_name', 'default')
-        state.player_name = data.get('player_name', 'Player')
-        state.play_time = data.get('play_time', 0)
-        state.current_location = data.get('current_location', 'town_starter')
-        state.player_x = data.get('player_x', 10)
-        state.player_y = data.get('player_y', 10)
-        state.seed = data.get('seed', 0)
+        state.save_name = data['save_name']
+        state.player_name = data['player_name']
+        state.play_time = data['play_time']
+        state.current_location = data['current_location']
+        state.player_x = data['player_x']
+        state.player_y = data['player_y']
+        state.seed = data['seed']
 
         # Reconstruct species dictionary
-        species_data = data.get('species', {})
-        state.species_dict = {
-            int(k): CreatureSpecies.from_dict(v)
+        species_data = data['species']
+        state.species_dict = dict(species_dict) if species_dict else {}
+        state.species_dict.update(
+            (int(k), CreatureSpecies.from_dict(v))
             for k, v in species_data.items()
-        }
+        )
 
         # Reconstruct team
-        team_data = data.get('player_team', {'creatures': []})
-        state.player_team = Team.from_dict(team_data, state.species_dict)
-
-        # Reconstruct storage
-        storage_data = data.get('storage', [])
-        for creature_data in storage_data:
-            species = state.species_dict[creature_data['species_id']]
-            creature = Creature.from_dict(creature_data, species)
-            state.storage.append(creature)
+        state.player_team = Team.from_dict(data['player_team'], state.species_dict)
 
         # Game progress
-        badge_data = data.get('badges', [])
         state.badges = [Badge.from_dict(b) if isinstance(b, dict) else b
-                       for b in badge_data]
-        state.flags = data.get('flags', {})
-        state.defeated_trainers = data.get('defeated_trainers', [])
-        state.pokedex_seen = set(data.get('pokedex_seen', []))
-        state.pokedex_caught = set(data.get('pokedex_caught', []))
-
-        # Reconstruct trainer teams
-        trainer_teams_data = data.get('trainer_teams', {})
-        state.trainer_teams = {
-            npc_id: Team.from_dict(team_data, state.species_dict)
-            for npc_id, team_data in trainer_teams_data.items()
-        }
-
-        state.items = data.get('items', {"potion": 5, "ether": 3, "capture_ball": 10})
-        state.money = data.get('money', 1000)
+                       for b in data['badges']]
+        state.flags = data['flags']
+
+        # Storage, trainer teams and pokedex, now or on first access
+        loaders = loaders or {}
+        for section, attributes in DEFERRABLE_SECTIONS.items():
+            if section not in loaders:
+                state._apply_section(section, data)
+                continue
+            for attribute in attributes:
+                del state.__dict__[attribute]
+                state._deferred[attribute] = (section, loaders[section])
+
+        state.items = data['items']
+        state.money = data['money']
 
         # Reconstruct breeding center eggs
-        breeding_eggs_data = data.get('breeding_eggs', [])
-        for egg_data in breeding_eggs_data:
+        for egg_data in data['breeding_eggs']:
             species = state.species_dict[egg_data['species_id']]
             egg = Egg.from_dict(egg_data, species)
             state.breeding_center.eggs.append(egg)
 
+        state.clear_dirty()
         return state
 
 
 class SaveManager:
     """Manages saving and loading game states."""
 
-    def __init__(self, save_dir: str = "saves"):
+    def __init__(self, save_dir: str = "saves", use_sprite_store: bool = True,
+                 seed_only_species: bool = False, codec: str = DEFAULT_SAVE_CODEC,
+                 journal: bool = False,
+                 journal_compact_bytes: int = DEFAULT_JOURNAL_COMPACT_BYTES,
+                 backend: str = "file", verbose: bool = True, backups: int = 0):
         """
         Initialize save manager.
 
         Args:
             save_dir: Directory to store save files
+            use_sprite_store: If True, sprites are kept once in a shared
+                content-addressed store (save_dir/sprites) and saves only
+                reference them by digest
+            seed_only_species: If True, species generated from the seed are
+                not written to saves; a roster reference (generator version
+                and fingerprint) is stored instead and the species are
+                regenerated on load (with sprites read from a per-seed sprite
+                pack under save_dir/sprites/packs, written by managers in
+                this mode; delete_save() removes packs no save uses)
+            codec: Save file format ("json", "compact", "zlib", "gzip" or
+                "binary"); saves in any format are detected when loading
+            journal: If True, saves after the first append only the changes
+                since the previous save to save_dir/<name>.journal
+            journal_compact_bytes: Journal size at which the next save is
+                written as a fresh snapshot instead
+            backend: "file" (one file per save, in the codec's format) or
+                "sqlite" (a database per save that only rewrites changed rows
+                and supports query_storage(); codec and journal are unused)
+            verbose: If False, only errors are printed (no "Game saved to ..."
+                messages)
+            backups: Previous versions kept per save under save_dir/backups
+                (0 keeps none); unchanged sections are stored only once
+
+        Raises:
+            ValueError: If the codec or backend is unknown
         """
+        if backend not in SAVE_BACKENDS:
+            raise ValueError(f"Unknown save backend '{backend}' (available: {', '.join(SAVE_BACKENDS)})")
         self.save_dir = save_dir
         os.makedirs(save_dir, exist_ok=True)
+        self.sprite_store: Optional[SpriteStore] = (
+            SpriteStore(os.path.join(save_dir, "sprites")) if use_sprite_store else None
+        )
+        self.seed_only_species = seed_only_species
+        self.codec = get_codec(codec)
+        self.journal = journal
+        self.journal_compact_bytes = journal_compact_bytes
+        self.backend = backend
+        self.verbose = verbose
+        # save_name -> open database of sqlite saves
+        self._sqlite_stores: Dict[str, SqliteSaveStore] = {}
+        # save_name -> data as last persisted (snapshot + journal), for diffs
+        self._journal_bases: Dict[str, dict] = {}
+        # Serializes writes from save_game() and the background writer
+        self._write_lock = threading.RLock()
+        self._writer: Optional[BackgroundSaveWriter] = None
+        self.manifest = SaveManifest(save_dir)
+        self.backups: Optional[SaveBackups] = (
+            SaveBackups(os.path.join(save_dir, "backups"), keep=backups) if backups else None
+        )
+        self.pack_dir = os.path.join(save_dir, "sprites", "packs")
+        self.roster_cache = RosterCache(
+            pack_dir=self.pack_dir if use_sprite_store and seed_only_species else None
+        )
+
+    def _log(self, message: str) -> None:
+        """Print a status message unless the manager is quiet."""
+        if self.verbose:
+            print(message)
+
+    def _externalize_sprites(self, data: dict) -> None:
+        """Move embedded species sprites into the sprite store."""
+        if self.sprite_store is None:
+            return
+        for species_data in data.get('species', {}).values():
+            self.sprite_store.externalize_species(species_data)
+
+    def _get_save_path(self, save_name: str) -> str:
+        """
+        Get the path of a save file.
+
+        Returns the existing file for save_name in any format, preferring
+        the current backend and codec's extension, or the path they would
+        write if no file exists.
+        """
+        extension = SQLITE_EXTENSION if self.backend == "sqlite" else self.codec.extension
+        preferred = os.path.join(self.save_dir, save_name + extension)
+        if os.path.exists(preferred):
+            return preferred
+        for extension in ALL_SAVE_EXTENSIONS:
+            path = os.path.join(self.save_dir, save_name + extension)
+            if os.path.exists(path):
+                return path
+        return preferred
+
+    def _seed_roster_ids(self, state: GameState) -> Collection[int]:
+        """
+        Get the species IDs that can be regenerated from the state's seed.
+
+        Returns an empty collection if the state's species differ from the
+        seed's roster (e.g. a save from an older generator version), in which
+        case every species must be written out.
+        """
+        if not self.seed_only_species:
+            return ()
+        # Species can be edited in place after loading, so compare every save
+        if not self.roster_cache.matches(state.seed, state.species_dict):
+            return ()
+        state.roster_fingerprint = self.roster_cache.fingerprint(state.seed)
+        return self.roster_cache.ids(state.seed)
+
+    def _load_roster(self, data: dict) -> Optional[Dict[int, CreatureSpecies]]:
+        """
+        Regenerate the species of a seed-only save.
+
+        Returns None for saves that store every species.
+
+        Raises:
+            ValueError: If the save was written by a different generator
+                version or the regenerated roster does not match
+        """
+        roster = data.get('roster')
+        if not roster:
+            return None
+
+        version = roster.get('generator_version')
+        if version != GENERATOR_VERSION:
+            raise ValueError(
+                f"Save uses roster generator version {version}, "
+                f"this version of the game generates version {GENERATOR_VERSION}"
+            )
+        seed = data.get('seed', 0)
+        if roster.get('fingerprint') != self.roster_cache.fingerprint(seed):
+            raise ValueError(f"Regenerated roster for seed {seed} does not match the save")
+        return self.roster_cache.get(seed)
+
+    def _resolve_sprites(self, data: dict) -> None:
+        """Load referenced species sprites from the sprite store."""
+        species = data.get('species', {})
+        if self.sprite_store is None:
+            if any(SPRITE_REFS_KEY in v for v in species.values()):
+                raise ValueError("Save references stored sprites but no sprite store is configured")
+            return
+        for species_data in species.values():
+            self.sprite_store.resolve_species(species_data)
 
     def create_new_game(
         self,
@@ -184,27 +514,9 @@ class SaveManager:
         import random
         state.seed = random.randint(0, 999999)
 
-        # Generate all 151 creatures for this save
-        print(f"Generating 151 unique creatures (seed: {state.seed})...")
-        generator = CreatureGenerator(state.seed)
-        all_species = generator.generate_all_creatures()
-
-        # Generate sprites for all creatures
-        print("Generating sprites...")
-        sprite_gen = SpriteGenerator(state.seed)
-
-        for species in all_species:
-            # Determine archetype based on types and stats
-            archetype = self._determine_archetype(species)
-            sprites = sprite_gen.generate_creature_sprites(
-                species.id,
-                species.types,
-                archetype
-            )
-            species.sprite_data = sprites
-
-        # Build species dictionary
-        state.species_dict = {s.id: s for s in all_species}
+        # Generate all 151 creatures and their sprites for this save
+        self._log(f"Generating 151 unique creatures (seed: {state.seed})...")
+        state.species_dict = self.roster_cache.get(state.seed)
 
         # Give player their starter
         starter_id = starter_choice + 1  # IDs 1, 2, 3 are starters
@@ -219,33 +531,297 @@ class SaveManager:
         state.pokedex_seen.add(starter_id)
         state.pokedex_caught.add(starter_id)
 
-        print(f"Game created! You chose {starter_species.name}!")
+        self._log(f"Game created! You chose {starter_species.name}!")
 
         return state
 
     def _determine_archetype(self, species: CreatureSpecies) -> str:
         """Determine visual archetype for sprite generation."""
-        # Simple heuristic based on types and stats
-        types = species.types
-        stats = species.base_stats
-
-        if "Gale" in types or stats.speed > 80:
-            return "bird"
-        elif "Aqua" in types:
-            return "fish"
-        elif "Insect" in types:
-            return "insect"
-        elif "Toxin" in types or "Spirit" in types:
-            return "serpent"
-        elif stats.defense > stats.attack:
-            return "quadruped"
+        return determine_archetype(species)
+
+    def _snapshot_state(self, state: GameState) -> Tuple[dict, List[Tuple[int, CreatureSpecies]]]:
+        """
+        Capture the parts of a state that gameplay can change.
+
+        Species are not serialized here; they do not change during play, so
+        serializing them is left to _complete_save_data(), which may run on
+        another thread.
+
+        Returns:
+            (save data without species, list of (id, species) to serialize)
+        """
+        roster_ids = self._seed_roster_ids(state)
+        data = state.to_dict(skip_species=state.species_dict,
+                             raw_records=self.backend == "sqlite")
+        species = [(k, v) for k, v in state.species_dict.items() if k not in roster_ids]
+        if roster_ids:
+            data['roster'] = {
+                'generator_version': GENERATOR_VERSION,
+                'fingerprint': state.roster_fingerprint,
+                'species_count': len(roster_ids)
+            }
+        return data, species
+
+    def _complete_save_data(self, data: dict,
+                            species: List[Tuple[int, CreatureSpecies]]) -> dict:
+        """Add species and metadata to a snapshot from _snapshot_state()."""
+        data['species'] = {str(k): v.to_dict() for k, v in species}
+
+        # Add metadata
+        data['saved_at'] = datetime.now().isoformat()
+        self._externalize_sprites(data)
+        return data
+
+    def _build_save_data(self, state: GameState) -> dict:
+        """Serialize a state into the dictionary written to disk."""
+        return self._complete_save_data(*self._snapshot_state(state))
+
+    def _sqlite_store(self, save_name: str) -> SqliteSaveStore:
+        """Get the (cached) database of a sqlite save, creating it if needed."""
+        store = self._sqlite_stores.get(save_name)
+        if store is not None and not os.path.exists(store.path):
+            store.close()  # Deleted or replaced by another manager
+            store = None
+        if store is None:
+            store = SqliteSaveStore(os.path.join(self.save_dir, save_name + SQLITE_EXTENSION))
+            self._sqlite_stores[save_name] = store
+        return store
+
+    def _remove_save_files(self, save_name: str, keep: Optional[str] = None) -> bool:
+        """
+        Delete a save's files in every format, except keep.
+
+        Returns:
+            True if any file was deleted
+        """
+        deleted = False
+        for extension in ALL_SAVE_EXTENSIONS:
+            path = os.path.join(self.save_dir, save_name + extension)
+            if path == keep or not os.path.exists(path):
+                continue
+            if extension == SQLITE_EXTENSION and save_name in self._sqlite_stores:
+                self._sqlite_stores.pop(save_name).close()
+            os.remove(path)
+            deleted = True
+        return deleted
+
+    def _write_sqlite(self, save_name: str, data: dict) -> str:
+        """
+        Write a save to its database, touching only changed rows.
+
+        Returns:
+            Path of the database
+        """
+        store = self._sqlite_store(save_name)
+        store.write(data)
+        self._remove_save_files(save_name, keep=store.path)
+        self._journal_for(save_name).remove()
+        self._journal_bases.pop(save_name, None)
+        return store.path
+
+    def _journal_for(self, save_name: str) -> SaveJournal:
+        """Get the journal belonging to a save."""
+        return SaveJournal(os.path.join(self.save_dir, save_name + JOURNAL_EXTENSION))
+
+    def _write_snapshot(self, save_name: str, data: dict,
+                        codec: Optional[SaveCodec] = None) -> str:
+        """
+        Write a full save file.
+
+        In journal mode this starts a new journal; otherwise any old journal
+        is removed.
+
+        Args:
+            save_name: Save name
+            data: Completed save data
+            codec: Codec to write with (default: the manager's)
+
+        Returns:
+            Path of the written file
+        """
+        codec = codec or self.codec
+        save_path = os.path.join(self.save_dir, save_name + codec.extension)
+        if self.journal:
+            data[JOURNAL_ID_KEY] = uuid.uuid4().hex
+        raw = codec.encode(data)
+        atomic_write(save_path, raw)
+
+        self._remove_save_files(save_name, keep=save_path)
+
+        journal = self._journal_for(save_name)
+        if self.journal:
+            journal.start(data[JOURNAL_ID_KEY])
+            # Decode what was written so the base shares nothing with the live state
+            self._journal_bases[save_name] = load_save_data(raw)
         else:
-            return "biped"
+            journal.remove()
+            self._journal_bases.pop(save_name, None)
+        return save_path
+
+    def _append_journal(self, save_name: str, data: dict) -> bool:
+        """
+        Record a save as a delta in its journal.
+
+        Returns:
+            False if a full snapshot is needed instead (no known base, or
+            the journal has reached journal_compact_bytes)
+        """
+        base = self._journal_bases.get(save_name)
+        journal = self._journal_for(save_name)
+        if base is None or not journal.exists() or journal.size() >= self.journal_compact_bytes:
+            return False
+
+        data[JOURNAL_ID_KEY] = base[JOURNAL_ID_KEY]
+        sets, deletes = diff_save_data(base, data)
+        if sets or deletes:
+            journal.append(sets, deletes)
+            apply_save_delta(base, {'set': copy.deepcopy(sets), 'del': deletes})
+        return True
+
+    def _replay_journal(self, save_name: str, data: dict) -> int:
+        """
+        Apply a save's journal to its snapshot data.
+
+        Returns:
+            Number of records replayed
+        """
+        journal_id = data.get(JOURNAL_ID_KEY)
+        if not journal_id:
+            return 0
+        records = self._journal_for(save_name).read_records(journal_id) or []
+        for record in records:
+            apply_save_delta(data, record)
+        return len(records)
+
+    def _write_save_data(self, save_name: str, data: dict) -> str:
+        """
+        Write completed save data as a journal delta or a snapshot.
+
+        Returns:
+            Path of the file written
+        """
+        with self._write_lock:
+            if self.backend == "sqlite":
+                path = self._write_sqlite(save_name, data)
+            elif self.journal and self._append_journal(save_name, data):
+                path = self._journal_for(save_name).path
+            else:
+                path = self._write_snapshot(save_name, data)
+            self._update_manifest(save_name, summarize_save(data))
+            if self.backups is not None:
+                try:
+                    self.backups.add(save_name, data)
+                except OSError as e:
+                    print(f"Error backing up save: {e}")  # The save itself was written
+            return path
+
+    def _save_signature(self, save_name: str):
+        """Get the manifest file signature of a save."""
+        return file_signature(self._get_save_path(save_name), self._journal_for(save_name).path)
+
+    def _update_manifest(self, save_name: str, summary: dict) -> None:
+        """Record a save's summary in the manifest."""
+        signature = self._save_signature(save_name)
+        if signature is None:
+            return
+        self.manifest.update(save_name, summary, signature)
+        try:
+            self.manifest.write()
+        except OSError:
+            pass  # Stale entries are detected and rebuilt by list_save_info()
+
+    def _read_save_data(self, save_name: str) -> dict:
+        """
+        Read a save file and replay its journal.
+
+        Raises:
+            FileNotFoundError: If the save does not exist
+            SaveFileCorruptedError: If the save cannot be decoded
+        """
+        return self._read_save_format(save_name)[0]
+
+    def _read_save_format(self, save_name: str) -> Tuple[dict, Optional[SaveCodec]]:
+        """
+        Read a save file and replay its journal.
+
+        Returns:
+            (save data, codec the file was written with, or None for a
+             sqlite save)
+
+        Raises:
+            FileNotFoundError: If the save does not exist
+            SaveFileCorruptedError: If the save cannot be decoded
+        """
+        save_path = self._get_save_path(save_name)
+        if save_path.endswith(SQLITE_EXTENSION):
+            if not os.path.exists(save_path):
+                raise FileNotFoundError(save_path)
+            return self._sqlite_store(save_name).read(), None
+        with open(save_path, 'rb') as f:
+            raw = f.read()
+        codec = detect_codec(raw)
+        data = codec.decode(raw)
+        self._replay_journal(save_name, data)
+        return data, codec
+
+    def _map_save(self, save_name: str) -> Optional[Tuple[dict, Dict[str, Callable[[], dict]]]]:
+        """
+        Open a binary save for loading with deferred sections.
+
+        The file is memory-mapped; every section except DEFERRABLE_SECTIONS
+        is decoded now, and each deferrable section gets a loader decoding
+        it from the mapping (released once all of them have run).
+
+        Returns:
+            (save data without the deferred sections, section -> loader),
+            or None if the save must be read whole (not a binary save,
+            written before section CRCs or the current schema, or with a
+            journal to replay)
+
+        Sections are checked against their CRCs as they are decoded: the
+        eager ones here, the deferred ones on first access (which raises
+        SaveFileCorruptedError if they are damaged).
+
+        Raises:
+            SaveFileCorruptedError: If an eagerly decoded section fails its
+                checksum
+        """
+        save_path = self._get_save_path(save_name)
+        with open(save_path, 'rb') as f:
+            if f.read(len(BinaryCodec.magic)) != BinaryCodec.magic:
+                return None
+        mapped = MappedBinarySave(save_path)
+        pending = set(DEFERRABLE_SECTIONS) & set(mapped.sections)
+        try:
+            data = mapped.read(set(mapped.sections) - pending)
+        except BaseException:
+            mapped.close()
+            raise
+        if (not mapped.checksummed or len(pending) < len(DEFERRABLE_SECTIONS) or
+                schema_version(data) != SAVE_SCHEMA_VERSION or
+                (data.get(JOURNAL_ID_KEY) and self._journal_for(save_name).exists())):
+            mapped.close()
+            return None
+
+        def loader(section: str) -> Callable[[], dict]:
+            def load() -> dict:
+                section_data = mapped.read([section])
+                pending.discard(section)
+                if not pending:
+                    mapped.close()
+                return section_data
+            return load
+
+        return data, {section: loader(section) for section in pending}
 
     def save_game(self, state: GameState) -> bool:
         """
         Save game state to file.
 
+        In journal mode, saves after the first only append the changes to
+        the save's journal until it reaches journal_compact_bytes, when a
+        new snapshot is written. Pending background saves finish first.
+
         Args:
             state: GameState to save
 
@@ -253,22 +829,73 @@ class SaveManager:
             True if successful
         """
         try:
-            save_path = os.path.join(self.save_dir, f"{state.save_name}.json")
-            data = state.to_dict()
-
-            # Add metadata
-            data['saved_at'] = datetime.now().isoformat()
-
-            with open(save_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.flush_saves()
+            state.clear_dirty()
+            save_path = self._write_save_data(state.save_name, self._build_save_data(state))
 
-            print(f"Game saved to {save_path}")
+            self._log(f"Game saved to {save_path}")
             return True
 
         except Exception as e:
+            state.mark_dirty()  # The file on disk may lack any recent change
             print(f"Error saving game: {e}")
             return False
 
+    def save_game_async(self, state: GameState) -> Future:
+        """
+        Save game state on a background thread.
+
+        The mutable parts of the state are snapshotted before returning, so
+        the game can keep changing it. Serialization and disk I/O happen on
+        the writer thread; files are replaced atomically.
+
+        Args:
+            state: GameState to save
+
+        Returns:
+            Future resolving to True when the save is on disk, or raising the
+            error that prevented it
+        """
+        save_name = state.save_name
+        data, species = self._snapshot_state(state)
+        state.clear_dirty()
+
+        def write() -> bool:
+            try:
+                self._write_save_data(save_name, self._complete_save_data(data, species))
+            except Exception:
+                state.mark_dirty()  # The file on disk may lack any recent change
+                raise
+            return True
+
+        if self._writer is None:
+            self._writer = BackgroundSaveWriter()
+        return self._writer.submit(save_name, write)
+
+    def flush_saves(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for background saves to finish.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if no background saves are still running
+        """
+        if self._writer is None:
+            return True
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Finish background saves, stop the writer thread and close databases."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        with self._write_lock:
+            for store in self._sqlite_stores.values():
+                store.close()
+            self._sqlite_stores.clear()
+
     def load_game(self, save_name: str) -> Optional[GameState]:
         """
         Load game state from file.
@@ -280,40 +907,404 @@ class SaveManager:
             GameState if successful, None otherwise
         """
         try:
-            save_path = os.path.join(self.save_dir, f"{save_name}.json")
+            self.flush_saves()
+            save_path = self._get_save_path(save_name)
 
             if not os.path.exists(save_path):
                 print(f"Save file not found: {save_path}")
                 return None
 
-            with open(save_path, 'r') as f:
-                data = json.load(f)
+            # Binary saves decode storage, trainer teams and pokedex on first use
+            mapped = self._map_save(save_name)
+            data, loaders = mapped if mapped is not None else (self._read_save_data(save_name), None)
+            migrated = migrate_save_data(data)
+
+            self._resolve_sprites(data)
+            roster = self._load_roster(data)
+            state = GameState.from_dict(data, species_dict=roster, loaders=loaders)
+            if roster is not None:
+                state.roster_fingerprint = data['roster']['fingerprint']
+            self._log(f"Game loaded from {save_path}")
 
-            state = GameState.from_dict(data)
-            print(f"Game loaded from {save_path}")
+            if migrated:
+                self._upgrade_save(state)
             return state
 
         except Exception as e:
             print(f"Error loading game: {e}")
             return None
 
+    def _upgrade_save(self, state: GameState) -> None:
+        """Rewrite a save loaded from an older schema, so it is migrated only once."""
+        try:
+            self._write_save_data(state.save_name, self._build_save_data(state))
+        except Exception as e:
+            print(f"Could not upgrade save file: {e}")  # The old file still loads
+
     def list_saves(self) -> list:
         """
         List all available save files.
 
         Returns:
-            List of save file names (without .json extension)
+            List of save file names (without extension)
         """
         try:
             saves = []
             for filename in os.listdir(self.save_dir):
-                if filename.endswith('.json'):
-                    saves.append(filename[:-5])  # Remove .json
+                name, extension = os.path.splitext(filename)
+                if extension in ALL_SAVE_EXTENSIONS and name not in saves:
+                    saves.append(name)
             return saves
         except Exception as e:
             print(f"Error listing saves: {e}")
             return []
 
+    def list_save_info(self) -> List[dict]:
+        """
+        List all saves with summaries for a save browser.
+
+        Summaries come from the save manifest; saves missing from it or
+        changed since it was written are read once and re-summarized.
+
+        Returns:
+            List of summary dictionaries (save_name, player_name, play_time,
+            current_location, badges, team_levels, pokedex_caught, money,
+            seed, saved_at). Unreadable saves have only save_name and error.
+        """
+        self.flush_saves()
+        infos = []
+        with self._write_lock:
+            names = self.list_saves()
+            changed = False
+            for save_name in names:
+                signature = self._save_signature(save_name)
+                summary = self.manifest.get(save_name, signature)
+                if summary is None:
+                    try:
+                        summary = summarize_save(self._read_save_data(save_name))
+                    except Exception as e:
+                        infos.append({'save_name': save_name, 'error': str(e)})
+                        continue
+                    summary['save_name'] = save_name
+                    self.manifest.update(save_name, summary, signature)
+                    changed = True
+                infos.append(summary)
+
+            for save_name in set(self.manifest.entries) - set(names):
+                changed = self.manifest.remove(save_name) or changed
+            if changed:
+                try:
+                    self.manifest.write()
+                except OSError as e:
+                    print(f"Error writing save manifest: {e}")
+        return infos
+
+    def query_storage(self, save_name: str, species_id: Optional[int] = None,
+                      min_level: Optional[int] = None, max_level: Optional[int] = None,
+                      shiny: Optional[bool] = None,
+                      limit: Optional[int] = None) -> List[Tuple[int, dict]]:
+        """
+        Search a sqlite save's storage with an indexed query.
+
+        Results reflect the save as last written, not unsaved changes.
+
+        Args:
+            save_name: Name of a save written by the sqlite backend
+            species_id: Only this species
+            min_level: Minimum level (inclusive)
+            max_level: Maximum level (inclusive)
+            shiny: Only shiny (True) or non-shiny (False) creatures
+            limit: Maximum number of results
+
+        Returns:
+            List of (storage position, creature record), ordered by position
+
+        Raises:
+            ValueError: If the save is not a sqlite save
+        """
+        self.flush_saves()
+        save_path = self._get_save_path(save_name)
+        if not save_path.endswith(SQLITE_EXTENSION) or not os.path.exists(save_path):
+            raise ValueError(f"Save '{save_name}' is not stored in a sqlite database")
+        return self._sqlite_store(save_name).query_creatures(
+            species_id=species_id, min_level=min_level, max_level=max_level,
+            shiny=shiny, limit=limit
+        )
+
+    def rebuild_manifest(self) -> List[dict]:
+        """
+        Rebuild the save manifest from the save files.
+
+        Returns:
+            Summaries of all saves, as from list_save_info()
+        """
+        with self._write_lock:
+            self.manifest.clear()
+        return self.list_save_info()
+
+    def verify_save(self, save_name: str) -> dict:
+        """
+        Check a save's integrity without loading it.
+
+        Binary saves are checked against their section CRCs without
+        decompressing; JSON saves are parsed but no game objects are built;
+        sqlite saves run SQLite's quick check.
+
+        Args:
+            save_name: Save name
+
+        Returns:
+            Dictionary with save_name, ok, damaged (names of damaged
+            sections, 'journal' or 'database') and error (a message if the
+            save could not be checked at all, else None)
+        """
+        self.flush_saves()
+        report = {'save_name': save_name, 'ok': False, 'damaged': [], 'error': None}
+        save_path = self._get_save_path(save_name)
+        try:
+            if save_path.endswith(SQLITE_EXTENSION):
+                if not os.path.exists(save_path):
+                    raise FileNotFoundError(save_path)
+                problems = self._sqlite_store(save_name).verify()
+                if problems:
+                    report['damaged'].append('database')
+                    report['error'] = problems[0]
+            else:
+                with open(save_path, 'rb') as f:
+                    report['damaged'] = verify_save_data(f.read())
+                if not self._journal_for(save_name).verify():
+                    report['damaged'].append('journal')
+        except FileNotFoundError:
+            report['error'] = "Save not found"
+        except SaveFileCorruptedError as e:
+            report['error'] = str(e)
+        report['ok'] = not report['damaged'] and report['error'] is None
+        return report
+
+    def verify_saves(self) -> List[dict]:
+        """
+        Check every save's integrity.
+
+        Returns:
+            List of verify_save() reports
+        """
+        return [self.verify_save(save_name) for save_name in self.list_saves()]
+
+    def recover_save(self, save_name: str) -> Tuple[Optional[GameState], List[str]]:
+        """
+        Salvage the intact sections of a damaged save and rewrite it.
+
+        Lost sections are replaced by defaults (lost species are regenerated
+        from the seed). The damaged file is kept next to the save with a
+        '.damaged' suffix.
+
+        Args:
+            save_name: Save name
+
+        Returns:
+            (recovered GameState, or None if nothing could be salvaged;
+             names of the lost sections)
+        """
+        self.flush_saves()
+        save_path = self._get_save_path(save_name)
+        lost = [name for name, _ in SAVE_SECTIONS]
+        try:
+            if save_path.endswith(SQLITE_EXTENSION):
+                data, lost = self._sqlite_store(save_name).read(), []
+            else:
+                with open(save_path, 'rb') as f:
+                    raw = f.read()
+                data, lost = recover_save_data(raw)
+                replayed = copy.deepcopy(data)
+                try:
+                    self._replay_journal(save_name, replayed)
+                    data = replayed
+                except (SaveFileCorruptedError, KeyError, IndexError, TypeError):
+                    lost.append('journal')
+            if not data:
+                raise SaveFileCorruptedError("No intact sections")
+
+            data['save_name'] = save_name
+            migrate_save_data(data)
+            fill_missing_fields(data)
+            self._resolve_sprites(data)
+            roster = self._load_roster(data)
+            if roster is None and 'species' in lost:
+                roster = self.roster_cache.get(data['seed'])
+            state = GameState.from_dict(data, species_dict=roster)
+            if data.get('roster'):
+                state.roster_fingerprint = data['roster']['fingerprint']
+        except Exception as e:
+            print(f"Could not recover save: {e}")
+            return None, lost
+
+        if lost:
+            shutil.copyfile(save_path, save_path + ".damaged")
+        with self._write_lock:
+            self._journal_bases.pop(save_name, None)
+            self._write_save_data(save_name, self._build_save_data(state))
+        self._log(f"Recovered save {save_name}" +
+              (f" (lost and reset: {', '.join(lost)})" if lost else ""))
+        return state, lost
+
+    def _save_size(self, save_name: str) -> int:
+        """Get the total size in bytes of a save's files (snapshot and journal)."""
+        size = 0
+        for path in (self._get_save_path(save_name), self._journal_for(save_name).path):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _rewrite_save(self, save_name: str, data: dict, codec: Optional[SaveCodec]) -> None:
+        """
+        Replace a save with data read from disk, as a snapshot in codec's
+        format (or a sqlite database if codec is None).
+        """
+        data.pop(JOURNAL_ID_KEY, None)
+        self._journal_bases.pop(save_name, None)
+        if codec is None:
+            self._write_sqlite(save_name, data)
+            return
+        # Stored creatures read from a database are still JSON text
+        data['storage'] = [json_io.loads(record) if isinstance(record, str) else record
+                           for record in data.get('storage', [])]
+        self._write_snapshot(save_name, data, codec)
+
+    def maintain_save(self, save_name: str, operation: str) -> dict:
+        """
+        Validate, migrate, re-encode or compact a save without loading it.
+
+        Saves are handled as save data; no game objects are built and
+        nothing is printed. Operations:
+            validate  Check integrity and schema version (writes nothing)
+            migrate   Upgrade a save from an older schema, keeping its format
+            recode    Rewrite the save with this manager's backend and codec
+            compact   Fold the journal into a fresh snapshot (or VACUUM a
+                      sqlite save)
+
+        The manifest is not written; rewritten saves carry a summary for
+        update_manifest() (stale entries are otherwise re-summarized by
+        list_save_info()).
+
+        Args:
+            save_name: Save name
+            operation: One of MAINTENANCE_OPERATIONS
+
+        Returns:
+            Dictionary with save_name, operation, ok, changed, schema (the
+            version before migration), damaged, error, bytes_before,
+            bytes_after and summary (set when the save was rewritten)
+
+        Raises:
+            ValueError: If the operation is unknown
+        """
+        if operation not in MAINTENANCE_OPERATIONS:
+            raise ValueError(f"Unknown maintenance operation '{operation}' "
+                             f"(available: {', '.join(MAINTENANCE_OPERATIONS)})")
+        self.flush_saves()
+        report = {'save_name': save_name, 'operation': operation, 'ok': False, 'changed': False,
+                  'schema': None, 'damaged': [], 'error': None,
+                  'bytes_before': 0, 'bytes_after': 0, 'summary': None}
+        with self._write_lock:
+            report['bytes_before'] = self._save_size(save_name)
+            try:
+                is_sqlite = self._get_save_path(save_name).endswith(SQLITE_EXTENSION)
+                if operation == "compact" and is_sqlite:
+                    self._sqlite_store(save_name).vacuum()
+                    report['changed'] = True
+                elif operation != "compact" or self._journal_for(save_name).exists():
+                    try:
+                        # Decoding checks section checksums and journal records
+                        data, codec = self._read_save_format(save_name)
+                        problems = self._sqlite_store(save_name).verify() if is_sqlite else []
+                        if problems:
+                            raise SaveFileCorruptedError(problems[0])
+                    except SaveFileCorruptedError:
+                        if operation == "validate":
+                            report['damaged'] = self.verify_save(save_name)['damaged']
+                        raise
+                    report['schema'] = schema_version(data)
+                    migrated = migrate_save_data(data)
+                    if operation == "recode":
+                        codec = None if self.backend == "sqlite" else self.codec
+                    if operation in ("recode", "compact") or (operation == "migrate" and migrated):
+                        self._rewrite_save(save_name, data, codec)
+                        report['summary'] = summarize_save(data)
+                        report['summary']['save_name'] = save_name
+                        report['changed'] = True
+                report['ok'] = True
+            except FileNotFoundError:
+                report['error'] = "Save not found"
+            except Exception as e:
+                report['error'] = str(e)
+            report['bytes_after'] = self._save_size(save_name)
+        return report
+
+    def update_manifest(self, summaries: List[dict]) -> None:
+        """
+        Record summaries of saves rewritten elsewhere (e.g. by
+        maintain_save() in worker processes) and write the manifest once.
+
+        Args:
+            summaries: Save summaries with save_name set
+        """
+        with self._write_lock:
+            for summary in summaries:
+                signature = self._save_signature(summary['save_name'])
+                if signature is not None:
+                    self.manifest.update(summary['save_name'], summary, signature)
+            try:
+                self.manifest.write()
+            except OSError as e:
+                print(f"Error writing save manifest: {e}")
+
+    def list_backups(self, save_name: str) -> List[dict]:
+        """
+        List the backups of a save, newest first.
+
+        Returns:
+            Dictionaries with id, saved_at, created_at and size (empty if
+            backups are disabled)
+        """
+        if self.backups is None:
+            return []
+        self.flush_saves()
+        with self._write_lock:
+            return self.backups.list(save_name)
+
+    def restore_backup(self, save_name: str, backup_id: int) -> Optional[GameState]:
+        """
+        Roll a save back to one of its backups.
+
+        The backup is written as the current save (becoming the newest
+        backup itself) and loaded.
+
+        Args:
+            save_name: Save name
+            backup_id: ID from list_backups()
+
+        Returns:
+            The restored GameState, or None if the backup could not be restored
+        """
+        if self.backups is None:
+            print("Save backups are disabled")
+            return None
+        self.flush_saves()
+        try:
+            with self._write_lock:
+                data = self.backups.restore(save_name, backup_id)
+                data.pop(JOURNAL_ID_KEY, None)
+                data['save_name'] = save_name
+                self._journal_bases.pop(save_name, None)
+                self._write_save_data(save_name, data)
+        except (KeyError, OSError, SaveFileCorruptedError) as e:
+            print(f"Error restoring backup: {e}")
+            return None
+        self._log(f"Restored backup {backup_id} of {save_name}")
+        return self.load_game(save_name)
+
     def delete_save(self, save_name: str) -> bool:
         """
         Delete a save file.
@@ -325,16 +1316,122 @@ class SaveManager:
             True if successful
         """
         try:
-            save_path = os.path.join(self.save_dir, f"{save_name}.json")
-            if os.path.exists(save_path):
-                os.remove(save_path)
-                print(f"Deleted save: {save_name}")
-                return True
-            return False
+            self.flush_saves()
+            with self._write_lock:
+                deleted = self._remove_save_files(save_name)
+            self._journal_for(save_name).remove()
+            self._journal_bases.pop(save_name, None)
+            with self._write_lock:
+                if self.manifest.remove(save_name):
+                    self.manifest.write()
+                if self.backups is not None:
+                    self.backups.remove(save_name)
+                self._remove_unused_packs()
+            if deleted:
+                self._log(f"Deleted save: {save_name}")
+            return deleted
         except Exception as e:
             print(f"Error deleting save: {e}")
             return False
 
+    def _remove_unused_packs(self, used_seeds: Optional[Set[int]] = None) -> Tuple[int, int]:
+        """
+        Delete the sprite packs of seeds no save uses.
+
+        Args:
+            used_seeds: Seeds of every save (default: read from the save
+                summaries; nothing is deleted if a save cannot be read)
+
+        Returns:
+            (packs deleted, bytes freed)
+        """
+        try:
+            filenames = os.listdir(self.pack_dir)
+        except FileNotFoundError:
+            return 0, 0
+        packs = [(filename, sprite_pack_seed(filename)) for filename in filenames]
+        packs = [(filename, seed) for filename, seed in packs if seed is not None]
+        if not packs:
+            return 0, 0
+        if used_seeds is None:
+            infos = self.list_save_info()
+            if any('error' in info for info in infos):
+                return 0, 0
+            used_seeds = {info['seed'] for info in infos}
+
+        removed = freed = 0
+        for filename, seed in packs:
+            if seed in used_seeds:
+                continue
+            path = os.path.join(self.pack_dir, filename)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            freed += size
+        return removed, freed
+
+    def _trade_sprite_refs(self) -> Set[str]:
+        """Sprite digests referenced by trade files in save_dir/trades."""
+        trade_dir = os.path.join(self.save_dir, "trades")
+        try:
+            filenames = [name for name in os.listdir(trade_dir) if name.endswith('.trade')]
+        except FileNotFoundError:
+            return set()
+        refs = set()
+        for filename in filenames:
+            try:
+                with open(os.path.join(trade_dir, filename), 'rb') as f:
+                    species_data = json_io.load(f)['species']
+            except (OSError, ValueError, KeyError, TypeError):
+                continue  # Unreadable trade files cannot be imported either
+            refs.update(SpriteStore.species_refs(species_data))
+        return refs
+
+    def collect_garbage(self) -> dict:
+        """
+        Delete stored sprites and sprite packs that nothing uses any more.
+
+        Sprites are kept while a save, a backup or a trade file in
+        save_dir/trades references them; packs while a save uses their
+        seed. If a save cannot be read, nothing is deleted, since the
+        sprites it references are unknown.
+
+        Returns:
+            Dictionary with sprites_removed, packs_removed, bytes_freed and
+            error (None, or why nothing was deleted)
+        """
+        report = {'sprites_removed': 0, 'packs_removed': 0, 'bytes_freed': 0, 'error': None}
+        self.flush_saves()
+        with self._write_lock:
+            refs: Set[str] = set()
+            seeds: Set[int] = set()
+            for save_name in self.list_saves():
+                try:
+                    data = self._read_save_data(save_name)
+                except Exception as e:
+                    report['error'] = f"Cannot read save '{save_name}': {e}"
+                    return report
+                seeds.add(data.get('seed'))
+                for species_data in data.get('species', {}).values():
+                    refs.update(SpriteStore.species_refs(species_data))
+
+            backups = SaveBackups(os.path.join(self.save_dir, "backups"), keep=1)
+            for part in backups.section_parts('species'):
+                for species_data in part.get('species', {}).values():
+                    refs.update(SpriteStore.species_refs(species_data))
+            refs |= self._trade_sprite_refs()
+
+            if self.sprite_store is not None:
+                unused = set(self.sprite_store.digests()) - refs
+                report['sprites_removed'], report['bytes_freed'] = self.sprite_store.remove(unused)
+            packs_removed, freed = self._remove_unused_packs(seeds)
+            report['packs_removed'] = packs_removed
+            report['bytes_freed'] += freed
+        return report
+
     def export_creatures(
         self,
         state: GameState,
@@ -360,9 +1457,9 @@ class SaveManager:
             }
 
             with open(export_path, 'w') as f:
-                json.dump(export_data, f, indent=2)
+                json_io.dump(export_data, f, pretty=True)
 
-            print(f"Creatures exported to {export_path}")
+            self._log(f"Creatures exported to {export_path}")
             return True
 
         except Exception as e:
@@ -384,14 +1481,15 @@ class SaveManager:
         """
         try:
             with open(import_path, 'r') as f:
-                data = json.load(f)
+                data = json_io.load(f)
 
+            self._resolve_sprites(data)
             species_dict = {
-                int(k): CreatureSpecies.from_dict(v)
+                int(k): CreatureSpecies.from_dict(upgrade_species_record(v))
                 for k, v in data['species'].items()
             }
 
-            print(f"Imported {len(species_dict)} creatures")
+            self._log(f"Imported {len(species_dict)} creatures")
             return species_dict
 
         except Exception as e:
@@ -0,0 +1,160 @@
+"""
+Background save writing.
+
+Saving is split in two: a cheap snapshot of the mutable game state taken on
+the caller's thread, and the expensive part (species serialization, sprite
+externalization, encoding and disk I/O) done on a single worker thread.
+Files are replaced atomically, so a crash mid-write leaves the previous save
+intact.
+"""
+
+import os
+import stat
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+
+def _umask() -> int:
+    """Get the process umask, without changing it where /proc tells us."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('Umask:'):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def replacement_mode(path: str) -> int:
+    """
+    Get the permission bits for a file about to replace path.
+
+    Temporary files from tempfile.mkstemp() are created 0600, and
+    os.replace() keeps that mode; files replaced through them should get
+    the destination's mode instead, or for a new file the mode open()
+    would have given it.
+
+    Args:
+        path: Destination path
+
+    Returns:
+        The existing file's permission bits, or 0o666 less the umask
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_umask()
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """
+    Write a file atomically.
+
+    The data goes to a temporary file in the same directory, which is
+    flushed and fsync'd before os.replace() swaps it into place. Readers
+    see either the old file or the new one, never a partial write. The
+    file keeps the mode of the one it replaces (see replacement_mode()).
+
+    Args:
+        path: Destination path
+        data: File contents
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".save")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, replacement_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself (not supported on every platform)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class BackgroundSaveWriter:
+    """
+    Runs save jobs in order on a single worker thread.
+
+    Jobs are keyed (by save name); when several jobs for the same key are
+    queued, only the newest runs and the older ones complete immediately,
+    since their data would be overwritten anyway.
+    """
+
+    def __init__(self):
+        """Initialize the writer. The worker thread starts on first use."""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._latest: Dict[str, int] = {}
+        self._pending: List[Future] = []
+        self._sequence = 0
+
+    def submit(self, key: str, job: Callable[[], bool]) -> Future:
+        """
+        Queue a save job.
+
+        Args:
+            key: Save name; newer jobs for the same key supersede older ones
+            job: Callable run on the worker thread, returning True on success
+
+        Returns:
+            Future resolving to the job's result (True for superseded jobs),
+            or raising the job's exception
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="save-writer")
+            self._sequence += 1
+            sequence = self._sequence
+            self._latest[key] = sequence
+
+            def run() -> bool:
+                if self._latest.get(key) != sequence:
+                    return True  # A newer snapshot of this save is queued
+                return job()
+
+            future = self._executor.submit(run)
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+            return future
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for all queued jobs to finish.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if every job finished within the timeout
+        """
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def close(self) -> None:
+        """Finish queued jobs and stop the worker thread."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,427 @@
+"""
+Creature storage.
+
+Players can keep thousands of creatures in storage, but only a handful are
+looked at in a session. Stored creatures are therefore loaded as raw save
+records and turned into Creature objects only when accessed.
+
+Storage is divided into boxes (PagedStorage). Each box is hydrated, changed
+and serialized on its own, so opening one box leaves the others as records
+and saving re-serializes only the boxes that changed. The serialized records
+(StorageRecords) keep each box's record list, so save codecs can also reuse
+the encoded payloads and checksums of unchanged boxes.
+"""
+
+from bisect import bisect_right
+from collections.abc import MutableSequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import json_io
+from .creature import Creature, CreatureSpecies
+
+
+class LazyCreatureList(MutableSequence):
+    """
+    A list of creatures whose entries are hydrated on first access.
+
+    Entries are Creature objects, save records (dictionaries from
+    Creature.to_dict()) or records still encoded as JSON text (as read from
+    a sqlite save). Indexing, iterating or popping an entry hydrates it and
+    keeps the Creature in its place; len() and saving never hydrate.
+    Records must not be mutated after being handed to the list.
+    """
+
+    def __init__(self, records: Iterable[Union[Creature, dict, str]] = (),
+                 species_dict: Optional[Dict[int, CreatureSpecies]] = None):
+        """
+        Initialize the list.
+
+        Args:
+            records: Creatures and/or creature records
+            species_dict: Species used to hydrate records
+
+        Raises:
+            KeyError: If a record's species is not in species_dict (JSON
+                text records are checked when hydrated)
+        """
+        self.species_dict = species_dict if species_dict is not None else {}
+        self._items: List[Union[Creature, dict, str]] = list(records)
+        # Fail on load rather than when a box is first opened
+        for item in self._items:
+            if isinstance(item, dict) and item['species_id'] not in self.species_dict:
+                raise KeyError(f"Stored creature has unknown species {item['species_id']}")
+
+    def _hydrate(self, index: int) -> Creature:
+        """Get the Creature at a (non-negative) index, hydrating it if needed."""
+        item = self._items[index]
+        if isinstance(item, str):
+            item = json_io.loads(item)
+        if isinstance(item, dict):
+            item = Creature.from_dict(item, self.species_dict[item['species_id']])
+            self._items[index] = item
+        return item
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._hydrate(i) for i in range(*index.indices(len(self._items)))]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError("list index out of range")
+        return self._hydrate(index)
+
+    def __setitem__(self, index, value) -> None:
+        self._items[index] = value
+
+    def __delitem__(self, index) -> None:
+        del self._items[index]
+
+    def __iter__(self) -> Iterator[Creature]:
+        for i in range(len(self._items)):
+            yield self._hydrate(i)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LazyCreatureList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyCreatureList({len(self._items)} creatures, {self.hydrated_count} loaded)"
+
+    def insert(self, index: int, value: Creature) -> None:
+        self._items.insert(index, value)
+
+    @property
+    def hydrated_count(self) -> int:
+        """Number of entries that are Creature objects."""
+        return sum(1 for item in self._items if isinstance(item, Creature))
+
+    def to_records(self, species_dict: Optional[Dict[int, CreatureSpecies]] = None) -> List[dict]:
+        """
+        Serialize the list for saving.
+
+        Records that were never hydrated are returned as loaded (JSON text
+        decoded), without building a Creature.
+
+        Args:
+            species_dict: Species the records will be loaded with (default:
+                the list's own; see Creature.to_dict())
+        """
+        if species_dict is None:
+            species_dict = self.species_dict
+        return [json_io.loads(item) if isinstance(item, str) else
+                item if isinstance(item, dict) else item.to_dict(species_dict)
+                for item in self._items]
+
+    def raw_records(self, species_dict: Optional[Dict[int, CreatureSpecies]] = None
+                    ) -> List[Union[dict, str]]:
+        """Serialize the list, leaving JSON text records encoded (see to_records())."""
+        if species_dict is None:
+            species_dict = self.species_dict
+        return [item.to_dict(species_dict) if isinstance(item, Creature) else item
+                for item in self._items]
+
+
+# Creatures a storage box holds
+BOX_SIZE = 30
+
+
+class StorageRecords(list):
+    """
+    Serialized storage: the records of every box, in order.
+
+    boxes holds each box's record list. A box's list is the same object
+    from save to save while the box is unchanged, so codecs can cache what
+    they derive from it by identity. Copies of the list are plain lists.
+    """
+
+    def __init__(self, boxes: List[list]):
+        super().__init__(record for box in boxes for record in box)
+        self.boxes = boxes
+
+
+def packed_box_sizes(count: int, box_size: int = BOX_SIZE) -> List[int]:
+    """Get the box sizes of count creatures filling boxes in order."""
+    sizes = [box_size] * (count // box_size)
+    if count % box_size:
+        sizes.append(count % box_size)
+    return sizes
+
+
+class PagedStorage(MutableSequence):
+    """
+    Creature storage divided into boxes of up to box_size creatures.
+
+    Reads and changes like one list of creatures (the boxes in order), so
+    code treating storage as a list keeps working. Each box is a
+    LazyCreatureList: box(n) hydrates only box n, and iteration pages
+    through the boxes one at a time. Removing a creature leaves its box one
+    shorter instead of shifting the boxes after it; appending fills the
+    last box, then starts a new one.
+
+    Every box caches its serialized records until it changes. A box counts
+    as changed when creatures are added, removed or replaced; reading
+    creatures (indexing, iterating, box()) does not. A stored creature
+    changed in place must be reported with mark_dirty().
+    """
+
+    def __init__(self, records: Iterable[Union[Creature, dict, str]] = (),
+                 species_dict: Optional[Dict[int, CreatureSpecies]] = None,
+                 box_sizes: Optional[Sequence[int]] = None, box_size: int = BOX_SIZE):
+        """
+        Initialize storage.
+
+        Args:
+            records: Creatures and/or creature records, in box order (a
+                StorageRecords keeps its box lists as the boxes' records
+                until they change)
+            species_dict: Species used to hydrate records
+            box_sizes: Number of creatures in each box (default, or if they
+                do not add up to the records: boxes filled in order)
+            box_size: Capacity of a box
+
+        Raises:
+            KeyError: If a record's species is not in species_dict
+        """
+        loaded = getattr(records, 'boxes', None)
+        records = list(records)
+        if (box_sizes is None or sum(box_sizes) != len(records) or
+                any(not 0 <= size <= box_size for size in box_sizes)):
+            box_sizes = packed_box_sizes(len(records), box_size)
+        self.species_dict = species_dict if species_dict is not None else {}
+        self.box_size = box_size
+        self._boxes: List[LazyCreatureList] = []
+        start = 0
+        for size in box_sizes:
+            self._boxes.append(LazyCreatureList(records[start:start + size], self.species_dict))
+            start += size
+        # Per box: changed since last serialized, and cached records by
+        # (raw or decoded, id of the species_dict they were written for)
+        self._dirty: List[bool] = [False] * len(self._boxes)
+        self._cache: List[Dict[Tuple[bool, int], list]] = [{} for _ in self._boxes]
+        self._starts: Optional[List[int]] = None
+        if (loaded is not None and [len(box) for box in loaded] == self.box_sizes and
+                all(a is b for a, b in zip(records, (r for box in loaded for r in box)))):
+            # Boxes decoded from a save serialize to the record lists they
+            # came from, so codecs can reuse what they cached for those
+            key = (False, id(self.species_dict))
+            for cache, box in zip(self._cache, loaded):
+                cache[key] = box
+
+    def _offsets(self) -> List[int]:
+        """Get the flat index of each box's first creature."""
+        if self._starts is None:
+            starts, total = [], 0
+            for box in self._boxes:
+                starts.append(total)
+                total += len(box)
+            starts.append(total)
+            self._starts = starts
+        return self._starts
+
+    def _locate(self, index: int):
+        """Get (box number, index within the box) of a flat index."""
+        starts = self._offsets()
+        if index < 0:
+            index += starts[-1]
+        if not 0 <= index < starts[-1]:
+            raise IndexError("storage index out of range")
+        box = bisect_right(starts, index) - 1
+        return box, index - starts[box]
+
+    def _touch(self, box: int, resized: bool = False) -> None:
+        """Record that a box changed."""
+        self._dirty[box] = True
+        self._cache[box] = {}
+        if resized:
+            self._starts = None
+
+    def _add_box(self, position: int, box: LazyCreatureList) -> None:
+        """Insert a new (changed) box."""
+        self._boxes.insert(position, box)
+        self._dirty.insert(position, True)
+        self._cache.insert(position, {})
+        self._starts = None
+
+    def __len__(self) -> int:
+        return self._offsets()[-1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        box, offset = self._locate(index)
+        return self._boxes[box][offset]
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            raise TypeError("PagedStorage does not support slice assignment")
+        box, offset = self._locate(index)
+        self._touch(box)
+        self._boxes[box][offset] = value
+
+    def __delitem__(self, index) -> None:
+        if isinstance(index, slice):
+            for i in sorted(range(*index.indices(len(self))), reverse=True):
+                del self[i]
+            return
+        box, offset = self._locate(index)
+        self._touch(box, resized=True)
+        del self._boxes[box][offset]
+
+    def insert(self, index: int, value: Creature) -> None:
+        length = len(self)
+        if index < 0:
+            index = max(0, index + length)
+        if index >= length:
+            if self._boxes and len(self._boxes[-1]) < self.box_size:
+                self._touch(len(self._boxes) - 1, resized=True)
+                self._boxes[-1].append(value)
+            else:
+                self._add_box(len(self._boxes), LazyCreatureList([value], self.species_dict))
+            return
+        box, offset = self._locate(index)
+        self._touch(box, resized=True)
+        self._boxes[box].insert(offset, value)
+        if len(self._boxes[box]) > self.box_size:
+            # A full box spills its last creature into a new box after it
+            spilled = self._boxes[box]._items.pop()
+            self._add_box(box + 1, LazyCreatureList([spilled], self.species_dict))
+
+    def __iter__(self) -> Iterator[Creature]:
+        for box in range(len(self._boxes)):
+            yield from self.box(box)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PagedStorage, LazyCreatureList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return (f"PagedStorage({len(self)} creatures in {len(self._boxes)} boxes, "
+                f"{len(self.loaded_boxes)} loaded)")
+
+    @property
+    def box_count(self) -> int:
+        """Number of boxes."""
+        return len(self._boxes)
+
+    @property
+    def box_sizes(self) -> List[int]:
+        """Number of creatures in each box."""
+        return [len(box) for box in self._boxes]
+
+    def box(self, number: int) -> List[Creature]:
+        """
+        Get the creatures of one box, hydrating only that box.
+
+        Args:
+            number: Box number (0-based)
+
+        Returns:
+            List of the box's creatures
+
+        Raises:
+            IndexError: If the box does not exist
+        """
+        return list(self._boxes[number])
+
+    def iter_boxes(self) -> Iterator[List[Creature]]:
+        """Page through the boxes, hydrating each as it is reached."""
+        for number in range(len(self._boxes)):
+            yield self.box(number)
+
+    @property
+    def loaded_boxes(self) -> List[int]:
+        """Numbers of boxes with hydrated creatures."""
+        return [number for number, box in enumerate(self._boxes) if box.hydrated_count]
+
+    @property
+    def hydrated_count(self) -> int:
+        """Number of entries that are Creature objects."""
+        return sum(box.hydrated_count for box in self._boxes)
+
+    @property
+    def dirty_boxes(self) -> List[int]:
+        """Numbers of boxes changed since they were last serialized."""
+        return [number for number, dirty in enumerate(self._dirty) if dirty]
+
+    def mark_dirty(self, index: Optional[int] = None) -> None:
+        """
+        Report a stored creature changed in place.
+
+        Args:
+            index: Flat index of the creature (default: every box)
+        """
+        if index is None:
+            for box in range(len(self._boxes)):
+                self._touch(box)
+        else:
+            self._touch(self._locate(index)[0])
+
+    def _box_records(self, raw: bool,
+                     species_dict: Optional[Dict[int, CreatureSpecies]]) -> List[list]:
+        """Serialize every box, reusing the records of unchanged boxes."""
+        if species_dict is None:
+            species_dict = self.species_dict
+        key = (raw, id(species_dict))
+        records = []
+        for number, box in enumerate(self._boxes):
+            cached = self._cache[number].get(key)  # Emptied whenever the box changes
+            if cached is None:
+                cached = (box.raw_records(species_dict) if raw else
+                          box.to_records(species_dict))
+                self._cache[number][key] = cached
+            records.append(cached)
+        self._dirty = [False] * len(self._boxes)
+        return records
+
+    def to_records(self, species_dict: Optional[Dict[int, CreatureSpecies]] = None
+                   ) -> StorageRecords:
+        """
+        Serialize storage for saving (the boxes' records in order).
+
+        Unchanged boxes return the records they were last serialized to
+        (the same list objects, see StorageRecords); records never hydrated
+        are returned as loaded (JSON text decoded).
+
+        Args:
+            species_dict: Species the records will be loaded with (default:
+                the storage's own; see Creature.to_dict())
+        """
+        return StorageRecords(self._box_records(False, species_dict))
+
+    def raw_records(self, species_dict: Optional[Dict[int, CreatureSpecies]] = None
+                    ) -> StorageRecords:
+        """Serialize storage, leaving JSON text records encoded (see to_records())."""
+        return StorageRecords(self._box_records(True, species_dict))
+
+
+def storage_box_sizes(creatures: Sequence[Creature]) -> List[int]:
+    """Get the box sizes of storage (boxes filled in order for plain lists)."""
+    if isinstance(creatures, PagedStorage):
+        return creatures.box_sizes
+    return packed_box_sizes(len(creatures))
+
+
+def creature_records(creatures: Iterable[Creature], raw: bool = False,
+                     species_dict: Optional[Dict[int, CreatureSpecies]] = None
+                     ) -> List[Union[dict, str]]:
+    """
+    Serialize a list of creatures, skipping hydration for lazy lists.
+
+    Args:
+        creatures: Creatures (a list, LazyCreatureList or PagedStorage)
+        raw: Leave records that are still JSON text encoded
+        species_dict: Species the records will be loaded with (see
+            Creature.to_dict())
+
+    Returns:
+        List of creature records
+    """
+    if isinstance(creatures, (LazyCreatureList, PagedStorage)):
+        return (creatures.raw_records(species_dict) if raw else
+                creatures.to_records(species_dict))
+    return [c.to_dict(species_dict) for c in creatures]
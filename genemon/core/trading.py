@@ -12,7 +12,10 @@ import json
 import os
 from datetime import datetime
 from typing import Optional, List, Dict, Tuple
+from . import json_io
 from .creature import Creature, CreatureSpecies
+from .save_migrations import upgrade_creature_record, upgrade_species_record
+from ..sprites.store import SpriteStore
 
 
 class TradeRecord:
@@ -124,10 +127,10 @@ class TradePackage:
 
     @classmethod
     def from_dict(cls, data: dict) -> 'TradePackage':
-        """Deserialize trade package from dictionary."""
+        """Deserialize trade package from dictionary (trade files of any version)."""
         return cls(
-            creature_data=data['creature'],
-            species_data=data['species'],
+            creature_data=upgrade_creature_record(data['creature']),
+            species_data=upgrade_species_record(data['species']),
             source_save=data['source_save'],
             export_timestamp=data['export_timestamp']
         )
@@ -156,14 +159,20 @@ class TradeManager:
     Manages creature trading between save files.
     """
 
-    def __init__(self, trade_dir: str = "saves/trades"):
+    def __init__(self, trade_dir: str = "saves/trades", sprite_store: Optional[SpriteStore] = None):
         """
         Initialize trade manager.
 
         Args:
             trade_dir: Directory to store trade files and history
+            sprite_store: Shared sprite store; defaults to the "sprites"
+                directory next to trade_dir (saves/sprites by default)
         """
         self.trade_dir = trade_dir
+        if sprite_store is None:
+            parent_dir = os.path.dirname(os.path.abspath(trade_dir))
+            sprite_store = SpriteStore(os.path.join(parent_dir, "sprites"))
+        self.sprite_store = sprite_store
         self.trade_history_path = os.path.join(trade_dir, "trade_history.json")
         os.makedirs(trade_dir, exist_ok=True)
 
@@ -177,7 +186,7 @@ class TradeManager:
 
         try:
             with open(self.trade_history_path, 'r') as f:
-                data = json.load(f)
+                data = json_io.load(f)
                 return [TradeRecord.from_dict(record) for record in data.get('trades', [])]
         except (json.JSONDecodeError, KeyError, IOError):
             return []
@@ -189,13 +198,14 @@ class TradeManager:
             'trades': [record.to_dict() for record in self.trade_history]
         }
         with open(self.trade_history_path, 'w') as f:
-            json.dump(data, f, indent=2)
+            json_io.dump(data, f, pretty=True)
 
     def export_creature(
         self,
         creature: Creature,
         source_save_name: str,
-        filename: Optional[str] = None
+        filename: Optional[str] = None,
+        embed_sprites: bool = True
     ) -> str:
         """
         Export a creature to a trade file.
@@ -204,6 +214,10 @@ class TradeManager:
             creature: The creature to export
             source_save_name: Name of the save file creature is from
             filename: Optional custom filename (without extension)
+            embed_sprites: Include the (compactly encoded) sprites so the
+                file can be imported into any save directory or machine; if
+                False, sprites are referenced from the local sprite store and
+                the file only imports where that store is shared
 
         Returns:
             Path to the created trade file
@@ -219,17 +233,21 @@ class TradeManager:
 
         filepath = os.path.join(self.trade_dir, filename)
 
+        species_data = creature.species.to_dict()
+        if not embed_sprites:
+            self.sprite_store.externalize_species(species_data)
+
         # Create trade package
         package = TradePackage(
             creature_data=creature.to_dict(),
-            species_data=creature.species.to_dict(),
+            species_data=species_data,
             source_save=source_save_name,
             export_timestamp=datetime.now().isoformat()
         )
 
         # Save to file
         with open(filepath, 'w') as f:
-            json.dump(package.to_dict(), f, indent=2)
+            json_io.dump(package.to_dict(), f, pretty=True)
 
         return filepath
 
@@ -252,17 +270,18 @@ class TradeManager:
 
         Raises:
             FileNotFoundError: If trade file doesn't exist
-            ValueError: If trade file is invalid
+            ValueError: If trade file is invalid or its sprites are missing
         """
         if not os.path.exists(trade_filepath):
             raise FileNotFoundError(f"Trade file not found: {trade_filepath}")
 
         try:
             with open(trade_filepath, 'r') as f:
-                data = json.load(f)
+                data = json_io.load(f)
 
             # Load trade package
             package = TradePackage.from_dict(data)
+            self.sprite_store.resolve_species(package.species_data)
 
             # Unpack creature and species
             creature, species = package.unpack(target_species_dict)
@@ -305,7 +324,7 @@ class TradeManager:
 
             try:
                 with open(filepath, 'r') as f:
-                    data = json.load(f)
+                    data = json_io.load(f)
 
                 package = TradePackage.from_dict(data)
                 creature_data = package.creature_data
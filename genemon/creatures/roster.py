@@ -0,0 +1,232 @@
+"""
+Deterministic creature rosters.
+
+A save's 151 species (stats, moves, learnsets and sprites) are a pure function
+of its seed and the generator code. Saves can therefore store just the seed,
+the generator version and a fingerprint of the roster, and rebuild the species
+on load instead of serializing all of them every time.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import Collection, Dict, Iterable, Optional
+
+from ..core.creature import CreatureSpecies
+from ..sprites.generator import SpriteGenerator
+from ..sprites.pack import SpritePack, build_sprite_pack
+from .generator import CreatureGenerator
+
+
+# Bump whenever a change to CreatureGenerator or SpriteGenerator alters the
+# roster generated for a given seed, so seed-only saves are not misread.
+GENERATOR_VERSION = 1
+
+
+def determine_archetype(species: CreatureSpecies) -> str:
+    """Determine visual archetype for sprite generation."""
+    # Simple heuristic based on types and stats
+    types = species.types
+    stats = species.base_stats
+
+    if "Gale" in types or stats.speed > 80:
+        return "bird"
+    elif "Aqua" in types:
+        return "fish"
+    elif "Insect" in types:
+        return "insect"
+    elif "Toxin" in types or "Spirit" in types:
+        return "serpent"
+    elif stats.defense > stats.attack:
+        return "quadruped"
+    else:
+        return "biped"
+
+
+# File name of a sprite pack (see sprite_pack_path())
+_PACK_NAME = re.compile(r"seed_(-?\d+)_v%d\.gspk" % GENERATOR_VERSION)
+
+
+def sprite_pack_path(pack_dir: str, seed: int) -> str:
+    """Get the sprite pack file path for a seed."""
+    return os.path.join(pack_dir, f"seed_{seed}_v{GENERATOR_VERSION}.gspk")
+
+
+def sprite_pack_seed(filename: str) -> Optional[int]:
+    """
+    Get the seed of a sprite pack from its file name.
+
+    Returns:
+        Seed, or None if the name is not a sprite pack of this generator
+        version
+    """
+    match = _PACK_NAME.fullmatch(filename)
+    return int(match.group(1)) if match else None
+
+
+def generate_roster(seed: int, pack_dir: Optional[str] = None) -> Dict[int, CreatureSpecies]:
+    """
+    Generate all species for a seed, including sprites.
+
+    With pack_dir, sprites are read from the seed's sprite pack when one
+    exists, and a pack is written after rasterizing otherwise.
+
+    Args:
+        seed: Save seed
+        pack_dir: Optional directory of sprite pack files
+
+    Returns:
+        Dictionary of creature_id -> CreatureSpecies
+    """
+    all_species = CreatureGenerator(seed).generate_all_creatures()
+    sprite_gen = SpriteGenerator(seed)
+    roster = [(s.id, s.types, determine_archetype(s)) for s in all_species]
+
+    pack = None
+    if pack_dir:
+        path = sprite_pack_path(pack_dir, seed)
+        try:
+            pack = SpritePack(path)
+            sprite_gen.use_pack(pack)
+        except (OSError, ValueError):
+            # Missing or unreadable: rasterize, then (re)write the pack
+            build_sprite_pack(path, sprite_gen, roster)
+
+    try:
+        for species, (creature_id, types, archetype) in zip(all_species, roster):
+            species.sprite_data = sprite_gen.generate_creature_sprites(
+                creature_id, types, archetype
+            )
+    finally:
+        if pack is not None:
+            sprite_gen.use_pack(None)
+            pack.close()
+
+    return {s.id: s for s in all_species}
+
+
+def roster_fingerprint(species_dict: Dict[int, CreatureSpecies],
+                       ids: Optional[Iterable[int]] = None) -> str:
+    """
+    Fingerprint the species data of a roster.
+
+    Sprites are excluded; they are derived from the seed, types and
+    archetype, and covered by GENERATOR_VERSION.
+
+    Args:
+        species_dict: Dictionary of creature_id -> CreatureSpecies
+        ids: Species IDs to include (default: all)
+
+    Returns:
+        SHA-256 hex digest
+
+    Raises:
+        KeyError: If an ID is missing from species_dict
+    """
+    digest = hashlib.sha256()
+    for creature_id in sorted(species_dict if ids is None else ids):
+        data = _species_record(species_dict[creature_id])
+        digest.update(json.dumps(data, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _species_record(species: CreatureSpecies) -> dict:
+    """Serialize a species without its sprites."""
+    species = copy.copy(species)
+    species.sprite_data = None  # Skip encoding sprites only to discard them
+    return species.to_dict()
+
+
+class RosterCache:
+    """
+    Small LRU cache of generated rosters keyed by seed.
+
+    Each call to get() returns copies of the species (sharing only their
+    sprite data), so a caller editing its species changes neither the cache
+    nor other games with the same seed.
+    """
+
+    def __init__(self, maxsize: int = 4, pack_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of rosters kept in memory
+            pack_dir: Optional directory for per-seed sprite packs, so
+                regenerating a roster in a new process skips rasterizing
+        """
+        self.maxsize = maxsize
+        self.pack_dir = pack_dir
+        self._rosters: 'OrderedDict[int, Dict[int, CreatureSpecies]]' = OrderedDict()
+        self._fingerprints: Dict[int, str] = {}
+        # seed -> creature_id -> species record without sprites, for matches()
+        self._records: Dict[int, Dict[int, dict]] = {}
+
+    def _roster(self, seed: int) -> Dict[int, CreatureSpecies]:
+        """Get the cached roster for a seed, generating it if needed."""
+        roster = self._rosters.get(seed)
+        if roster is None:
+            roster = generate_roster(seed, self.pack_dir)
+            self._rosters[seed] = roster
+            if len(self._rosters) > self.maxsize:
+                evicted, _ = self._rosters.popitem(last=False)
+                self._fingerprints.pop(evicted, None)
+                self._records.pop(evicted, None)
+        self._rosters.move_to_end(seed)
+        return roster
+
+    def get(self, seed: int) -> Dict[int, CreatureSpecies]:
+        """
+        Get the roster for a seed.
+
+        Args:
+            seed: Save seed
+
+        Returns:
+            New dictionary of creature_id -> copy of each CreatureSpecies
+        """
+        return {creature_id: copy.deepcopy(species, {id(species.sprite_data): species.sprite_data})
+                for creature_id, species in self._roster(seed).items()}
+
+    def ids(self, seed: int) -> Collection[int]:
+        """Get the species IDs of the roster for a seed."""
+        return self._roster(seed).keys()
+
+    def fingerprint(self, seed: int) -> str:
+        """Get the fingerprint of the roster for a seed."""
+        fingerprint = self._fingerprints.get(seed)
+        if fingerprint is None:
+            fingerprint = roster_fingerprint(self._roster(seed))
+            self._fingerprints[seed] = fingerprint
+        return fingerprint
+
+    def matches(self, seed: int, species_dict: Dict[int, CreatureSpecies]) -> bool:
+        """
+        Check whether species_dict contains the seed's generated roster.
+
+        Extra species (such as traded-in creatures) are allowed.
+
+        Args:
+            seed: Save seed
+            species_dict: Dictionary of creature_id -> CreatureSpecies
+
+        Returns:
+            True if every generated species is present and unchanged
+        """
+        records = self._records.get(seed)
+        if records is None:
+            roster = self._roster(seed)
+            records = {i: _species_record(species) for i, species in roster.items()}
+            self._records[seed] = records
+        return all(i in species_dict and _species_record(species_dict[i]) == record
+                   for i, record in records.items())
+
+    def clear(self) -> None:
+        """Drop all cached rosters."""
+        self._rosters.clear()
+        self._fingerprints.clear()
+        self._records.clear()
+
@@ -5,9 +5,9 @@ This module provides utilities for loading and managing NPC data from external
 JSON files, enabling easier modding and data management.
 """
 
-import json
 import os
 from typing import List, Dict, Optional
+from ..core import json_io
 from ..world.npc import NPC, Dialogue
 
 
@@ -53,7 +53,7 @@ class NPCLoader:
             raise FileNotFoundError(f"NPC data file not found: {self.data_file}")
 
         with open(self.data_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+            data = json_io.load(f)
 
         # Convert list to dictionary keyed by NPC ID
         npc_dict = {}
@@ -0,0 +1,125 @@
+"""
+Compact text encoding for creature sprite sets.
+
+A sprite set (the 'front', 'back' and 'mini' views in sprite_data) is
+serialized as indexed sprites, zlib-compressed and base64-encoded into a
+single string. Sprites are mostly transparent background with large uniform
+body regions, so this is far smaller than 56 JSON arrays of 56 hex strings.
+
+Encoded form: "z1:" + base64(zlib(records)), where each record is
+name length (u8), view name, sprite length (u32), IndexedSprite.to_bytes().
+"""
+
+import base64
+import struct
+import zlib
+from typing import Dict, List, Union
+
+from .indexed import IdentityCache, IndexedSprite
+
+
+SPRITE_SET_PREFIX = "z1:"
+
+_RECORD_LENGTH = struct.Struct('>I')
+
+# hex array -> IndexedSprite.to_bytes(); unchanged sprites are indexed once
+_sprite_bytes_cache = IdentityCache(2048)
+
+
+def is_encoded_sprite_set(value) -> bool:
+    """Check whether a sprite_data value uses the encoded string form."""
+    return isinstance(value, str) and value.startswith(SPRITE_SET_PREFIX)
+
+
+def _sprite_bytes(sprite: Union[IndexedSprite, List[List[str]]]) -> bytes:
+    """Get the binary form of a sprite, caching hex array conversions."""
+    if isinstance(sprite, IndexedSprite):
+        return sprite.to_bytes()
+    data = _sprite_bytes_cache.get(sprite)
+    if data is None:
+        data = IndexedSprite.from_hex_array(sprite).to_bytes()
+        _sprite_bytes_cache.put(sprite, data)
+    return data
+
+
+def encode_sprite_set(sprite_data: Dict[str, Union[IndexedSprite, List[List[str]]]],
+                      compression_level: int = 6) -> str:
+    """
+    Encode a sprite set as a compact base64 string.
+
+    Args:
+        sprite_data: Dictionary of view name -> hex array or IndexedSprite
+        compression_level: zlib compression level (0-9)
+
+    Returns:
+        Encoded string starting with SPRITE_SET_PREFIX
+    """
+    records = []
+    for view, sprite in sprite_data.items():
+        name = view.encode('utf-8')
+        data = _sprite_bytes(sprite)
+        records.append(bytes([len(name)]) + name + _RECORD_LENGTH.pack(len(data)) + data)
+
+    payload = zlib.compress(b''.join(records), compression_level)
+    return SPRITE_SET_PREFIX + base64.b64encode(payload).decode('ascii')
+
+
+def decode_sprite_set_indexed(encoded: str) -> Dict[str, IndexedSprite]:
+    """
+    Decode an encoded sprite set into indexed sprites.
+
+    Args:
+        encoded: String produced by encode_sprite_set()
+
+    Returns:
+        Dictionary of view name -> IndexedSprite
+
+    Raises:
+        ValueError: If the string is not a valid encoded sprite set
+    """
+    if not is_encoded_sprite_set(encoded):
+        raise ValueError("Not an encoded sprite set")
+    try:
+        raw = zlib.decompress(base64.b64decode(encoded[len(SPRITE_SET_PREFIX):]))
+    except (zlib.error, ValueError) as e:
+        raise ValueError(f"Corrupt sprite set: {e}")
+
+    sprites = {}
+    view = memoryview(raw)
+    pos = 0
+    try:
+        while pos < len(raw):
+            name_length = raw[pos]
+            name = bytes(view[pos + 1:pos + 1 + name_length]).decode('utf-8')
+            pos += 1 + name_length
+            (length,) = _RECORD_LENGTH.unpack_from(raw, pos)
+            pos += _RECORD_LENGTH.size
+            sprites[name] = IndexedSprite.from_bytes(bytes(view[pos:pos + length]))
+            pos += length
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt sprite set: {e}")
+    return sprites
+
+
+def decode_sprite_set(encoded: str) -> Dict[str, List[List[str]]]:
+    """
+    Decode an encoded sprite set into hex arrays.
+
+    The resulting hex arrays are remembered, so re-encoding them without
+    changes skips re-indexing.
+
+    Args:
+        encoded: String produced by encode_sprite_set()
+
+    Returns:
+        Dictionary of view name -> 2D array of hex color strings
+
+    Raises:
+        ValueError: If the string is not a valid encoded sprite set
+    """
+    sprite_data = {}
+    for view, sprite in decode_sprite_set_indexed(encoded).items():
+        hex_array = sprite.to_hex_array()
+        _sprite_bytes_cache.put(hex_array, sprite.to_bytes())
+        sprite_data[view] = hex_array
+    return sprite_data
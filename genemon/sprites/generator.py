@@ -4,9 +4,13 @@ Generates actual pixel art sprites as 2D arrays of colors.
 """
 
 import random
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import json
 
+from .indexed import IdentityCache, IndexedSprite
+from .pack import SpritePack, sprite_fingerprint
+from .png import DEFAULT_COMPRESSION_LEVEL, encode_indexed_png, encode_rgb_png
+
 
 class Color:
     """RGB color representation."""
@@ -64,6 +68,18 @@ TYPE_COLORS = {
 }
 
 
+# Brightness thresholds for ASCII art, brightest first
+ASCII_BRIGHTNESS_RAMP = ((200, "#"), (150, "+"), (100, "*"), (50, "."))
+
+
+def _brightness_to_ascii(brightness: int) -> str:
+    """Map a brightness (0-255) to an ASCII art character."""
+    for threshold, char in ASCII_BRIGHTNESS_RAMP:
+        if brightness > threshold:
+            return char
+    return ":"
+
+
 class SpriteGenerator:
     """Generates pixel art sprites for creatures."""
 
@@ -77,6 +93,34 @@ class SpriteGenerator:
         self.seed = seed if seed is not None else random.randint(0, 999999)
         self.rng = random.Random(self.seed)
 
+        # (creature_id, types, archetype) -> normal indexed sprites
+        self._indexed_cache: Dict[tuple, Dict[str, IndexedSprite]] = {}
+
+        # Optional memory-mapped sprite pack for this seed
+        self.pack: Optional[SpritePack] = None
+
+        # sprite object -> {scale: ASCII art}, and palette -> translation table
+        self._ascii_cache = IdentityCache(512)
+        self._ascii_tables: Dict[tuple, bytes] = {}
+
+    def use_pack(self, pack: Optional[SpritePack]):
+        """
+        Serve normal sprites from a memory-mapped sprite pack.
+
+        Records are used only when their fingerprint matches the requested
+        types and archetype; anything else is rasterized as usual.
+
+        Args:
+            pack: SpritePack built for this generator's seed, or None to detach
+
+        Raises:
+            ValueError: If the pack was built for a different seed
+        """
+        if pack is not None and pack.seed != self.seed:
+            raise ValueError(f"Sprite pack is for seed {pack.seed}, generator uses {self.seed}")
+        self.pack = pack
+        self._indexed_cache.clear()
+
     def generate_creature_sprites(
         self,
         creature_id: int,
@@ -97,21 +141,103 @@ class SpriteGenerator:
             Dictionary with 'front', 'back', and 'mini' sprite data
             Each sprite is a 2D array of hex color strings
         """
-        # Set seed based on creature ID for reproducibility
-        self.rng.seed(self.seed + creature_id)
+        if is_shiny:
+            sprites = self.generate_shiny_indexed_sprites(creature_id, types, archetype)
+        else:
+            sprites = self.generate_indexed_sprites(creature_id, types, archetype)
+
+        return {view: sprite.to_hex_array() for view, sprite in sprites.items()}
+
+    def generate_indexed_sprites(
+        self,
+        creature_id: int,
+        types: List[str],
+        archetype: str = "quadruped"
+    ) -> Dict[str, IndexedSprite]:
+        """
+        Generate the normal (non-shiny) sprites as indexed sprites.
+
+        Results are cached per generator, so repeat calls are free. When a
+        sprite pack is attached, matching records are served from it
+        without rasterizing.
+        Palette slots follow _get_palette() order, followed by any extra
+        colors the rasterizer drew directly (such as eyes).
+
+        Args:
+            creature_id: Unique ID for reproducibility
+            types: Creature types (for color palette)
+            archetype: Body type (bird, fish, quadruped, etc.)
 
-        # Get color palette (shiny or normal)
-        palette = self._get_palette(types, is_shiny=is_shiny)
+        Returns:
+            Dictionary with 'front', 'back', and 'mini' IndexedSprites
+        """
+        key = (creature_id, tuple(types), archetype)
+        sprites = self._indexed_cache.get(key)
+        if sprites is None and self.pack is not None:
+            if self.pack.fingerprint(creature_id) == sprite_fingerprint(types, archetype):
+                sprites = self.pack.get(creature_id)
+                self._indexed_cache[key] = sprites
+        if sprites is None:
+            palette = self._get_palette(types)
+            sprites = {
+                view: IndexedSprite.from_color_array(sprite, palette)
+                for view, sprite in self._rasterize(creature_id, palette, archetype).items()
+            }
+            self._indexed_cache[key] = sprites
+        return sprites
+
+    def generate_shiny_indexed_sprites(
+        self,
+        creature_id: int,
+        types: List[str],
+        archetype: str = "quadruped"
+    ) -> Dict[str, IndexedSprite]:
+        """
+        Derive shiny sprites from the normal sprites by swapping palettes.
 
-        # Generate sprites
-        front = self._generate_front_sprite(palette, archetype)
-        back = self._generate_back_sprite(palette, archetype)
-        mini = self._generate_mini_sprite(palette, archetype)
+        The rasterizer's output does not depend on palette colors, so a shiny
+        sprite is the normal index buffer with the shiny palette applied.
+
+        Args:
+            creature_id: Unique ID for reproducibility
+            types: Creature types (for color palette)
+            archetype: Body type (bird, fish, quadruped, etc.)
+
+        Returns:
+            Dictionary with 'front', 'back', and 'mini' IndexedSprites
+        """
+        normal = self.generate_indexed_sprites(creature_id, types, archetype)
+        shiny_palette = [c.to_tuple() for c in self._get_palette(types, is_shiny=True)]
 
         return {
-            'front': self._sprite_to_hex_array(front),
-            'back': self._sprite_to_hex_array(back),
-            'mini': self._sprite_to_hex_array(mini)
+            view: sprite.with_palette(shiny_palette + list(sprite.palette[len(shiny_palette):]))
+            for view, sprite in normal.items()
+        }
+
+    def _rasterize(
+        self,
+        creature_id: int,
+        palette: List[Color],
+        archetype: str
+    ) -> Dict[str, List[List[Color]]]:
+        """
+        Draw all three sprites for a creature with the given palette.
+
+        Args:
+            creature_id: Unique ID for reproducibility
+            palette: Color palette from _get_palette()
+            archetype: Body type (bird, fish, quadruped, etc.)
+
+        Returns:
+            Dictionary with 'front', 'back', and 'mini' Color arrays
+        """
+        # Set seed based on creature ID for reproducibility
+        self.rng.seed(self.seed + creature_id)
+
+        return {
+            'front': self._generate_front_sprite(palette, archetype),
+            'back': self._generate_back_sprite(palette, archetype),
+            'mini': self._generate_mini_sprite(palette, archetype)
         }
 
     def _get_palette(self, types: List[str], is_shiny: bool = False) -> List[Color]:
@@ -397,43 +523,68 @@ class SpriteGenerator:
             for row in sprite
         ]
 
-    def sprite_to_ascii(self, sprite_data: List[List[str]], scale: int = 1) -> str:
+    def sprite_to_ascii(self, sprite_data, scale: float = 1) -> str:
         """
         Convert sprite to ASCII art for terminal display.
 
+        Renderings are memoized per (sprite object, scale), so redrawing
+        the same sprite is a dictionary lookup.
+
         Args:
-            sprite_data: 2D array of hex colors
+            sprite_data: 2D array of hex colors or IndexedSprite
             scale: Scaling factor (1 = full size)
 
         Returns:
             ASCII representation of sprite
         """
-        # Downsample if scale < 1
-        if scale < 1:
-            sprite_data = self._downsample_sprite(sprite_data, scale)
-
-        ascii_art = []
-        for row in sprite_data:
-            line = ""
-            for pixel in row:
-                if pixel == "transparent":
-                    line += " "
-                else:
-                    # Use different characters for different brightness
-                    brightness = self._hex_to_brightness(pixel)
-                    if brightness > 200:
-                        line += "#"
-                    elif brightness > 150:
-                        line += "+"
-                    elif brightness > 100:
-                        line += "*"
-                    elif brightness > 50:
-                        line += "."
-                    else:
-                        line += ":"
-            ascii_art.append(line)
-
-        return "\n".join(ascii_art)
+        renderings = self._ascii_cache.get(sprite_data)
+        if renderings is None:
+            renderings = {}
+            self._ascii_cache.put(sprite_data, renderings)
+        elif scale in renderings:
+            return renderings[scale]
+
+        if isinstance(sprite_data, IndexedSprite):
+            indexed = sprite_data
+        else:
+            try:
+                indexed = IndexedSprite.from_hex_array(sprite_data)
+            except ValueError:
+                # Too many colors to index; render pixel by pixel
+                indexed = None
+
+        if indexed is None:
+            if scale < 1:
+                sprite_data = self._downsample_sprite(sprite_data, scale)
+            ascii_art = "\n".join(
+                "".join(" " if pixel == "transparent" else
+                        _brightness_to_ascii(self._hex_to_brightness(pixel))
+                        for pixel in row)
+                for row in sprite_data
+            )
+        else:
+            rows = indexed.rows()
+            # Downsample if scale < 1
+            if scale < 1:
+                rows = self._downsample_rows(rows, indexed.width, scale)
+            table = self._ascii_table(indexed.palette)
+            ascii_art = "\n".join(row.translate(table).decode('ascii') for row in rows)
+
+        renderings[scale] = ascii_art
+        return ascii_art
+
+    def _ascii_table(self, palette: Tuple[Tuple[int, int, int], ...]) -> bytes:
+        """
+        Get the index -> ASCII character translation table for a palette.
+
+        Brightness is computed once per palette color rather than per pixel.
+        """
+        table = self._ascii_tables.get(palette)
+        if table is None:
+            chars = [" "] + [_brightness_to_ascii(int((r + g + b) / 3)) for r, g, b in palette]
+            table = "".join(chars).encode('ascii').ljust(256, b" ")
+            self._ascii_tables[palette] = table
+        return table
 
     def _hex_to_brightness(self, hex_color: str) -> int:
         """Calculate brightness from hex color."""
@@ -444,6 +595,18 @@ class SpriteGenerator:
         r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
         return int((r + g + b) / 3)
 
+    @staticmethod
+    def _sample_positions(length: int, scale: float) -> List[int]:
+        """Get the source positions sampled when scaling a dimension."""
+        return [min(int(i / scale), length - 1) for i in range(max(1, int(length * scale)))]
+
+    def _downsample_rows(self, rows: List[bytes], width: int, scale: float) -> List[bytes]:
+        """Downsample index rows by scale factor (nearest neighbour)."""
+        if not rows:
+            return rows
+        xs = self._sample_positions(width, scale)
+        return [bytes(map(rows[y].__getitem__, xs)) for y in self._sample_positions(len(rows), scale)]
+
     def _downsample_sprite(
         self,
         sprite: List[List[str]],
@@ -451,21 +614,10 @@ class SpriteGenerator:
     ) -> List[List[str]]:
         """Downsample sprite by scale factor."""
         height = len(sprite)
-        width = len(sprite[0]) if height > 0 else 0
-
-        new_height = max(1, int(height * scale))
-        new_width = max(1, int(width * scale))
-
-        new_sprite = []
-        for y in range(new_height):
-            row = []
-            for x in range(new_width):
-                src_y = min(int(y / scale), height - 1)
-                src_x = min(int(x / scale), width - 1)
-                row.append(sprite[src_y][src_x])
-            new_sprite.append(row)
-
-        return new_sprite
+        if height == 0:
+            return [[]]
+        xs = self._sample_positions(len(sprite[0]), scale)
+        return [[sprite[y][x] for x in xs] for y in self._sample_positions(height, scale)]
 
     @staticmethod
     def hex_to_color(hex_string: str) -> Color:
@@ -485,86 +637,56 @@ class SpriteGenerator:
         return [[SpriteGenerator.hex_to_color(hex_color) for hex_color in row] for row in hex_sprite]
 
     @staticmethod
-    def export_sprite_to_png(sprite: List[List[Color]], filename: str, scale: int = 1):
+    def export_sprite_to_png(sprite, filename: str, scale: int = 1,
+                             compression_level: int = DEFAULT_COMPRESSION_LEVEL):
         """
         Export a sprite to a PNG file using pure Python (no PIL/Pillow required).
 
+        Sprites are written as palette PNGs (color type 3) with index 0 marked
+        transparent. Color arrays with more than 255 distinct colors fall back
+        to 24-bit RGB.
+
         Args:
-            sprite: 2D array of Color objects
+            sprite: IndexedSprite or 2D array of Color objects
             filename: Output PNG filename
             scale: Scale factor for upscaling (default 1 = no scaling)
-
-        Note: This uses pure Python PNG encoding without external dependencies.
-        For production use, consider using Pillow library for better PNG support.
+            compression_level: zlib compression level (0-9)
         """
-        import struct
-        import zlib
+        if isinstance(sprite, IndexedSprite):
+            png_data = encode_indexed_png(sprite, scale, compression_level)
+        else:
+            try:
+                indexed = IndexedSprite.from_color_array(sprite)
+                png_data = encode_indexed_png(indexed, scale, compression_level)
+            except ValueError:
+                # Too many colors for a palette image
+                height = len(sprite)
+                width = len(sprite[0]) if height > 0 else 0
+                rows = [bytes(c for color in row for c in color.to_tuple()) for row in sprite]
+                png_data = encode_rgb_png(rows, width, height, scale, compression_level)
 
-        height = len(sprite)
-        width = len(sprite[0]) if height > 0 else 0
-
-        if scale > 1:
-            # Scale up the sprite
-            scaled_sprite = []
-            for y in range(height):
-                for _ in range(scale):
-                    row = []
-                    for x in range(width):
-                        for _ in range(scale):
-                            row.append(sprite[y][x])
-                    scaled_sprite.append(row)
-            sprite = scaled_sprite
-            height = len(sprite)
-            width = len(sprite[0]) if height > 0 else 0
-
-        # PNG file structure
-        def write_chunk(chunk_type: bytes, data: bytes) -> bytes:
-            """Write a PNG chunk with length, type, data, and CRC."""
-            length = struct.pack('>I', len(data))
-            crc = struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
-            return length + chunk_type + data + crc
-
-        # Build PNG data
-        png_data = b'\x89PNG\r\n\x1a\n'  # PNG signature
-
-        # IHDR chunk (image header)
-        ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # RGB, 8-bit
-        png_data += write_chunk(b'IHDR', ihdr)
-
-        # IDAT chunk (image data)
-        raw_data = bytearray()
-        for row in sprite:
-            raw_data.append(0)  # Filter type (0 = None)
-            for color in row:
-                raw_data.extend([color.r, color.g, color.b])
-
-        compressed = zlib.compress(bytes(raw_data), 9)
-        png_data += write_chunk(b'IDAT', compressed)
-
-        # IEND chunk (end of file)
-        png_data += write_chunk(b'IEND', b'')
-
-        # Write to file
         with open(filename, 'wb') as f:
             f.write(png_data)
 
     @staticmethod
-    def export_creature_sprites_to_png(front_sprite: List[List[Color]],
-                                      back_sprite: List[List[Color]],
-                                      mini_sprite: List[List[Color]],
+    def export_creature_sprites_to_png(front_sprite,
+                                      back_sprite,
+                                      mini_sprite,
                                       creature_name: str,
                                       output_dir: str = "sprites",
-                                      scale: int = 2):
+                                      scale: int = 2,
+                                      compression_level: int = DEFAULT_COMPRESSION_LEVEL):
         """
         Export all three sprites for a creature to PNG files.
 
         Args:
-            front_sprite: Front-facing sprite
-            back_sprite: Back-facing sprite
-            mini_sprite: Mini sprite for overworld
+            front_sprite: Front-facing sprite (IndexedSprite or Color array)
+            back_sprite: Back-facing sprite (IndexedSprite or Color array)
+            mini_sprite: Mini sprite for overworld (IndexedSprite or Color array)
             creature_name: Name of the creature (for filenames)
             output_dir: Directory to save sprites (will be created if needed)
             scale: Scale factor for upscaling (default 2x)
+            compression_level: zlib compression level (0-9)
         """
         import os
 
@@ -575,26 +697,30 @@ class SpriteGenerator:
         SpriteGenerator.export_sprite_to_png(
             front_sprite,
             os.path.join(output_dir, f"{creature_name}_front.png"),
-            scale=scale
+            scale=scale,
+            compression_level=compression_level
         )
 
         SpriteGenerator.export_sprite_to_png(
             back_sprite,
             os.path.join(output_dir, f"{creature_name}_back.png"),
-            scale=scale
+            scale=scale,
+            compression_level=compression_level
         )
 
         SpriteGenerator.export_sprite_to_png(
             mini_sprite,
             os.path.join(output_dir, f"{creature_name}_mini.png"),
-            scale=scale * 2  # Mini sprites get extra scaling since they're smaller
+            scale=scale * 2,  # Mini sprites get extra scaling since they're smaller
+            compression_level=compression_level
         )
 
     @staticmethod
     def export_all_creatures_to_png(species_dict: dict,
                                    output_dir: str = "sprites_export",
                                    scale: int = 2,
-                                   progress_callback=None):
+                                   progress_callback=None,
+                                   compression_level: int = DEFAULT_COMPRESSION_LEVEL):
         """
         Export all 151 creatures to PNG files in bulk.
 
@@ -603,6 +729,7 @@ class SpriteGenerator:
             output_dir: Directory to save all sprites (will be created if needed)
             scale: Scale factor for upscaling (default 2x)
             progress_callback: Optional function(current, total, name) called for each creature
+            compression_level: zlib compression level (0-9)
 
         Returns:
             Number of creatures exported successfully
@@ -625,22 +752,23 @@ class SpriteGenerator:
                     print(f"Warning: No sprite data for creature #{creature_id} ({species.name})")
                     continue
 
-                # Convert hex sprites to Color sprites
-                front_color = SpriteGenerator.hex_array_to_color_array(sprite_data['front'])
-                back_color = SpriteGenerator.hex_array_to_color_array(sprite_data['back'])
-                mini_color = SpriteGenerator.hex_array_to_color_array(sprite_data['mini'])
+                # Index hex sprites directly (no intermediate Color objects)
+                front = IndexedSprite.from_hex_array(sprite_data['front'])
+                back = IndexedSprite.from_hex_array(sprite_data['back'])
+                mini = IndexedSprite.from_hex_array(sprite_data['mini'])
 
                 # Create sanitized filename
                 safe_name = f"{creature_id:03d}_{species.name.replace(' ', '_').replace('/', '_')}"
 
                 # Export all three sprites
                 SpriteGenerator.export_creature_sprites_to_png(
-                    front_color,
-                    back_color,
-                    mini_color,
+                    front,
+                    back,
+                    mini,
                     safe_name,
                     output_dir,
-                    scale
+                    scale,
+                    compression_level
                 )
 
                 exported += 1
@@ -653,3 +781,133 @@ class SpriteGenerator:
                 print(f"Error exporting creature #{creature_id} ({species.name}): {e}")
 
         return exported
+
+    @staticmethod
+    def export_all_creatures_to_png_parallel(species_dict: dict,
+                                            output_dir: str = "sprites_export",
+                                            scale: int = 2,
+                                            workers: Optional[int] = None,
+                                            progress_callback=None,
+                                            compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+                                            executor=None) -> dict:
+        """
+        Export all creatures to PNG files using a process pool.
+
+        The calling process only schedules jobs: each worker indexes one
+        creature's hex sprites (IndexedSprite values are sent as bytes),
+        then encodes and writes its three PNG files. Output is identical to
+        export_all_creatures_to_png().
+
+        Args:
+            species_dict: Dictionary of creature_id -> CreatureSpecies
+            output_dir: Directory to save all sprites (will be created if needed)
+            scale: Scale factor for upscaling (default 2x)
+            workers: Number of worker processes (default: CPU count); 1 exports inline
+            progress_callback: Optional function(current, total, name) called for each creature
+            compression_level: zlib compression level (0-9)
+            executor: Optional concurrent.futures executor to reuse across calls
+                      (e.g. when exporting many seeds)
+
+        Returns:
+            Dictionary with 'exported', 'failed', 'files', 'bytes', 'seconds'
+            and 'creatures_per_second'
+        """
+        import os
+        import time
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        start = time.perf_counter()
+        os.makedirs(output_dir, exist_ok=True)
+
+        jobs = []
+        names = {}
+        for creature_id, species in sorted(species_dict.items()):
+            if not getattr(species, 'sprite_data', None):
+                print(f"Warning: No sprite data for creature #{creature_id} ({species.name})")
+                continue
+            try:
+                # Hex arrays are indexed by the workers; indexed sprites travel as bytes
+                sprites = {}
+                for view in ('front', 'back', 'mini'):
+                    sprite = species.sprite_data[view]
+                    sprites[view] = sprite.to_bytes() if isinstance(sprite, IndexedSprite) else sprite
+            except KeyError as e:
+                print(f"Error exporting creature #{creature_id} ({species.name}): missing sprite {e}")
+                continue
+            safe_name = f"{creature_id:03d}_{species.name.replace(' ', '_').replace('/', '_')}"
+            names[creature_id] = species.name
+            jobs.append((creature_id, safe_name, sprites, output_dir, scale, compression_level))
+
+        total = len(species_dict)
+        stats = {'exported': 0, 'failed': 0, 'files': 0, 'bytes': 0}
+
+        def record(creature_id, result):
+            bytes_written, error = result
+            if error:
+                stats['failed'] += 1
+                print(f"Error exporting creature #{creature_id} ({names[creature_id]}): {error}")
+                return
+            stats['exported'] += 1
+            stats['files'] += 3
+            stats['bytes'] += bytes_written
+            if progress_callback:
+                progress_callback(stats['exported'], total, names[creature_id])
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if executor is None and (workers <= 1 or len(jobs) <= 1):
+            for job in jobs:
+                record(job[0], _export_creature_job(job))
+        else:
+            pool = executor or ProcessPoolExecutor(max_workers=workers)
+            try:
+                futures = {pool.submit(_export_creature_job, job): job[0] for job in jobs}
+                for future in as_completed(futures):
+                    record(futures[future], future.result())
+            finally:
+                if executor is None:
+                    pool.shutdown()
+
+        stats['seconds'] = time.perf_counter() - start
+        stats['creatures_per_second'] = (
+            stats['exported'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        )
+        return stats
+
+
+def _export_creature_job(job: tuple) -> Tuple[int, Optional[str]]:
+    """
+    Export one creature's sprites (process pool worker).
+
+    Args:
+        job: (creature_id, safe_name, {view: hex array or IndexedSprite bytes},
+              output_dir, scale, compression_level)
+
+    Returns:
+        (bytes written, error message or None)
+    """
+    import os
+
+    _, safe_name, views, output_dir, scale, compression_level = job
+    try:
+        sprites = {
+            view: IndexedSprite.from_bytes(data) if isinstance(data, bytes) else
+            IndexedSprite.from_hex_array(data)
+            for view, data in views.items()
+        }
+        SpriteGenerator.export_creature_sprites_to_png(
+            sprites['front'],
+            sprites['back'],
+            sprites['mini'],
+            safe_name,
+            output_dir,
+            scale,
+            compression_level
+        )
+        return sum(
+            os.path.getsize(os.path.join(output_dir, f"{safe_name}_{view}.png"))
+            for view in ('front', 'back', 'mini')
+        ), None
+    except (OSError, ValueError) as e:
+        return 0, str(e)
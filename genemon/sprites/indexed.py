@@ -0,0 +1,334 @@
+"""
+Palette-indexed sprite representation.
+
+Sprites are produced by the rasterizer as 2D arrays of Color objects and
+serialized as 2D arrays of hex strings. Both forms cost one Python object per
+pixel. An IndexedSprite stores the same image as one byte per pixel plus a
+small RGB palette, which is what PNG export, terminal rendering and
+serialization actually need.
+"""
+
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+# Index 0 is reserved for transparent pixels in every indexed sprite
+TRANSPARENT_INDEX = 0
+
+# Maximum number of opaque colors (index 0 is reserved for transparency)
+MAX_PALETTE_SIZE = 255
+
+RGB = Tuple[int, int, int]
+
+# Binary layout: width, height, palette size, then palette RGB triples and pixels
+_HEADER = struct.Struct('>HHB')
+
+
+class IdentityCache:
+    """
+    Small LRU cache keyed by object identity.
+
+    Hex sprite arrays are unhashable lists, and hashing their contents would
+    cost as much as the work being cached. Entries hold a reference to the
+    key object so its id cannot be reused while cached. List keys (hex
+    arrays) also keep a copy of their rows, and a lookup whose key was
+    changed in place since it was cached is a miss; other keys (such as
+    IndexedSprite) must not be mutated. Safe to share between threads (e.g.
+    the background save writer).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept
+        """
+        self.maxsize = maxsize
+        # (id(obj), key) -> (obj, copy of a list obj's rows or None, value)
+        self._entries: 'OrderedDict[Tuple[int, Hashable], Tuple[object, Optional[list], Any]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _snapshot(obj: object) -> Optional[list]:
+        """Copy the rows of a list key (compared element by element on lookup)."""
+        if isinstance(obj, list):
+            return [row[:] if isinstance(row, list) else row for row in obj]
+        return None
+
+    def get(self, obj: object, key: Hashable = None) -> Optional[Any]:
+        """
+        Return the value cached for obj, or None.
+
+        Args:
+            obj: Key object
+            key: Extra key part (e.g. render options) for several values per object
+        """
+        entry_key = (id(obj), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None or entry[0] is not obj:
+                return None
+            if entry[1] is not None and entry[1] != obj:
+                # Changed in place since it was cached
+                del self._entries[entry_key]
+                return None
+            self._entries.move_to_end(entry_key)
+            return entry[2]
+
+    def put(self, obj: object, value: Any, key: Hashable = None) -> None:
+        """Cache value for obj (and key)."""
+        entry_key = (id(obj), key)
+        snapshot = self._snapshot(obj)
+        with self._lock:
+            self._entries[entry_key] = (obj, snapshot, value)
+            self._entries.move_to_end(entry_key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def hex_to_rgb(hex_color: str) -> RGB:
+    """Convert a '#rrggbb' string to an (r, g, b) tuple."""
+    hex_color = hex_color.lstrip('#')
+    return (int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16))
+
+
+def rgb_to_hex(rgb: RGB) -> str:
+    """Convert an (r, g, b) tuple to a '#rrggbb' string."""
+    return "#%02x%02x%02x" % rgb
+
+
+class IndexedSprite:
+    """
+    A sprite stored as palette indices.
+
+    Pixels are stored row-major, one byte per pixel. Index 0 is transparent;
+    index n (n >= 1) refers to palette[n - 1].
+    """
+
+    __slots__ = ('width', 'height', 'pixels', 'palette')
+
+    def __init__(self, width: int, height: int, pixels: bytes, palette: Sequence[RGB]):
+        """
+        Initialize an indexed sprite.
+
+        Args:
+            width: Sprite width in pixels
+            height: Sprite height in pixels
+            pixels: Row-major index buffer (width * height bytes)
+            palette: Opaque palette colors as (r, g, b) tuples
+
+        Raises:
+            ValueError: If the buffer size or palette size is invalid
+        """
+        if len(pixels) != width * height:
+            raise ValueError(
+                f"Pixel buffer has {len(pixels)} bytes, expected {width * height}"
+            )
+        if len(palette) > MAX_PALETTE_SIZE:
+            raise ValueError(f"Palette has {len(palette)} colors, maximum is {MAX_PALETTE_SIZE}")
+
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+        self.palette = tuple(tuple(c) for c in palette)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IndexedSprite):
+            return NotImplemented
+        return (self.width == other.width and self.height == other.height and
+                self.palette == other.palette and bytes(self.pixels) == bytes(other.pixels))
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.palette, bytes(self.pixels)))
+
+    def __repr__(self) -> str:
+        return f"IndexedSprite({self.width}x{self.height}, {len(self.palette)} colors)"
+
+    def row(self, y: int) -> bytes:
+        """Return the index bytes for row y."""
+        start = y * self.width
+        return bytes(self.pixels[start:start + self.width])
+
+    def rows(self) -> List[bytes]:
+        """Return all rows as index byte strings."""
+        return [self.row(y) for y in range(self.height)]
+
+    def with_palette(self, palette: Sequence[RGB]) -> 'IndexedSprite':
+        """
+        Return a sprite sharing this index buffer with a different palette.
+
+        Args:
+            palette: Replacement palette (same length as the current one)
+
+        Returns:
+            New IndexedSprite
+
+        Raises:
+            ValueError: If the palette length does not match
+        """
+        if len(palette) != len(self.palette):
+            raise ValueError(
+                f"Palette has {len(palette)} colors, expected {len(self.palette)}"
+            )
+        return IndexedSprite(self.width, self.height, self.pixels, palette)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize to a compact binary form.
+
+        Layout: width (u16), height (u16), palette size (u8), palette as
+        RGB triples, then the index buffer.
+        """
+        return b''.join([
+            _HEADER.pack(self.width, self.height, len(self.palette)),
+            bytes(c for rgb in self.palette for c in rgb),
+            bytes(self.pixels)
+        ])
+
+    @classmethod
+    def from_bytes(cls, data) -> 'IndexedSprite':
+        """
+        Deserialize from the form produced by to_bytes().
+
+        The pixel buffer is a slice of data, so passing a memoryview gives a
+        zero-copy sprite.
+
+        Args:
+            data: bytes, bytearray or memoryview
+
+        Returns:
+            IndexedSprite
+
+        Raises:
+            ValueError: If data is truncated or malformed
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Sprite data is truncated")
+        width, height, palette_size = _HEADER.unpack_from(data)
+        pos = _HEADER.size
+        raw_palette = bytes(data[pos:pos + 3 * palette_size])
+        pos += 3 * palette_size
+        if len(raw_palette) != 3 * palette_size:
+            raise ValueError("Sprite data is truncated")
+
+        palette = [tuple(raw_palette[i:i + 3]) for i in range(0, len(raw_palette), 3)]
+        return cls(width, height, data[pos:pos + width * height], palette)
+
+    def digest(self) -> str:
+        """Return the SHA-256 hex digest of the binary form (content address)."""
+        return hashlib.sha256(self.to_bytes()).hexdigest()
+
+    def to_hex_array(self) -> List[List[str]]:
+        """Convert to the 2D hex string array used by sprite_data."""
+        lookup = ["transparent"] + [rgb_to_hex(c) for c in self.palette]
+        width = self.width
+        pixels = bytes(self.pixels)
+        return [
+            [lookup[i] for i in pixels[y * width:(y + 1) * width]]
+            for y in range(self.height)
+        ]
+
+    @classmethod
+    def from_hex_array(cls, hex_sprite: List[List[str]]) -> 'IndexedSprite':
+        """
+        Build an indexed sprite from a 2D hex string array.
+
+        Palette order follows first appearance in row-major order.
+
+        Args:
+            hex_sprite: 2D array of '#rrggbb' strings or "transparent"
+
+        Returns:
+            IndexedSprite
+
+        Raises:
+            ValueError: If the sprite uses more than 255 colors
+        """
+        height = len(hex_sprite)
+        width = len(hex_sprite[0]) if height > 0 else 0
+
+        index_of: Dict[str, int] = {"transparent": TRANSPARENT_INDEX}
+        palette: List[RGB] = []
+        pixels = bytearray(width * height)
+        pos = 0
+
+        for row in hex_sprite:
+            for hex_color in row:
+                index = index_of.get(hex_color)
+                if index is None:
+                    palette.append(hex_to_rgb(hex_color))
+                    if len(palette) > MAX_PALETTE_SIZE:
+                        raise ValueError(f"Sprite uses more than {MAX_PALETTE_SIZE} colors")
+                    index = len(palette)
+                    index_of[hex_color] = index
+                pixels[pos] = index
+                pos += 1
+
+        return cls(width, height, bytes(pixels), palette)
+
+    @classmethod
+    def from_color_array(cls, sprite: list, palette: Optional[list] = None) -> 'IndexedSprite':
+        """
+        Build an indexed sprite from a 2D array of Color objects.
+
+        When palette is given, its Color objects occupy the first palette
+        slots in order (matched by identity, as the rasterizer draws with
+        the palette objects themselves). Any other colors are appended by
+        RGB value.
+
+        Args:
+            sprite: 2D array of Color objects
+            palette: Optional list of Color objects used to draw the sprite
+
+        Returns:
+            IndexedSprite
+
+        Raises:
+            ValueError: If the sprite uses more than 255 colors
+        """
+        from .generator import TRANSPARENT
+
+        height = len(sprite)
+        width = len(sprite[0]) if height > 0 else 0
+
+        rgb_palette: List[RGB] = []
+        index_of_obj: Dict[int, int] = {id(TRANSPARENT): TRANSPARENT_INDEX}
+        index_of_rgb: Dict[RGB, int] = {}
+
+        if palette:
+            for color in palette:
+                rgb_palette.append(color.to_tuple())
+                index_of_obj.setdefault(id(color), len(rgb_palette))
+
+        pixels = bytearray(width * height)
+        pos = 0
+
+        for row in sprite:
+            for color in row:
+                index = index_of_obj.get(id(color))
+                if index is None:
+                    rgb = color.to_tuple()
+                    index = index_of_rgb.get(rgb)
+                    if index is None:
+                        rgb_palette.append(rgb)
+                        if len(rgb_palette) > MAX_PALETTE_SIZE:
+                            raise ValueError(f"Sprite uses more than {MAX_PALETTE_SIZE} colors")
+                        index = len(rgb_palette)
+                        index_of_rgb[rgb] = index
+                pixels[pos] = index
+                pos += 1
+
+        return cls(width, height, bytes(pixels), rgb_palette)
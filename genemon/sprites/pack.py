@@ -0,0 +1,276 @@
+"""
+Memory-mapped sprite pack files.
+
+A pack holds the indexed sprites of a whole roster for one seed in a single
+binary file. Readers open it with mmap and hand out IndexedSprites whose
+pixel buffers are memoryview slices of the mapping, so every process serving
+the same seed shares one copy of the sprites through the page cache.
+
+Layout (big-endian):
+    header        magic, version, seed, record count, record size,
+                  palette slots, then width/height of each view
+    offset table  (creature_id u16, fingerprint u32, offset u32) per record,
+                  sorted by creature_id
+    records       fixed-size; for each view: palette size (u8), palette
+                  padded to palette slots, then width * height index bytes
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..core.save_writer import replacement_mode
+from .indexed import IndexedSprite
+
+
+PACK_MAGIC = b'GSPK'
+PACK_VERSION = 1
+
+# Views stored per creature, with their fixed dimensions
+PACK_VIEWS: Tuple[Tuple[str, int, int], ...] = (
+    ('front', 56, 56),
+    ('back', 56, 56),
+    ('mini', 16, 16),
+)
+
+# Palette entries reserved per view (type palettes use well under this)
+PACK_PALETTE_SLOTS = 16
+
+_PACK_HEADER = struct.Struct('>4sHIIIB')
+_VIEW_DIMENSIONS = struct.Struct('>HH')
+_OFFSET_ENTRY = struct.Struct('>HII')
+
+
+def sprite_fingerprint(types: List[str], archetype: str) -> int:
+    """
+    Fingerprint the generator inputs a record was rasterized from.
+
+    Args:
+        types: Creature types
+        archetype: Body type
+
+    Returns:
+        32-bit checksum of the inputs
+    """
+    return zlib.crc32(("/".join(types) + "|" + archetype).encode('utf-8'))
+
+
+def _record_size(views=PACK_VIEWS, palette_slots: int = PACK_PALETTE_SLOTS) -> int:
+    """Get the size in bytes of one creature record."""
+    return sum(1 + 3 * palette_slots + width * height for _, width, height in views)
+
+
+def write_sprite_pack(path: str, seed: int,
+                      entries: Iterable[Tuple[int, int, Dict[str, IndexedSprite]]]) -> int:
+    """
+    Write a sprite pack file.
+
+    The file is written to a temporary name and renamed into place, so
+    processes that already have the old pack mapped are unaffected.
+
+    Args:
+        path: Output file path
+        seed: Seed the sprites were generated from
+        entries: Iterable of (creature_id, fingerprint, sprites) where sprites
+                 maps each view in PACK_VIEWS to an IndexedSprite
+
+    Returns:
+        Number of records written
+
+    Raises:
+        ValueError: If a sprite does not fit the fixed record layout
+    """
+    entries = sorted(entries, key=lambda entry: entry[0])
+    record_size = _record_size()
+
+    header = [_PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, seed, len(entries),
+                                record_size, PACK_PALETTE_SLOTS)]
+    header.extend(_VIEW_DIMENSIONS.pack(width, height) for _, width, height in PACK_VIEWS)
+    records_start = (sum(len(part) for part in header) +
+                     _OFFSET_ENTRY.size * len(entries))
+
+    table = []
+    records = []
+    for i, (creature_id, fingerprint, sprites) in enumerate(entries):
+        table.append(_OFFSET_ENTRY.pack(creature_id, fingerprint,
+                                        records_start + i * record_size))
+        for view, width, height in PACK_VIEWS:
+            sprite = sprites[view]
+            if (sprite.width, sprite.height) != (width, height):
+                raise ValueError(
+                    f"Creature #{creature_id} {view} sprite is "
+                    f"{sprite.width}x{sprite.height}, expected {width}x{height}"
+                )
+            if len(sprite.palette) > PACK_PALETTE_SLOTS:
+                raise ValueError(
+                    f"Creature #{creature_id} {view} sprite has "
+                    f"{len(sprite.palette)} colors, pack allows {PACK_PALETTE_SLOTS}"
+                )
+            palette = bytes(c for rgb in sprite.palette for c in rgb)
+            records.append(bytes([len(sprite.palette)]))
+            records.append(palette.ljust(3 * PACK_PALETTE_SLOTS, b'\x00'))
+            records.append(bytes(sprite.pixels))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b''.join(header + table + records))
+        os.chmod(tmp_path, replacement_mode(path))
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return len(entries)
+
+
+class SpritePack:
+    """
+    Read-only view of a sprite pack file.
+
+    Sprites returned by get() reference the memory mapping directly; keep
+    the pack open while they are in use.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open and map a sprite pack.
+
+        Args:
+            path: Pack file path
+
+        Raises:
+            ValueError: If the file is not a valid sprite pack
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"Sprite pack is empty: {path}")
+        self._buffer = memoryview(self._mmap)
+
+        try:
+            self._read_header()
+        except (ValueError, struct.error) as e:
+            self.close()
+            raise ValueError(f"Invalid sprite pack {path}: {e}")
+
+    def _read_header(self) -> None:
+        """Parse the header and offset table."""
+        magic, version, seed, count, record_size, palette_slots = \
+            _PACK_HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError("bad magic")
+        if version != PACK_VERSION:
+            raise ValueError(f"unsupported version {version}")
+
+        pos = _PACK_HEADER.size
+        views = []
+        for view, _, _ in PACK_VIEWS:
+            width, height = _VIEW_DIMENSIONS.unpack_from(self._mmap, pos)
+            views.append((view, width, height))
+            pos += _VIEW_DIMENSIONS.size
+
+        if record_size != _record_size(views, palette_slots):
+            raise ValueError("record size does not match layout")
+
+        self.seed = seed
+        self._views = views
+        self._palette_slots = palette_slots
+        self._offsets: Dict[int, Tuple[int, int]] = {}
+        for _ in range(count):
+            creature_id, fingerprint, offset = _OFFSET_ENTRY.unpack_from(self._mmap, pos)
+            if offset + record_size > len(self._mmap):
+                raise ValueError(f"record #{creature_id} is truncated")
+            self._offsets[creature_id] = (fingerprint, offset)
+            pos += _OFFSET_ENTRY.size
+
+    def __enter__(self) -> 'SpritePack':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, creature_id: int) -> bool:
+        return creature_id in self._offsets
+
+    def ids(self) -> List[int]:
+        """Return the creature IDs in the pack, sorted."""
+        return sorted(self._offsets)
+
+    def fingerprint(self, creature_id: int) -> Optional[int]:
+        """Return the stored fingerprint for a creature, or None if absent."""
+        entry = self._offsets.get(creature_id)
+        return entry[0] if entry else None
+
+    def get(self, creature_id: int) -> Dict[str, IndexedSprite]:
+        """
+        Get a creature's sprites without copying pixel data.
+
+        Args:
+            creature_id: Creature ID
+
+        Returns:
+            Dictionary of view name -> IndexedSprite backed by the mapping
+
+        Raises:
+            KeyError: If the creature is not in the pack
+        """
+        _, pos = self._offsets[creature_id]
+        buffer = self._buffer
+        sprites = {}
+        for view, width, height in self._views:
+            palette_size = buffer[pos]
+            raw_palette = bytes(buffer[pos + 1:pos + 1 + 3 * palette_size])
+            pos += 1 + 3 * self._palette_slots
+            palette = [tuple(raw_palette[i:i + 3]) for i in range(0, len(raw_palette), 3)]
+            sprites[view] = IndexedSprite(width, height, buffer[pos:pos + width * height], palette)
+            pos += width * height
+        return sprites
+
+    def close(self) -> None:
+        """
+        Release the mapping.
+
+        If sprites from this pack are still referenced, the mapping stays
+        alive until they are garbage collected.
+        """
+        if self._buffer is None:
+            return
+        self._buffer.release()
+        self._buffer = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+
+def build_sprite_pack(path: str, sprite_gen,
+                      roster: Iterable[Tuple[int, List[str], str]]) -> int:
+    """
+    Rasterize a roster with a SpriteGenerator and write it as a pack.
+
+    Args:
+        path: Output file path
+        sprite_gen: SpriteGenerator for the pack's seed
+        roster: Iterable of (creature_id, types, archetype)
+
+    Returns:
+        Number of records written
+    """
+    entries = [
+        (creature_id, sprite_fingerprint(types, archetype),
+         sprite_gen.generate_indexed_sprites(creature_id, types, archetype))
+        for creature_id, types, archetype in roster
+    ]
+    return write_sprite_pack(path, sprite_gen.seed, entries)
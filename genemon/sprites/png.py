@@ -0,0 +1,124 @@
+"""
+Pure Python PNG encoding for sprites (no PIL/Pillow required).
+
+Indexed sprites are written as palette PNGs (color type 3) with a tRNS chunk
+marking index 0 as transparent. Scanlines are built with bytes slicing and
+multiplication rather than per-pixel Python loops.
+"""
+
+import struct
+import zlib
+from typing import List
+
+from .indexed import IndexedSprite
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# zlib level used when none is given; level 9 is rarely worth its cost
+# for sprite-sized images
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# PNG color types
+COLOR_TYPE_RGB = 2
+COLOR_TYPE_PALETTE = 3
+
+
+def _chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Build a PNG chunk with length, type, data, and CRC."""
+    crc = zlib.crc32(data, zlib.crc32(chunk_type)) & 0xffffffff
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', crc)
+
+
+def _scale_row(row: bytes, scale: int, bytes_per_pixel: int = 1) -> bytes:
+    """
+    Repeat every pixel of a row `scale` times horizontally.
+
+    Uses extended slice assignment so the copying happens in C.
+    """
+    if scale == 1:
+        return bytes(row)
+
+    out = bytearray(len(row) * scale)
+    step = bytes_per_pixel * scale
+    for k in range(scale):
+        for channel in range(bytes_per_pixel):
+            out[k * bytes_per_pixel + channel::step] = row[channel::bytes_per_pixel]
+    return bytes(out)
+
+
+def _build_image_data(rows: List[bytes], scale: int, bytes_per_pixel: int) -> bytes:
+    """Build the filtered (filter type 0) scanline stream for all rows."""
+    lines = []
+    for row in rows:
+        line = b'\x00' + _scale_row(row, scale, bytes_per_pixel)
+        lines.append(line * scale)
+    return b''.join(lines)
+
+
+def _encode(width: int, height: int, color_type: int, image_data: bytes,
+            extra_chunks: bytes, compression_level: int) -> bytes:
+    """Assemble a complete PNG file."""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)
+    return b''.join([
+        PNG_SIGNATURE,
+        _chunk(b'IHDR', ihdr),
+        extra_chunks,
+        _chunk(b'IDAT', zlib.compress(image_data, compression_level)),
+        _chunk(b'IEND', b''),
+    ])
+
+
+def encode_indexed_png(
+    sprite: IndexedSprite,
+    scale: int = 1,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+) -> bytes:
+    """
+    Encode an indexed sprite as an 8-bit palette PNG.
+
+    Args:
+        sprite: Sprite to encode
+        scale: Integer upscaling factor (nearest neighbour)
+        compression_level: zlib compression level (0-9)
+
+    Returns:
+        PNG file contents
+    """
+    scale = max(1, int(scale))
+
+    # Index 0 is transparent; its PLTE entry is never visible
+    plte = b'\x00\x00\x00' + b''.join(bytes(c) for c in sprite.palette)
+    extra = _chunk(b'PLTE', plte) + _chunk(b'tRNS', b'\x00')
+
+    image_data = _build_image_data(sprite.rows(), scale, 1)
+    return _encode(sprite.width * scale, sprite.height * scale,
+                   COLOR_TYPE_PALETTE, image_data, extra, compression_level)
+
+
+def encode_rgb_png(
+    rows: List[bytes],
+    width: int,
+    height: int,
+    scale: int = 1,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+) -> bytes:
+    """
+    Encode packed RGB rows as a 24-bit PNG.
+
+    Used for images with more colors than a palette PNG can hold.
+
+    Args:
+        rows: One bytes object per row, 3 bytes per pixel
+        width: Image width in pixels
+        height: Image height in pixels
+        scale: Integer upscaling factor (nearest neighbour)
+        compression_level: zlib compression level (0-9)
+
+    Returns:
+        PNG file contents
+    """
+    scale = max(1, int(scale))
+    image_data = _build_image_data(rows, scale, 3)
+    return _encode(width * scale, height * scale, COLOR_TYPE_RGB,
+                   image_data, b'', compression_level)
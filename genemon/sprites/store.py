@@ -0,0 +1,264 @@
+"""
+Content-addressed sprite store.
+
+Sprites are stored once per host under the saves directory, keyed by the
+SHA-256 digest of their indexed binary form. Save files and trade packages
+reference sprites by digest instead of embedding full hex arrays, so the same
+species sprite shared by many saves costs disk space only once.
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple, Union
+
+from ..core.save_writer import replacement_mode
+from .indexed import IdentityCache, IndexedSprite
+from .codec import decode_sprite_set_indexed, is_encoded_sprite_set
+
+
+# Key used in serialized species data in place of 'sprite_data'
+SPRITE_REFS_KEY = 'sprite_refs'
+
+SpriteLike = Union[IndexedSprite, List[List[str]]]
+
+
+class SpriteStore:
+    """
+    Stores indexed sprites as files named by their content digest.
+
+    Layout: <root>/<first two hex digits>/<remaining digits>.spr, each file
+    holding the zlib-compressed IndexedSprite.to_bytes() form.
+    """
+
+    def __init__(self, root: str, max_cached_sprites: int = 1024):
+        """
+        Initialize a sprite store.
+
+        Directories are created lazily on the first write.
+
+        Args:
+            root: Store directory (e.g. "saves/sprites")
+            max_cached_sprites: Size of the in-memory LRU cache of loaded sprites
+        """
+        self.root = root
+        self.max_cached_sprites = max_cached_sprites
+        self._sprites: 'OrderedDict[str, IndexedSprite]' = OrderedDict()
+        # hex array -> digest; avoids re-indexing unchanged sprites on every save
+        self._digests = IdentityCache(max_cached_sprites)
+
+    def _path(self, digest: str) -> str:
+        """Get the file path for a digest."""
+        return os.path.join(self.root, digest[:2], digest[2:] + ".spr")
+
+    def _remember(self, digest: str, sprite: IndexedSprite) -> None:
+        """Add a sprite to the LRU cache."""
+        self._sprites[digest] = sprite
+        self._sprites.move_to_end(digest)
+        if len(self._sprites) > self.max_cached_sprites:
+            self._sprites.popitem(last=False)
+
+    def has(self, digest: str) -> bool:
+        """Check whether a sprite is stored."""
+        return digest in self._sprites or os.path.exists(self._path(digest))
+
+    def put(self, sprite: SpriteLike) -> str:
+        """
+        Store a sprite if not already present.
+
+        Args:
+            sprite: IndexedSprite or 2D array of hex color strings
+
+        Returns:
+            Content digest of the sprite
+        """
+        if isinstance(sprite, IndexedSprite):
+            indexed = sprite
+        else:
+            digest = self._digests.get(sprite)
+            if digest is not None and os.path.exists(self._path(digest)):
+                return digest
+            indexed = IndexedSprite.from_hex_array(sprite)
+
+        data = indexed.to_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+
+        if not os.path.exists(path):
+            # Write to a temp file and rename so readers never see partial data
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(zlib.compress(data))
+                os.chmod(tmp_path, replacement_mode(path))
+                os.replace(tmp_path, path)
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        if not isinstance(sprite, IndexedSprite):
+            self._digests.put(sprite, digest)
+        self._remember(digest, indexed)
+        return digest
+
+    def get(self, digest: str) -> IndexedSprite:
+        """
+        Load a sprite by digest.
+
+        Args:
+            digest: Content digest returned by put()
+
+        Returns:
+            IndexedSprite
+
+        Raises:
+            KeyError: If the sprite is not in the store
+            ValueError: If the stored file is corrupt
+        """
+        sprite = self._sprites.get(digest)
+        if sprite is not None:
+            self._sprites.move_to_end(digest)
+            return sprite
+
+        try:
+            with open(self._path(digest), 'rb') as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            raise KeyError(f"Sprite not found in store: {digest}")
+        except zlib.error as e:
+            raise ValueError(f"Corrupt sprite {digest}: {e}")
+
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Corrupt sprite {digest}: digest mismatch")
+
+        sprite = IndexedSprite.from_bytes(data)
+        self._remember(digest, sprite)
+        return sprite
+
+    def digests(self) -> List[str]:
+        """List the digests of every stored sprite."""
+        digests = []
+        try:
+            prefixes = os.listdir(self.root)
+        except FileNotFoundError:
+            return digests
+        for prefix in prefixes:
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            digests.extend(prefix + name[:-len(".spr")]
+                           for name in os.listdir(directory) if name.endswith(".spr"))
+        return digests
+
+    def remove(self, digests: Iterable[str]) -> Tuple[int, int]:
+        """
+        Delete stored sprites.
+
+        Clears the in-memory caches; a sprite put() again afterwards is
+        written back to disk.
+
+        Args:
+            digests: Digests of sprites to delete
+
+        Returns:
+            (number of sprites deleted, bytes freed)
+        """
+        removed = freed = 0
+        for digest in digests:
+            path = self._path(digest)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += size
+        self._sprites.clear()
+        self._digests.clear()
+        return removed, freed
+
+    def put_sprite_set(self, sprite_data: Dict[str, SpriteLike]) -> Dict[str, str]:
+        """
+        Store every view of a creature's sprite_data.
+
+        Args:
+            sprite_data: Dictionary of view name -> sprite
+
+        Returns:
+            Dictionary of view name -> digest
+        """
+        return {view: self.put(sprite) for view, sprite in sprite_data.items()}
+
+    def get_sprite_set(self, refs: Dict[str, str]) -> Dict[str, List[List[str]]]:
+        """
+        Load every view referenced by put_sprite_set().
+
+        Args:
+            refs: Dictionary of view name -> digest
+
+        Returns:
+            Dictionary of view name -> 2D array of hex color strings
+        """
+        sprite_data = {}
+        for view, digest in refs.items():
+            hex_array = self.get(digest).to_hex_array()
+            # Loading then re-saving an unchanged sprite needs no re-indexing
+            self._digests.put(hex_array, digest)
+            sprite_data[view] = hex_array
+        return sprite_data
+
+    def externalize_species(self, species_data: dict) -> dict:
+        """
+        Replace embedded sprites in serialized species data with references.
+
+        Args:
+            species_data: Dictionary from CreatureSpecies.to_dict() (modified in place)
+
+        Returns:
+            The same dictionary
+        """
+        sprite_data = species_data.get('sprite_data')
+        if is_encoded_sprite_set(sprite_data):
+            sprite_data = decode_sprite_set_indexed(sprite_data)
+        if sprite_data:
+            species_data[SPRITE_REFS_KEY] = self.put_sprite_set(sprite_data)
+            species_data['sprite_data'] = None
+        return species_data
+
+    @staticmethod
+    def species_refs(species_data: dict) -> List[str]:
+        """
+        Get the sprite digests referenced by serialized species data.
+
+        Args:
+            species_data: Serialized species dictionary
+
+        Returns:
+            List of digests (empty for embedded sprites)
+        """
+        refs = species_data.get(SPRITE_REFS_KEY)
+        return list(refs.values()) if isinstance(refs, dict) else []
+
+    def resolve_species(self, species_data: dict) -> dict:
+        """
+        Replace sprite references in serialized species data with sprites.
+
+        Data without references (legacy embedded sprites) is left unchanged.
+
+        Args:
+            species_data: Serialized species dictionary (modified in place)
+
+        Returns:
+            The same dictionary
+
+        Raises:
+            KeyError: If a referenced sprite is missing from the store
+        """
+        refs = species_data.pop(SPRITE_REFS_KEY, None)
+        if refs:
+            species_data['sprite_data'] = self.get_sprite_set(refs)
+        return species_data
@@ -10,6 +10,7 @@ from .colors import (
     colored, colored_type, colored_hp, colored_status,
     bold, underline, TerminalColors
 )
+from .sprite_renderer import get_sprite_renderer
 
 
 class Display:
@@ -429,48 +430,30 @@ class Display:
         colored_types = ' / '.join([colored_type(t) for t in species.types])
         print(f"\n  Type: {colored_types}")
 
-        # Show front sprite
-        if hasattr(species, 'front_sprite') and species.front_sprite:
-            print(f"\n  {bold('FRONT SPRITE (Battle View):')}")
-            Display._render_sprite_ascii(species.front_sprite)
-
-        # Show back sprite
-        if hasattr(species, 'back_sprite') and species.back_sprite:
-            print(f"\n  {bold('BACK SPRITE (Your Team View):')}")
-            Display._render_sprite_ascii(species.back_sprite)
-
-        # Show mini sprite
-        if hasattr(species, 'mini_sprite') and species.mini_sprite:
-            print(f"\n  {bold('MINI SPRITE (Overworld):')}")
-            Display._render_sprite_ascii(species.mini_sprite)
+        sprite_data = species.sprite_data or {}
+        views = [
+            ('front', 'FRONT SPRITE (Battle View):'),
+            ('back', 'BACK SPRITE (Your Team View):'),
+            ('mini', 'MINI SPRITE (Overworld):'),
+        ]
+        for key, title in views:
+            if sprite_data.get(key):
+                print(f"\n  {bold(title)}")
+                Display._render_sprite_ascii(sprite_data[key])
 
         print(f"\n{'=' * 60}\n")
 
     @staticmethod
-    def _render_sprite_ascii(sprite_data: List[List[str]], scale: int = 1) -> None:
+    def _render_sprite_ascii(sprite_data, scale: int = 1) -> None:
         """
-        Render sprite data as colored ASCII art.
+        Render sprite data as colored half-block art.
 
         Args:
-            sprite_data: 2D array of hex color strings
+            sprite_data: 2D array of hex color strings (or IndexedSprite)
             scale: Scale factor for rendering
         """
         if not sprite_data:
             print("    (No sprite data)")
             return
 
-        # Render sprite with colored blocks
-        for row in sprite_data:
-            line = "    "  # Indent
-            for _ in range(scale):  # Vertical scaling
-                for color_hex in row:
-                    if color_hex == "#000000" or color_hex.lower() == "transparent":
-                        # Transparent or black - use space
-                        char = "  " * scale
-                    else:
-                        # Use colored block character
-                        char = "\u2588\u2588" * scale  # Full block
-                    line += char
-                print(line)
-                if scale > 1:
-                    line = "    "
+        get_sprite_renderer().draw(sprite_data, scale=scale)
@@ -2,7 +2,7 @@
 Menu management system for the game.
 
 This module handles all in-game menus including team, items, shop, badges,
-Pokedex, type chart, sprite viewer, and settings.
+Pokedex, type chart, sprite viewer, settings, and damaged save recovery.
 """
 
 from typing import Optional
@@ -466,3 +466,32 @@ class MenuManager:
                     config.reset_to_defaults()
                     print("\nSettings reset to defaults!")
                     input("Press Enter to continue...")
+
+    def show_recovery_menu(self, save_manager, save_name: str):
+        """
+        Offer to salvage a save that failed to load because it is damaged.
+
+        Args:
+            save_manager: SaveManager the save belongs to
+            save_name: Save that failed to load
+
+        Returns:
+            The recovered GameState, or None
+        """
+        report = save_manager.verify_save(save_name)
+        if report['ok']:
+            input("Press Enter to continue...")
+            return None
+
+        damage = ", ".join(report['damaged']) or report['error']
+        print(f"\nThis save is damaged ({damage}).")
+        print("Recover the intact parts? Lost parts will be reset.")
+        print("1. Yes")
+        print("2. No")
+        if self.display.get_menu_choice(2) != 0:
+            return None
+
+        state, _ = save_manager.recover_save(save_name)  # Prints what was lost
+        if state is None:
+            input("Press Enter to continue...")
+        return state
@@ -0,0 +1,254 @@
+"""
+Half-block terminal sprite renderer.
+
+Each terminal line shows two pixel rows using the upper half block (▀) with
+the top pixel as foreground color and the bottom pixel as background color,
+so sprites keep their square aspect ratio. Rendered frames are cached per
+(sprite, scale, color_mode), so redrawing a sprite costs a single write.
+"""
+
+import os
+import sys
+from typing import List, Optional, Union
+
+from ..sprites.indexed import IdentityCache, IndexedSprite
+from .colors import ColorSupport
+
+
+# Color modes
+COLOR_TRUECOLOR = "truecolor"
+COLOR_256 = "256"
+COLOR_NONE = "none"
+COLOR_MODES = (COLOR_TRUECOLOR, COLOR_256, COLOR_NONE)
+
+UPPER_HALF = "▀"
+LOWER_HALF = "▄"
+FULL_BLOCK = "█"
+
+RESET = "\033[0m"
+RESET_BG = "\033[49m"
+
+SpriteLike = Union[IndexedSprite, List[List[str]]]
+
+
+def rgb_to_ansi256(r: int, g: int, b: int) -> int:
+    """
+    Map an RGB color to the nearest xterm 256-color palette index.
+
+    Args:
+        r, g, b: Color channels (0-255)
+
+    Returns:
+        Palette index (16-255)
+    """
+    # Near-gray colors use the 24-step grayscale ramp
+    if max(r, g, b) - min(r, g, b) < 10:
+        gray = (r + g + b) // 3
+        if gray < 8:
+            return 16
+        if gray > 238:
+            return 231
+        return 232 + (gray - 8) * 24 // 231
+
+    def to_cube(value: int) -> int:
+        return 0 if value < 48 else (1 if value < 115 else (value - 35) // 40)
+
+    return 16 + 36 * to_cube(r) + 6 * to_cube(g) + to_cube(b)
+
+
+def detect_color_mode() -> str:
+    """
+    Pick the best color mode for the current terminal.
+
+    Returns:
+        One of COLOR_TRUECOLOR, COLOR_256 or COLOR_NONE
+    """
+    if not ColorSupport.is_enabled():
+        return COLOR_NONE
+    if os.environ.get('COLORTERM', '').lower() in ('truecolor', '24bit'):
+        return COLOR_TRUECOLOR
+    return COLOR_256
+
+
+class SpriteRenderer:
+    """
+    Renders sprites to terminal frames using half-block characters.
+
+    Usage:
+        renderer = SpriteRenderer()
+        renderer.draw(species.sprite_data['front'], scale=1)
+    """
+
+    def __init__(self, max_cached_frames: int = 128):
+        """
+        Initialize the renderer.
+
+        Args:
+            max_cached_frames: Maximum number of frames kept in the LRU cache
+        """
+        self.max_cached_frames = max_cached_frames
+        # sprite, (scale, color_mode, indent) -> frame
+        self._frames = IdentityCache(max_cached_frames)
+
+    def clear_cache(self) -> None:
+        """Drop all cached frames."""
+        self._frames.clear()
+
+    def render(
+        self,
+        sprite: SpriteLike,
+        scale: int = 1,
+        color_mode: str = COLOR_TRUECOLOR,
+        indent: str = ""
+    ) -> str:
+        """
+        Render a sprite to a frame string (cached).
+
+        Sprites are cached by identity; a hex array modified in place is
+        detected and rendered again.
+
+        Args:
+            sprite: IndexedSprite or 2D array of hex color strings
+            scale: Integer upscaling factor
+            color_mode: One of COLOR_TRUECOLOR, COLOR_256 or COLOR_NONE
+            indent: Prefix added to every line
+
+        Returns:
+            Frame with one line per two pixel rows, ending in a newline
+
+        Raises:
+            ValueError: If color_mode is unknown
+        """
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Unknown color mode: {color_mode}")
+        scale = max(1, int(scale))
+
+        options = (scale, color_mode, indent)
+        frame = self._frames.get(sprite, options)
+        if frame is not None:
+            return frame
+
+        indexed = sprite if isinstance(sprite, IndexedSprite) else IndexedSprite.from_hex_array(sprite)
+        frame = self._render_frame(indexed, scale, color_mode, indent)
+        self._frames.put(sprite, frame, options)
+        return frame
+
+    def draw(
+        self,
+        sprite: SpriteLike,
+        scale: int = 1,
+        color_mode: Optional[str] = None,
+        indent: str = "    ",
+        stream=None
+    ) -> None:
+        """
+        Write a rendered sprite to a stream with a single write call.
+
+        Args:
+            sprite: IndexedSprite or 2D array of hex color strings
+            scale: Integer upscaling factor
+            color_mode: Color mode, or None to detect from the terminal
+            indent: Prefix added to every line
+            stream: Output stream (defaults to sys.stdout)
+        """
+        if color_mode is None:
+            color_mode = detect_color_mode()
+        (stream or sys.stdout).write(self.render(sprite, scale, color_mode, indent))
+
+    @staticmethod
+    def _render_frame(sprite: IndexedSprite, scale: int, color_mode: str, indent: str) -> str:
+        """Render an indexed sprite without caching."""
+        if color_mode == COLOR_TRUECOLOR:
+            fg = [None] + ["\033[38;2;%d;%d;%dm" % c for c in sprite.palette]
+            bg = [None] + ["\033[48;2;%d;%d;%dm" % c for c in sprite.palette]
+        elif color_mode == COLOR_256:
+            codes = [rgb_to_ansi256(*c) for c in sprite.palette]
+            fg = [None] + ["\033[38;5;%dm" % n for n in codes]
+            bg = [None] + ["\033[48;5;%dm" % n for n in codes]
+        else:
+            fg = bg = None
+
+        # Scale rows horizontally once, then repeat vertically
+        rows = []
+        for row in sprite.rows():
+            if scale > 1:
+                scaled = bytearray(len(row) * scale)
+                for k in range(scale):
+                    scaled[k::scale] = row
+                row = bytes(scaled)
+            rows.extend([row] * scale)
+        if len(rows) % 2:
+            rows.append(bytes(len(rows[0])))
+
+        lines = []
+        for y in range(0, len(rows), 2):
+            lines.append(indent + SpriteRenderer._render_line(rows[y], rows[y + 1], fg, bg))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_line(top: bytes, bottom: bytes, fg: Optional[list], bg: Optional[list]) -> str:
+        """Render one pair of pixel rows as a line of half blocks."""
+        # Trailing transparent cells are not drawn
+        width = len(top)
+        while width and not top[width - 1] and not bottom[width - 1]:
+            width -= 1
+
+        parts = []
+
+        if fg is None:
+            for t, b in zip(top[:width], bottom[:width]):
+                if t and b:
+                    parts.append(FULL_BLOCK)
+                elif t:
+                    parts.append(UPPER_HALF)
+                elif b:
+                    parts.append(LOWER_HALF)
+                else:
+                    parts.append(" ")
+            return "".join(parts)
+
+        # Only emit escapes when the active foreground/background changes
+        cur_fg = cur_bg = 0
+        for t, b in zip(top[:width], bottom[:width]):
+            if t == b:
+                glyph = FULL_BLOCK if t else " "
+                if not t and cur_bg:
+                    parts.append(RESET_BG)
+                    cur_bg = 0
+            elif t and b:
+                glyph = UPPER_HALF
+                if b != cur_bg:
+                    parts.append(bg[b])
+                    cur_bg = b
+            else:
+                glyph = UPPER_HALF if t else LOWER_HALF
+                if cur_bg:
+                    parts.append(RESET_BG)
+                    cur_bg = 0
+
+            color = t or b
+            if color and color != cur_fg:
+                parts.append(fg[color])
+                cur_fg = color
+            parts.append(glyph)
+
+        if cur_fg or cur_bg:
+            parts.append(RESET)
+        return "".join(parts)
+
+
+# Shared renderer so frames are cached across screens
+_default_renderer: Optional[SpriteRenderer] = None
+
+
+def get_sprite_renderer() -> SpriteRenderer:
+    """
+    Get the shared sprite renderer instance.
+
+    Returns:
+        Global SpriteRenderer instance
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = SpriteRenderer()
+    return _default_renderer
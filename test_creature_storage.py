@@ -0,0 +1,170 @@
+"""
+Test suite for creature storage.
+
+Tests:
+1. Lazy hydration of stored creatures on load
+2. Saving untouched storage without hydrating it
+3. Paged storage boxes (per-box hydration, changes and serialization)
+"""
+
+import json
+import random
+import unittest
+from unittest import mock
+
+from genemon.core.creature import Creature
+from genemon.core.save_system import GameState
+from genemon.core.storage import BOX_SIZE, LazyCreatureList, PagedStorage
+from genemon.creatures.roster import generate_roster
+
+
+class TestLazyStorage(unittest.TestCase):
+    """Test stored creatures loaded as records and hydrated on access."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.species_dict = generate_roster(2024)
+        rng = random.Random(7)
+        species = list(cls.species_dict.values())
+        cls.creatures = [Creature(species=rng.choice(species), level=rng.randint(2, 50))
+                         for _ in range(200)]
+        cls.creatures[3].moves[0].pp = 1
+        cls.records = json.loads(json.dumps([c.to_dict() for c in cls.creatures]))
+
+    def make_list(self):
+        return LazyCreatureList(json.loads(json.dumps(self.records)), self.species_dict)
+
+    def test_nothing_hydrated_on_load(self):
+        """Loading a state keeps stored creatures as records."""
+        state = GameState()
+        state.species_dict = self.species_dict
+        data = state.to_dict(skip_species=self.species_dict)
+        data['storage'] = self.records
+        loaded = GameState.from_dict(data, self.species_dict)
+
+        self.assertIsInstance(loaded.storage, PagedStorage)
+        self.assertEqual(len(loaded.storage), 200)
+        self.assertEqual(loaded.storage.hydrated_count, 0)
+
+    def test_access_hydrates_only_touched_entries(self):
+        """Indexing and slicing hydrate just those creatures, once."""
+        storage = self.make_list()
+        first = storage[3]
+        self.assertIs(storage[3], first)
+        self.assertEqual(first.moves[0].pp, 1)
+        self.assertEqual(first.species.name, self.creatures[3].species.name)
+        self.assertEqual(len(storage[-20:]), 20)
+        self.assertEqual(storage.hydrated_count, 21)
+
+    def test_list_operations(self):
+        """Appending, popping and iterating behave like a list."""
+        storage = self.make_list()
+        extra = Creature(species=self.species_dict[1], level=5)
+        storage.append(extra)
+        self.assertIs(storage[-1], extra)
+        popped = storage.pop(0)
+        self.assertEqual(popped.level, self.creatures[0].level)
+        self.assertEqual(len(storage), 200)
+        self.assertEqual([c.level for c in storage][:-1], [c.level for c in self.creatures[1:]])
+
+    def test_records_saved_without_hydrating(self):
+        """Untouched records are saved as loaded; touched ones are re-serialized."""
+        storage = self.make_list()
+        storage[5].current_hp = 1
+        records = storage.to_records()
+        self.assertEqual(storage.hydrated_count, 1)
+        self.assertEqual(records[5]['current_hp'], 1)
+        self.assertEqual(records[6], self.records[6])
+
+        # Hydrating after saving leaves the saved records untouched
+        list(storage)
+        self.assertEqual(json.loads(json.dumps(records[7])), records[7])
+
+    def test_unknown_species_rejected(self):
+        """Records of missing species fail when loading, not when opening a box."""
+        records = [dict(self.records[0], species_id=9999)]
+        with self.assertRaises(KeyError):
+            LazyCreatureList(records, self.species_dict)
+
+
+class TestPagedStorage(unittest.TestCase):
+    """Test storage divided into independently loaded and saved boxes."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.species_dict = generate_roster(2024)
+        rng = random.Random(11)
+        species = list(cls.species_dict.values())
+        cls.records = json.loads(json.dumps([
+            Creature(species=rng.choice(species), level=rng.randint(2, 50)).to_dict()
+            for _ in range(BOX_SIZE * 6 + 5)
+        ]))
+
+    def make_storage(self):
+        return PagedStorage(json.loads(json.dumps(self.records)), self.species_dict)
+
+    def test_boxes_load_independently(self):
+        """Opening one box hydrates only that box."""
+        storage = self.make_storage()
+        self.assertEqual(storage.box_sizes, [BOX_SIZE] * 6 + [5])
+        box = storage.box(1)
+        self.assertEqual([c.level for c in box],
+                         [r['level'] for r in self.records[BOX_SIZE:BOX_SIZE * 2]])
+        self.assertEqual(storage.loaded_boxes, [1])
+        self.assertEqual(storage[BOX_SIZE * 6].level, self.records[BOX_SIZE * 6]['level'])
+        self.assertEqual(storage.loaded_boxes, [1, 6])
+
+    def test_removal_keeps_other_boxes(self):
+        """Moving a creature out changes only the boxes involved."""
+        storage = self.make_storage()
+        storage.to_records()
+        moved = storage.pop(BOX_SIZE + 3)
+        storage.append(moved)
+        self.assertEqual(storage.box_sizes, [BOX_SIZE, BOX_SIZE - 1] + [BOX_SIZE] * 4 + [6])
+        self.assertEqual(storage.dirty_boxes, [1, 6])
+        self.assertIs(storage[-1], moved)
+        self.assertEqual(len(storage), len(self.records))
+
+    def test_unchanged_boxes_not_reserialized(self):
+        """Saving reuses the records of boxes that did not change."""
+        storage = self.make_storage()
+        list(storage)  # Hydrate every box
+        first = storage.to_records()
+        storage[2].level = 99
+        storage.box(3)
+        self.assertEqual(storage.dirty_boxes, [])  # Reading is not a change
+        storage.mark_dirty(2)
+        with mock.patch.object(Creature, 'to_dict', autospec=True,
+                               side_effect=Creature.to_dict) as to_dict:
+            second = storage.to_records()
+        self.assertEqual(to_dict.call_count, BOX_SIZE)
+        self.assertEqual(second[2]['level'], 99)
+        self.assertIs(second[BOX_SIZE], first[BOX_SIZE])
+        self.assertIsNot(second.boxes[0], first.boxes[0])
+        self.assertIs(second.boxes[1], first.boxes[1])
+
+    def test_full_box_spills_on_insert(self):
+        """Inserting into a full box moves its last creature into a new box."""
+        storage = self.make_storage()
+        last = self.records[BOX_SIZE - 1]
+        storage.insert(0, Creature(species=self.species_dict[1], level=5))
+        self.assertEqual(storage.box_sizes[:2], [BOX_SIZE, 1])
+        self.assertEqual(storage[BOX_SIZE].level, last['level'])
+        self.assertEqual(storage[0].level, 5)
+
+    def test_box_sizes_saved(self):
+        """Box boundaries survive a save and load."""
+        storage = self.make_storage()
+        del storage[:3]
+        state = GameState()
+        state.species_dict = self.species_dict
+        state.storage = storage
+        data = json.loads(json.dumps(state.to_dict(skip_species=self.species_dict)))
+        loaded = GameState.from_dict(data, self.species_dict)
+        self.assertEqual(loaded.storage.box_sizes, storage.box_sizes)
+        self.assertEqual(loaded.storage.box_sizes[0], BOX_SIZE - 3)
+        self.assertEqual(loaded.storage.hydrated_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
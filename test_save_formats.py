@@ -0,0 +1,1532 @@
+"""
+Test suite for save file formats.
+
+Tests:
+1. Seed-only species storage (roster regenerated from the seed on load, sprite packs)
+2. Save codecs (compact/compressed JSON, binary sections, auto-detection)
+3. Journaled saves (append-only deltas, replay, compaction)
+4. Background saves (snapshots, coalescing, atomic replace)
+5. Save manifest (summaries without decoding saves)
+6. SQLite backend (row-level writes, indexed storage queries)
+7. Autosave scheduling (dirty tracking, rate limiting)
+8. Move references in creature records
+9. JSON backend (orjson when installed, stdlib json otherwise)
+10. Schema versions and migrations of older saves
+11. Section checksums, verification and recovery of damaged saves
+12. Bulk save maintenance (validate, migrate, recode, compact, unused sprite collection)
+13. Memory-mapped binary saves with sections decoded on first access
+14. Rotating backups in a deduplicating chunk store
+"""
+
+import contextlib
+import copy
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import unittest
+import zlib
+from dataclasses import replace
+from unittest import mock
+
+from genemon.core.autosave import AutosaveScheduler
+from genemon.core.creature import Creature, Team
+from genemon.core.items import ITEMS
+from genemon.core import json_io
+from genemon.core.save_system import GameState, SaveManager
+from genemon.core.save_codecs import (
+    CHECKSUMS_KEY, SAVE_CODECS, BinaryCodec, MappedBinarySave, detect_codec, get_codec,
+    load_save_data, recover_save_data, verify_save_data
+)
+from genemon.core.save_journal import apply_save_delta, diff_save_data
+from genemon.core.save_maintenance import main as maintenance_main, run_maintenance
+from genemon.core.save_manifest import MANIFEST_FILENAME
+from genemon.core.save_sqlite import SqliteSaveStore
+from genemon.core.save_writer import BackgroundSaveWriter, atomic_write
+from genemon.core.storage import StorageRecords
+from genemon.core.exceptions import SaveFileCorruptedError, SaveFileVersionError
+from genemon.core.save_migrations import (
+    MIGRATIONS, SAVE_SCHEMA_VERSION, migrate_save_data, migration, schema_version
+)
+from genemon.core.trading import TradeManager, TradePackage
+from genemon.sprites.store import SPRITE_REFS_KEY
+from genemon.creatures.roster import (
+    GENERATOR_VERSION, RosterCache, generate_roster, roster_fingerprint, sprite_pack_path
+)
+
+
+def quiet(func, *args, **kwargs):
+    """Call func with stdout suppressed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+class TestSeedOnlySpecies(unittest.TestCase):
+    """Test saves that store a roster reference instead of species."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.test_dir = tempfile.mkdtemp()
+        cls.manager = SaveManager(cls.test_dir, seed_only_species=True)
+        cls.state = quiet(cls.manager.create_new_game, "seeded", "Tester")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def read_save(self, name):
+        with open(os.path.join(self.test_dir, f"{name}.json")) as f:
+            return json.load(f)
+
+    def test_save_stores_roster_reference(self):
+        """Generated species are replaced by the seed, version and fingerprint."""
+        self.assertTrue(quiet(self.manager.save_game, self.state))
+        data = self.read_save("seeded")
+        self.assertEqual(data['species'], {})
+        self.assertEqual(data['roster']['generator_version'], GENERATOR_VERSION)
+        self.assertEqual(data['roster']['fingerprint'],
+                         roster_fingerprint(self.state.species_dict))
+        self.assertLess(os.path.getsize(os.path.join(self.test_dir, "seeded.json")), 20000)
+
+    def test_load_regenerates_roster(self):
+        """Loading in a fresh manager rebuilds the same species and sprites."""
+        quiet(self.manager.save_game, self.state)
+        loaded = quiet(SaveManager(self.test_dir, seed_only_species=True).load_game, "seeded")
+
+        self.assertEqual(len(loaded.species_dict), 151)
+        for creature_id in (1, 50, 151):
+            original = self.state.species_dict[creature_id]
+            restored = loaded.species_dict[creature_id]
+            self.assertEqual(restored.name, original.name)
+            self.assertEqual(restored.sprite_data, original.sprite_data)
+        self.assertEqual(loaded.player_team.creatures[0].species.name,
+                         self.state.player_team.creatures[0].species.name)
+
+    def test_extra_species_are_stored(self):
+        """Species not generated from the seed (e.g. traded in) are saved in full."""
+        foreign = generate_roster(self.state.seed + 1)[7]
+        foreign.id = 900
+        quiet(self.manager.save_game, self.state)
+        state = quiet(self.manager.load_game, "seeded")
+        state.save_name = "with_trade"
+        state.species_dict[900] = foreign
+        quiet(self.manager.save_game, state)
+
+        self.assertEqual(list(self.read_save("with_trade")['species']), ["900"])
+        loaded = quiet(self.manager.load_game, "with_trade")
+        self.assertEqual(loaded.species_dict[900].name, foreign.name)
+
+    def test_full_saves_still_written_and_loaded(self):
+        """Managers without seed-only mode keep writing every species."""
+        full = SaveManager(self.test_dir)
+        self.state.save_name = "full"
+        try:
+            quiet(full.save_game, self.state)
+        finally:
+            self.state.save_name = "seeded"
+        data = self.read_save("full")
+        self.assertNotIn('roster', data)
+        self.assertEqual(len(data['species']), 151)
+
+        # A full save converts to seed-only when its species match the seed
+        loaded = quiet(self.manager.load_game, "full")
+        loaded.save_name = "converted"
+        quiet(self.manager.save_game, loaded)
+        self.assertEqual(self.read_save("converted")['species'], {})
+
+    def test_modified_roster_saved_in_full(self):
+        """Species that differ from the seed's roster are never dropped."""
+        state = GameState.from_dict(json.loads(json.dumps(self.state.to_dict())))
+        state.save_name = "modified"
+        state.species_dict[10].name = "Renamed"
+        quiet(self.manager.save_game, state)
+        self.assertEqual(len(self.read_save("modified")['species']), 151)
+
+    def test_species_edited_in_place_saved_in_full(self):
+        """Editing the species of a loaded game neither loses the edit nor leaks it."""
+        quiet(self.manager.save_game, self.state)
+        state = quiet(self.manager.load_game, "seeded")
+        other = quiet(self.manager.load_game, "seeded")
+        state.save_name = "renamed"
+        state.species_dict[10].name = "Renamed"
+        quiet(self.manager.save_game, state)
+
+        self.assertEqual(self.read_save("renamed")['species']['10']['name'], "Renamed")
+        self.assertNotEqual(other.species_dict[10].name, "Renamed")
+        fresh = quiet(SaveManager(self.test_dir, seed_only_species=True).load_game, "renamed")
+        self.assertEqual(fresh.species_dict[10].name, "Renamed")
+
+    def test_version_mismatch_rejected(self):
+        """Saves from another generator version are not silently misread."""
+        quiet(self.manager.save_game, self.state)
+        data = self.read_save("seeded")
+        data['roster']['generator_version'] = GENERATOR_VERSION + 1
+        with open(os.path.join(self.test_dir, "future.json"), 'w') as f:
+            json.dump(data, f)
+        self.assertIsNone(quiet(self.manager.load_game, "future"))
+
+    def test_sprite_pack_written(self):
+        """Regenerated rosters read sprites from a per-seed sprite pack."""
+        pack_dir = os.path.join(self.test_dir, "sprites", "packs")
+        self.assertTrue(os.path.exists(sprite_pack_path(pack_dir, self.state.seed)))
+        cache = RosterCache(pack_dir=pack_dir)
+        self.assertEqual(cache.get(self.state.seed)[3].sprite_data,
+                         self.state.species_dict[3].sprite_data)
+
+    def test_packs_kept_only_while_used(self):
+        """Full-species managers write no packs; a seed's pack goes with its last save."""
+        test_dir = tempfile.mkdtemp()
+        try:
+            pack_dir = os.path.join(test_dir, "sprites", "packs")
+            quiet(SaveManager(test_dir).create_new_game, "full", "Ash")
+            self.assertFalse(os.path.isdir(pack_dir) and os.listdir(pack_dir))
+
+            manager = SaveManager(test_dir, seed_only_species=True, verbose=False)
+            state = manager.create_new_game("first", "Ash")
+            manager.save_game(state)
+            state.save_name = "second"
+            manager.save_game(state)
+            path = sprite_pack_path(pack_dir, state.seed)
+            self.assertTrue(os.path.exists(path))
+            manager.delete_save("first")
+            self.assertTrue(os.path.exists(path))
+            manager.delete_save("second")
+            self.assertFalse(os.path.exists(path))
+        finally:
+            shutil.rmtree(test_dir)
+
+
+class TestSaveCodecs(unittest.TestCase):
+    """Test the pluggable save codecs."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.state = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "codec", "Tester")
+        cls.data = cls.state.to_dict()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trip_and_detection(self):
+        """Every codec round-trips and is detected from its output."""
+        for name, codec in SAVE_CODECS.items():
+            with self.subTest(codec=name):
+                raw = codec.encode(self.data)
+                self.assertIsInstance(codec, type(detect_codec(raw)))
+                self.assertEqual(load_save_data(raw), self.data)
+
+    def test_compressed_codecs_are_smaller(self):
+        """Compressed formats are far smaller than indented JSON."""
+        json_size = len(get_codec("json").encode(self.data))
+        for name in ("zlib", "gzip", "binary"):
+            self.assertLess(len(get_codec(name).encode(self.data)) * 5, json_size)
+
+    def test_save_manager_formats(self):
+        """Saves in any format load through any manager."""
+        for name in SAVE_CODECS:
+            with self.subTest(codec=name):
+                quiet(SaveManager(self.test_dir, codec=name).save_game, self.state)
+                loaded = quiet(SaveManager(self.test_dir).load_game, "codec")
+                self.assertEqual(loaded.player_team.creatures[0].species.name,
+                                 self.state.player_team.creatures[0].species.name)
+                self.assertEqual(quiet(SaveManager(self.test_dir).list_saves), ["codec"])
+
+    def test_extension_follows_codec(self):
+        """Switching codec replaces the save instead of leaving two copies."""
+        quiet(SaveManager(self.test_dir).save_game, self.state)
+        quiet(SaveManager(self.test_dir, codec="binary").save_game, self.state)
+        self.assertIn("codec.sav", os.listdir(self.test_dir))
+        self.assertNotIn("codec.json", os.listdir(self.test_dir))
+        self.assertTrue(quiet(SaveManager(self.test_dir).delete_save, "codec"))
+        self.assertNotIn("codec.sav", os.listdir(self.test_dir))
+
+    def test_binary_sections(self):
+        """Binary saves decode section by section."""
+        codec = BinaryCodec()
+        raw = codec.encode(self.data)
+        table = codec.read_section_table(raw)
+        self.assertEqual(list(table), ["header", "species", "team", "storage",
+                                       "trainers", "pokedex", "progress"])
+        header = codec.read_sections(raw, ["header", "pokedex"])
+        self.assertEqual(header['seed'], self.data['seed'])
+        self.assertIn('pokedex_caught', header)
+        self.assertNotIn('species', header)
+
+    def test_creature_records_packed(self):
+        """Team and storage creatures round-trip through struct records, odd ones included."""
+        record = self.data['player_team']['creatures'][0]
+        storage = [
+            dict(record, nickname="Sparky", is_shiny=True),
+            dict(record, held_item={'name': "Charm"}),
+            dict(record, moves=[{'name': "Custom", 'pp': 3}] + record['moves']),
+            dict(record, exp=2 ** 40),
+            {key: value for key, value in record.items() if key != 'status'},
+            json.dumps(record),
+        ]
+        data = dict(self.data, storage=storage)
+        codec = BinaryCodec()
+        raw = codec.encode(data)
+        self.assertEqual(codec.read_sections(raw, ["storage"])['storage'], storage)
+        self.assertEqual(load_save_data(raw), data)
+        offset, length, _ = codec.read_section_table(raw)['storage:0']
+        self.assertTrue(zlib.decompress(raw[offset:offset + length]).startswith(b'\x01'))
+
+    def test_storage_boxes_sectioned(self):
+        """Binary saves store each box in its own section and reuse unchanged ones."""
+        data = json.loads(json.dumps(self.data))
+        data['storage'] = [data['player_team']['creatures'][0]] * 65
+        data['storage_boxes'] = [30, 30, 5]
+        state = GameState.from_dict(data)
+        codec = BinaryCodec()
+        raw = codec.encode(state.to_dict())
+        self.assertEqual([name for name in codec.read_section_table(raw) if 'storage' in name],
+                         ['storage', 'storage:0', 'storage:1', 'storage:2'])
+
+        state.storage.pop(40)
+        state.storage[3]  # Reading leaves the box unchanged
+        with mock.patch.object(BinaryCodec, '_compress_box', autospec=True,
+                               side_effect=BinaryCodec._compress_box) as compress:
+            raw = codec.encode(state.to_dict())
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(load_save_data(raw)['storage'], state.to_dict()['storage'])
+        self.assertEqual(len(json.loads(get_codec("json").encode(state.to_dict()))
+                             [CHECKSUMS_KEY]['boxes']), 3)
+
+        damaged = bytearray(raw)
+        offset, length, _ = codec.read_section_table(raw)['storage:1']
+        damaged[offset + length // 2] ^= 0xFF
+        self.assertEqual(verify_save_data(bytes(damaged)), ['storage'])
+        self.assertEqual(recover_save_data(bytes(damaged))[1], ['storage'])
+        table = codec.read_section_table(raw)
+        with self.assertRaises(SaveFileCorruptedError):
+            codec._read_group(raw, 'storage', {name: entry for name, entry in table.items()
+                                               if name != 'storage:2'})
+
+    def test_single_section_storage_still_loads(self):
+        """Binary version 3 saves and JSON saves with one storage checksum load."""
+        data = dict(self.data, storage=self.data['player_team']['creatures'] * 3)
+        with mock.patch('genemon.core.save_codecs.split_storage',
+                        side_effect=lambda part: (part, None, False)), \
+                mock.patch.object(BinaryCodec, 'FORMAT_VERSION', 3):
+            binary = BinaryCodec().encode(data)
+            document = get_codec("json").encode(data)
+        self.assertNotIn('boxes', json.loads(document)[CHECKSUMS_KEY])
+        for raw in (binary, document):
+            self.assertEqual(verify_save_data(raw), [])
+            self.assertEqual(load_save_data(raw), data)
+
+    def test_codec_extensions_distinct(self):
+        """Each codec writes its own extension; saves under the old names still load."""
+        extensions = [codec.extension for codec in SAVE_CODECS.values()]
+        self.assertEqual(len(set(extensions)), len(extensions))
+        with open(os.path.join(self.test_dir, "codec.sav"), 'wb') as f:
+            f.write(get_codec("zlib").encode(self.data))
+        loaded = quiet(SaveManager(self.test_dir).load_game, "codec")
+        self.assertEqual(loaded.player_name, self.state.player_name)
+
+    def test_binary_version_2_still_loads(self):
+        """Binary saves with all-JSON sections load."""
+        with mock.patch('genemon.core.save_codecs.encode_packed_section', return_value=None), \
+                mock.patch.object(BinaryCodec, 'FORMAT_VERSION', 2):
+            raw = BinaryCodec().encode(self.data)
+        self.assertEqual(struct.unpack_from('>H', raw, 4)[0], 2)
+        self.assertEqual(load_save_data(raw), self.data)
+
+    def test_corrupt_data_rejected(self):
+        """Damaged or unknown data raises SaveFileCorruptedError."""
+        raw = get_codec("binary").encode(self.data)
+        for damaged in (b"nonsense", raw[:40], get_codec("zlib").magic + b"garbage"):
+            with self.assertRaises(SaveFileCorruptedError):
+                load_save_data(damaged)
+
+    def test_unknown_codec(self):
+        """Unknown codec names are rejected."""
+        with self.assertRaises(ValueError):
+            SaveManager(self.test_dir, codec="xml")
+
+
+class TestJournaledSaves(unittest.TestCase):
+    """Test journal mode saves."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "journaled", "Tester")
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir, journal=True)
+        self.state = GameState.from_dict(json.loads(json.dumps(self.template.to_dict())))
+        self.journal_path = os.path.join(self.test_dir, "journaled.journal")
+        self.snapshot_path = os.path.join(self.test_dir, "journaled.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_diff_and_apply(self):
+        """Deltas record only changed values and rebuild the new data."""
+        old = {'x': 1, 'team': [{'hp': 10}, {'hp': 5}], 'items': {'potion': 2, 'ether': 1}}
+        new = {'x': 2, 'team': [{'hp': 10}, {'hp': 4}], 'items': {'potion': 2}, 'money': 5}
+        sets, deletes = diff_save_data(old, new)
+        self.assertEqual(sorted(map(str, sets)), sorted(map(str, [
+            (['x'], 2), (['team', 1, 'hp'], 4), (['money'], 5)
+        ])))
+        self.assertEqual(deletes, [['items', 'ether']])
+        apply_save_delta(old, {'set': sets, 'del': deletes})
+        self.assertEqual(old, new)
+
+    def test_small_changes_append_to_journal(self):
+        """Saves after the first append deltas and leave the snapshot alone."""
+        quiet(self.manager.save_game, self.state)
+        snapshot_mtime = os.path.getmtime(self.snapshot_path)
+        journal_size = os.path.getsize(self.journal_path)
+
+        self.state.player_x += 3
+        self.state.items['potion'] = 1
+        self.state.player_team.creatures[0].current_hp -= 1
+        self.assertTrue(quiet(self.manager.save_game, self.state))
+
+        self.assertEqual(os.path.getmtime(self.snapshot_path), snapshot_mtime)
+        self.assertLess(os.path.getsize(self.journal_path) - journal_size, 500)
+
+        loaded = quiet(SaveManager(self.test_dir).load_game, "journaled")
+        self.assertEqual(loaded.player_x, self.state.player_x)
+        self.assertEqual(loaded.items['potion'], 1)
+        self.assertEqual(loaded.player_team.creatures[0].current_hp,
+                         self.state.player_team.creatures[0].current_hp)
+
+    def test_stored_creature_change_appends_delta(self):
+        """Replacing one stored creature journals that creature, not all of storage."""
+        data = json.loads(json.dumps(self.template.to_dict()))
+        data['storage'] = data['player_team']['creatures'] * 100
+        state = GameState.from_dict(data)
+        quiet(self.manager.save_game, state)
+        journal_size = os.path.getsize(self.journal_path)
+
+        renamed = copy.copy(state.storage[70])
+        renamed.nickname = "Spot"
+        state.storage[70] = renamed
+        self.assertTrue(quiet(self.manager.save_game, state))
+        self.assertLess(os.path.getsize(self.journal_path) - journal_size, 2000)
+        loaded = quiet(SaveManager(self.test_dir).load_game, "journaled")
+        self.assertEqual(loaded.storage[70].nickname, "Spot")
+
+    def test_compaction(self):
+        """A journal past the threshold is folded into a new snapshot."""
+        manager = SaveManager(self.test_dir, journal=True, journal_compact_bytes=400)
+        quiet(manager.save_game, self.state)
+        for step in range(6):
+            self.state.player_y = step
+            quiet(manager.save_game, self.state)
+        self.assertLess(os.path.getsize(self.journal_path), 800)
+        self.assertEqual(quiet(manager.load_game, "journaled").player_y, 5)
+
+    def test_torn_final_record_ignored(self):
+        """A partially written last record does not prevent loading."""
+        quiet(self.manager.save_game, self.state)
+        self.state.money = 4321
+        quiet(self.manager.save_game, self.state)
+        with open(self.journal_path, 'a') as f:
+            f.write('{"set": [[["money"], 99')
+        self.assertEqual(quiet(self.manager.load_game, "journaled").money, 4321)
+
+    def test_full_save_discards_journal(self):
+        """A non-journal save replaces the snapshot and removes the journal."""
+        quiet(self.manager.save_game, self.state)
+        self.state.money = 1
+        quiet(self.manager.save_game, self.state)
+        self.state.money = 2
+        quiet(SaveManager(self.test_dir).save_game, self.state)
+        self.assertFalse(os.path.exists(self.journal_path))
+        self.assertEqual(quiet(self.manager.load_game, "journaled").money, 2)
+
+
+class TestBackgroundSaves(unittest.TestCase):
+    """Test saves written on the background writer thread."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "async", "Tester")
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir)
+        self.state = GameState.from_dict(json.loads(json.dumps(self.template.to_dict())))
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_future_resolves_after_write(self):
+        """The future completes once the save can be loaded."""
+        future = self.manager.save_game_async(self.state)
+        self.assertTrue(future.result(timeout=30))
+        loaded = quiet(SaveManager(self.test_dir).load_game, "async")
+        self.assertEqual(len(loaded.species_dict), len(self.state.species_dict))
+
+    def test_snapshot_taken_at_submit(self):
+        """Changes made after submitting do not leak into the save."""
+        self.state.money = 100
+        self.state.items['potion'] = 7
+        future = self.manager.save_game_async(self.state)
+        self.state.money = 999
+        self.state.items['potion'] = 0
+        self.state.player_team.creatures[0].current_hp = 0
+        future.result(timeout=30)
+
+        loaded = quiet(SaveManager(self.test_dir).load_game, "async")
+        self.assertEqual(loaded.money, 100)
+        self.assertEqual(loaded.items['potion'], 7)
+        self.assertGreater(loaded.player_team.creatures[0].current_hp, 0)
+
+    def test_newer_saves_supersede_queued_ones(self):
+        """Only the newest queued job for a key is run."""
+        writer = BackgroundSaveWriter()
+        gate = threading.Event()
+        ran = []
+        blocker = writer.submit("other", gate.wait)
+        first = writer.submit("save", lambda: ran.append(1) or True)
+        second = writer.submit("save", lambda: ran.append(2) or True)
+        gate.set()
+        self.assertTrue(writer.flush(timeout=30))
+        writer.close()
+        self.assertTrue(blocker.result() and first.result() and second.result())
+        self.assertEqual(ran, [2])
+
+    def test_load_waits_for_pending_saves(self):
+        """Loading through the same manager sees queued saves."""
+        self.state.money = 4242
+        self.manager.save_game_async(self.state)
+        self.assertEqual(quiet(self.manager.load_game, "async").money, 4242)
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        """Writes replace the file and clean up their temporary file."""
+        path = os.path.join(self.test_dir, "file.bin")
+        atomic_write(path, b"old")
+        atomic_write(path, b"new")
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"new")
+        self.assertEqual(os.listdir(self.test_dir), ["file.bin"])
+
+    @unittest.skipUnless(os.name == 'posix', "POSIX file modes")
+    def test_written_files_keep_default_mode(self):
+        """Replaced files get the umask's default mode, or keep the mode they had."""
+        old_umask = os.umask(0o022)
+        try:
+            path = os.path.join(self.test_dir, "file.bin")
+            atomic_write(path, b"old")
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+            os.chmod(path, 0o640)
+            atomic_write(path, b"new")
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o640)
+
+            quiet(self.manager.save_game, self.state)
+            for directory, _, files in os.walk(self.test_dir):
+                for name in files:
+                    if name != "file.bin":
+                        mode = os.stat(os.path.join(directory, name)).st_mode & 0o777
+                        self.assertEqual(mode, 0o644, name)
+        finally:
+            os.umask(old_umask)
+
+    def test_failed_save_keeps_previous_file(self):
+        """An error while saving leaves the old save intact and reaches the future."""
+        self.state.money = 1
+        quiet(self.manager.save_game, self.state)
+        self.state.money = 2
+
+        class FailingCodec(type(self.manager.codec)):
+            def encode(self, data):
+                raise OSError("disk full")
+
+        self.manager.codec = FailingCodec()
+        with self.assertRaises(OSError):
+            self.manager.save_game_async(self.state).result(timeout=30)
+        self.assertEqual(quiet(SaveManager(self.test_dir).load_game, "async").money, 1)
+        self.assertEqual([f for f in os.listdir(self.test_dir) if f.startswith(".tmp-")], [])
+
+
+class TestSaveManifest(unittest.TestCase):
+    """Test the save manifest used by the save browser."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "first", "Tester")
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir)
+        self.state = GameState.from_dict(json.loads(json.dumps(self.template.to_dict())))
+        self.state.play_time = 3600
+        quiet(self.manager.save_game, self.state)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_summaries_served_from_manifest(self):
+        """Listing does not decode saves already in the manifest."""
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, MANIFEST_FILENAME)))
+        manager = SaveManager(self.test_dir)
+        manager._read_save_data = None  # Any decode would fail
+        [info] = manager.list_save_info()
+        self.assertEqual(info['save_name'], "first")
+        self.assertEqual(info['player_name'], "Tester")
+        self.assertEqual(info['play_time'], 3600)
+        self.assertEqual(info['team_levels'],
+                         [c.level for c in self.state.player_team.creatures])
+        self.assertNotIn(os.path.splitext(MANIFEST_FILENAME)[0], manager.list_saves())
+
+    def test_changed_and_deleted_saves_detected(self):
+        """Saves written elsewhere are re-read; deleted saves are dropped."""
+        self.state.save_name = "second"
+        quiet(self.manager.save_game, self.state)
+
+        # Replace 'first' behind the manifest's back
+        self.state.save_name = "first"
+        self.state.money = 777
+        path = os.path.join(self.test_dir, "first.json")
+        with open(path, 'w') as f:
+            json.dump(self.state.to_dict(), f)
+        os.utime(path, ns=(1, 1))
+
+        infos = {i['save_name']: i for i in SaveManager(self.test_dir).list_save_info()}
+        self.assertEqual(infos['first']['money'], 777)
+        self.assertEqual(set(infos), {"first", "second"})
+
+        quiet(self.manager.delete_save, "second")
+        self.assertEqual([i['save_name'] for i in SaveManager(self.test_dir).list_save_info()],
+                         ["first"])
+
+    def test_journal_saves_summarized(self):
+        """Summaries follow journaled saves."""
+        manager = SaveManager(self.test_dir, journal=True)
+        quiet(manager.save_game, self.state)
+        self.state.play_time = 7200
+        quiet(manager.save_game, self.state)
+        self.assertEqual(SaveManager(self.test_dir).list_save_info()[0]['play_time'], 7200)
+        SaveManager(self.test_dir).rebuild_manifest()
+        self.assertEqual(SaveManager(self.test_dir).list_save_info()[0]['play_time'], 7200)
+
+    def test_damaged_manifest_rebuilt(self):
+        """A damaged manifest or save does not break listing."""
+        with open(os.path.join(self.test_dir, MANIFEST_FILENAME), 'w') as f:
+            f.write("{not json")
+        with open(os.path.join(self.test_dir, "broken.sav"), 'wb') as f:
+            f.write(b"GSAV garbage")
+        infos = {i['save_name']: i for i in SaveManager(self.test_dir).list_save_info()}
+        self.assertEqual(infos['first']['player_name'], "Tester")
+        self.assertIn('error', infos['broken'])
+
+
+class TestSqliteBackend(unittest.TestCase):
+    """Test saves stored in SQLite databases."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "db", "Tester")
+        species = sorted(cls.template.species_dict)
+        starter = cls.template.player_team.creatures[0]
+        # Full move records stay valid when the species is swapped below
+        template = dict(starter.to_dict(), moves=[m.to_dict() for m in starter.moves])
+        cls.records = [
+            dict(template, species_id=species[i % len(species)], level=1 + i % 100,
+                 is_shiny=(i % 7 == 0))
+            for i in range(300)
+        ]
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir, backend="sqlite")
+        data = json.loads(json.dumps(self.template.to_dict()))
+        data['storage'] = json.loads(json.dumps(self.records))
+        data['flags'] = {'met_professor': True}
+        self.state = GameState.from_dict(data)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def reload(self):
+        manager = SaveManager(self.test_dir, backend="sqlite")
+        self.addCleanup(manager.close)
+        return quiet(manager.load_game, "db")
+
+    def test_round_trip(self):
+        """A sqlite save loads back to the same state."""
+        self.assertTrue(quiet(self.manager.save_game, self.state))
+        self.assertIn("db.db", os.listdir(self.test_dir))
+        loaded = self.reload()
+        expected = self.state.to_dict()
+        actual = loaded.to_dict()
+        for key in ('saved_at',):
+            expected.pop(key, None)
+            actual.pop(key, None)
+        self.assertEqual(json.loads(json.dumps(actual)), json.loads(json.dumps(expected)))
+        self.assertEqual(loaded.storage.hydrated_count, 0)
+
+    def test_only_changed_rows_written(self):
+        """Saves write only the rows that changed, even after removals."""
+        store = SqliteSaveStore(os.path.join(self.test_dir, "direct.db"))
+        self.addCleanup(store.close)
+        data = self.state.to_dict()
+        self.assertGreater(store.write(data), 300)
+        self.assertEqual(store.write(data), 0)
+
+        data['items'] = dict(data['items'], potion=99)
+        data['storage'] = data['storage'][1:]  # Remove the first creature
+        data['storage'][10] = dict(data['storage'][10], level=100)
+        data['storage'].insert(5, dict(self.records[0], level=42))
+        # items row, deleted row, changed row, inserted row
+        self.assertEqual(store.write(data), 4)
+
+        stored = store.read()
+        self.assertEqual([json.loads(r)['level'] for r in stored['storage']],
+                         [r['level'] for r in data['storage']])
+        self.assertEqual(stored['items']['potion'], 99)
+
+    def test_changes_with_equal_hash_written(self):
+        """Changed values are written even when their Python hashes collide."""
+        store = SqliteSaveStore(os.path.join(self.test_dir, "direct.db"))
+        self.addCleanup(store.close)
+        data = self.state.to_dict()
+        data['items'] = dict(data['items'], potion=1)
+        store.write(data)
+        data['items'] = dict(data['items'], potion=2 ** 61)
+        self.assertEqual(hash(1), hash(2 ** 61))
+        self.assertEqual(store.write(data), 1)
+        self.assertEqual(store.read()['items']['potion'], 2 ** 61)
+
+    def test_unchanged_storage_not_reserialized(self):
+        """Untouched stored creatures survive load/save as the same rows."""
+        quiet(self.manager.save_game, self.state)
+        loaded = self.reload()
+        loaded.storage[3].level = 77
+        loaded.storage.pop(0)
+        loaded.storage.append(loaded.storage.pop(100))
+        manager = SaveManager(self.test_dir, backend="sqlite")
+        self.addCleanup(manager.close)
+        quiet(manager.save_game, loaded)
+
+        levels = [c.level for c in self.reload().storage]
+        self.assertEqual(levels, [c.level for c in loaded.storage])
+        self.assertEqual(levels[2], 77)
+
+    def test_storage_queries(self):
+        """Indexed queries return matching creatures and their storage index."""
+        quiet(self.manager.save_game, self.state)
+        results = self.manager.query_storage("db", min_level=90, shiny=True)
+        expected = [i for i, r in enumerate(self.records) if r['level'] >= 90 and r['is_shiny']]
+        self.assertEqual([index for index, _ in results], expected)
+        species_id = self.records[4]['species_id']
+        results = self.manager.query_storage("db", species_id=species_id, limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(r['species_id'] == species_id for _, r in results))
+
+        quiet(SaveManager(self.test_dir).save_game, self.state)
+        with self.assertRaises(ValueError):
+            self.manager.query_storage("db")
+
+    def test_writes_from_other_managers_detected(self):
+        """A manager notices another one rewrote the database."""
+        quiet(self.manager.save_game, self.state)
+        other = SaveManager(self.test_dir, backend="sqlite")
+        self.addCleanup(other.close)
+        self.state.money = 5
+        quiet(other.save_game, self.state)
+        self.state.money = 1000
+        quiet(self.manager.save_game, self.state)
+        self.assertEqual(self.reload().money, 1000)
+
+    def test_switching_backends(self):
+        """Saving with another backend replaces the database, and back."""
+        quiet(self.manager.save_game, self.state)
+        quiet(SaveManager(self.test_dir).save_game, self.state)
+        self.assertNotIn("db.db", os.listdir(self.test_dir))
+        quiet(self.manager.save_game, self.state)
+        self.assertNotIn("db.json", os.listdir(self.test_dir))
+        self.assertEqual(quiet(self.manager.list_saves), ["db"])
+        self.assertTrue(quiet(self.manager.delete_save, "db"))
+        self.assertEqual(quiet(self.manager.list_saves), [])
+
+    def test_unknown_backend(self):
+        """Unknown backends are rejected."""
+        with self.assertRaises(ValueError):
+            SaveManager(self.test_dir, backend="redis")
+
+
+class FakeClock:
+    """Manually advanced clock for scheduler tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAutosave(unittest.TestCase):
+    """Test dirty tracking and the autosave scheduler."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "auto", "Tester")
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir)
+        self.state = GameState.from_dict(json.loads(json.dumps(self.template.to_dict())))
+        self.clock = FakeClock()
+        self.scheduler = AutosaveScheduler(self.manager, interval=30, clock=self.clock)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_dirty_tracking(self):
+        """Loaded states are clean; assignments and mark_dirty() dirty sections."""
+        self.assertFalse(self.state.is_dirty)
+        self.state.play_time += 5
+        self.assertFalse(self.state.is_dirty)
+        self.state.money = 10
+        self.state.player_x += 1
+        self.state.mark_dirty('storage')
+        self.assertEqual(self.state.dirty_sections, {'items', 'position', 'storage'})
+        self.assertEqual(self.state.clear_dirty(), {'items', 'position', 'storage'})
+        self.assertFalse(self.state.is_dirty)
+        with self.assertRaises(ValueError):
+            self.state.mark_dirty('inventory')
+
+    def test_clean_state_not_saved(self):
+        """Ticks without changes never write."""
+        self.clock.now = 100
+        self.assertIsNone(self.scheduler.tick(self.state))
+        self.assertIsNone(self.scheduler.flush(self.state))
+        self.assertEqual(self.scheduler.saves, 0)
+        self.assertEqual(quiet(self.manager.list_saves), [])
+
+    def test_changes_coalesced_within_interval(self):
+        """A burst of changes is written once, after the interval."""
+        for step in range(10):
+            self.clock.now = step
+            self.state.money = step
+            self.assertIsNone(self.scheduler.tick(self.state))
+        self.assertEqual(self.scheduler.deferred, 10)
+
+        self.clock.now = 30
+        self.scheduler.tick(self.state).result(timeout=30)
+        self.assertFalse(self.state.is_dirty)
+        self.assertEqual(quiet(self.manager.load_game, "auto").money, 9)
+
+        self.state.money = 50
+        self.clock.now = 40
+        self.assertIsNone(self.scheduler.tick(self.state))
+        self.scheduler.flush(self.state).result(timeout=30)
+        self.assertEqual(self.scheduler.saves, 2)
+        self.assertEqual(quiet(self.manager.load_game, "auto").money, 50)
+
+    def test_failed_save_stays_dirty(self):
+        """A failed autosave is retried on a later tick."""
+        class FailingCodec(type(self.manager.codec)):
+            def encode(self, data):
+                raise OSError("disk full")
+
+        self.manager.codec = FailingCodec()
+        self.state.money = 5
+        with self.assertRaises(OSError):
+            self.scheduler.flush(self.state).result(timeout=30)
+        self.assertTrue(self.state.is_dirty)
+
+    def test_manual_save_clears_dirty(self):
+        """Saving from the menu leaves nothing for the scheduler."""
+        self.state.money = 5
+        quiet(self.manager.save_game, self.state)
+        self.assertFalse(self.state.is_dirty)
+        self.assertIsNone(self.scheduler.flush(self.state))
+
+
+class TestMoveReferences(unittest.TestCase):
+    """Test creature moves saved as references plus PP."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.species_dict = generate_roster(2024)
+        cls.species = next(s for s in cls.species_dict.values() if s.learnset)
+
+    def roundtrip(self, creature):
+        record = json.loads(json.dumps(creature.to_dict()))
+        return record, Creature.from_dict(record, self.species)
+
+    def test_species_moves_referenced(self):
+        """Copies of species moves keep only their index, name, type and PP."""
+        creature = Creature(species=self.species, level=10)
+        creature.moves[0].pp = 3
+        record, loaded = self.roundtrip(creature)
+        base = self.species.moves[0]
+        self.assertEqual(record['moves'][0],
+                         {'species_move': 0, 'name': base.name, 'type': base.type, 'pp': 3})
+        self.assertEqual(loaded.moves, creature.moves)
+        self.assertIsNot(loaded.moves[0], self.species.moves[0])
+        self.assertEqual(self.species.moves[0].pp, self.species.moves[0].max_pp)
+
+    def test_learnset_and_tm_moves_referenced(self):
+        """Learned and TM moves are saved by learnset level and TM ID."""
+        level, learned = next(iter(self.species.learnset.items()))
+        creature = Creature(species=self.species, level=10)
+        creature.moves = creature.moves[:2]
+        creature.learn_move(learned)
+        creature.learn_move(ITEMS['tm05'].tm_move)
+        record, loaded = self.roundtrip(creature)
+        self.assertEqual(record['moves'][2], {'learnset': level, 'name': learned.name,
+                                              'type': learned.type, 'pp': learned.pp})
+        self.assertEqual(record['moves'][3]['tm'], 'tm05')
+        self.assertEqual(loaded.moves, creature.moves)
+
+    def test_other_moves_saved_in_full(self):
+        """Moves matching no reference (e.g. from a previous species) are kept whole."""
+        other = next(s for s in self.species_dict.values()
+                     if all(m.name != s.moves[0].name for m in self.species.moves))
+        creature = Creature(species=self.species, level=10)
+        creature.moves[0] = Creature(species=other, level=10).moves[0]
+        creature.moves[1].power += 1
+        record, loaded = self.roundtrip(creature)
+        self.assertEqual(record['moves'][0]['name'], other.moves[0].name)
+        self.assertIn('power', record['moves'][1])
+        self.assertEqual(loaded.moves, creature.moves)
+
+    def test_full_move_records_still_load(self):
+        """Records written with full move dictionaries load unchanged."""
+        creature = Creature(species=self.species, level=10)
+        creature.moves[1].pp = 0
+        record = creature.to_dict()
+        record['moves'] = [m.to_dict() for m in creature.moves]
+        self.assertEqual(Creature.from_dict(record, self.species).moves, creature.moves)
+
+    def test_references_checked_on_load(self):
+        """References are resolved by name and type when the species' moves moved."""
+        creature = Creature(species=self.species, level=10)
+        record = json.loads(json.dumps(creature.to_dict()))
+        reordered = replace(self.species, moves=self.species.moves[::-1])
+        self.assertEqual(Creature.from_dict(record, reordered).moves, creature.moves)
+        record['moves'][0]['name'] = "Missing Move"
+        with self.assertRaises(KeyError):
+            Creature.from_dict(record, self.species)
+
+    def test_creature_traded_from_other_seed(self):
+        """A creature traded in from another seed keeps its moves through save and load."""
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        manager = SaveManager(test_dir)
+        source = quiet(manager.create_new_game, "source", "Ann")
+        target = quiet(manager.create_new_game, "target", "Bob")
+        self.assertNotEqual(source.seed, target.seed)
+        trades = TradeManager(os.path.join(test_dir, "trades"))
+        path = quiet(trades.export_creature, source.player_team.creatures[0], "source")
+        creature, _ = quiet(trades.import_creature, path, target.species_dict, "target")
+        creature.moves[0].pp -= 1
+        target.player_team.add_creature(creature)
+
+        record = target.to_dict()['player_team']['creatures'][-1]
+        self.assertTrue(all('power' in move for move in record['moves']))
+        for codec in ("json", "binary"):
+            with self.subTest(codec=codec):
+                quiet(SaveManager(test_dir, codec=codec).save_game, target)
+                loaded = quiet(SaveManager(test_dir).load_game, "target")
+                self.assertEqual(loaded.player_team.creatures[-1].moves, creature.moves)
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Test the JSON facade with the active backend and the stdlib fallback."""
+
+    DATA = {'name': "Tester", 'team': [{'level': 5, 'hp': 12.5, 'moves': [None, True]}],
+            'empty': {}, 'list': [], 3: "int key"}
+
+    def check_backend(self):
+        self.assertEqual(json_io.dumpb(self.DATA),
+                         json.dumps(self.DATA, separators=(',', ':')).encode('utf-8'))
+        self.assertEqual(json_io.dumps(self.DATA, pretty=True), json.dumps(self.DATA, indent=2))
+        self.assertEqual(json_io.loads(json_io.dumpb(self.DATA))['3'], "int key")
+
+        unicode = {'nickname': "Flämmchen ✨"}
+        self.assertEqual(json_io.dumps(unicode), json.dumps(unicode, separators=(',', ':')))
+        self.assertEqual(json_io.loads(json_io.dumpb(unicode)), unicode)
+
+        self.assertEqual(json_io.dumpb({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+        floats = {'large': 1e20, 'small': 1e-7}  # Exponents may be spelled differently
+        self.assertEqual(json.loads(json_io.dumpb(floats)), floats)
+        nan = json_io.loads(b'{"missing": NaN}')['missing']
+        self.assertNotEqual(nan, nan)
+        with self.assertRaises(json.JSONDecodeError):
+            json_io.loads(b'{"truncated": ')
+        with self.assertRaises(TypeError):
+            json_io.dumpb({'values': {1, 2}})
+        records = StorageRecords([[{'level': 5}], [], [{'level': 6}]])
+        self.assertEqual(json_io.dumpb({'storage': records}), b'{"storage":[{"level":5},{"level":6}]}')
+
+        stream = io.StringIO()
+        json_io.dump(self.DATA, stream, pretty=True)
+        stream.seek(0)
+        self.assertEqual(json_io.load(stream), json.loads(json.dumps(self.DATA)))
+
+    def test_active_backend(self):
+        """The active backend writes what json writes."""
+        self.check_backend()
+
+    def test_stdlib_fallback(self):
+        """Without orjson the stdlib json module is used."""
+        with mock.patch.object(json_io, 'orjson', None):
+            self.check_backend()
+
+    def test_saves_interchangeable(self):
+        """Saves written with one backend load with the other."""
+        test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, test_dir)
+        manager = SaveManager(test_dir)
+        state = quiet(manager.create_new_game, "json", "Tester")
+        state.player_name = "Zoë"
+        with mock.patch.object(json_io, 'orjson', None):
+            quiet(manager.save_game, state)
+        loaded = quiet(SaveManager(test_dir).load_game, "json")
+        self.assertEqual(loaded.to_dict(), state.to_dict())
+
+
+class TestSaveMigrations(unittest.TestCase):
+    """Test upgrading saves written by older versions of the game."""
+
+    NEW_MOVE_FIELDS = ('crit_rate', 'multi_hit', 'recoil_percent', 'priority', 'stat_changes',
+                       'stat_change_target', 'stat_change_chance', 'is_contact')
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "old", "Tester")
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def legacy_creature(self, creature):
+        """A creature record as the first release wrote it."""
+        record = creature.to_dict()
+        record['moves'] = [{k: v for k, v in m.to_dict().items() if k not in self.NEW_MOVE_FIELDS}
+                           for m in creature.moves]
+        for key in ('exp', 'is_shiny', 'status', 'status_turns'):
+            del record[key]
+        return record
+
+    def legacy_save(self):
+        """A schema 1 save dictionary with fields added later missing."""
+        data = json.loads(json.dumps(self.template.to_dict()))
+        data['version'] = '0.1.0'
+        starter = self.template.player_team.creatures[0]
+        data['player_team'] = {'creatures': [self.legacy_creature(starter)]}
+        data['storage'] = [self.legacy_creature(starter)]
+        for species in data['species'].values():
+            for move in species['moves']:
+                for key in self.NEW_MOVE_FIELDS:
+                    move.pop(key, None)
+        for key in ('money', 'items', 'breeding_eggs', 'trainer_teams'):
+            del data[key]
+        return data
+
+    def test_legacy_save_loads_with_defaults(self):
+        """Missing fields get the defaults older versions assumed."""
+        state = GameState.from_dict(self.legacy_save())
+        starter = state.player_team.creatures[0]
+        self.assertEqual(starter.exp, 0)
+        self.assertFalse(starter.is_shiny)
+        self.assertEqual(starter.moves[0].multi_hit, (1, 1))
+        self.assertTrue(state.storage[0].moves[0].is_contact)
+        self.assertEqual(state.money, 1000)
+        self.assertEqual(state.items['potion'], 5)
+
+    def test_legacy_save_upgraded_on_disk_once(self):
+        """Loading an old save rewrites it in the current schema."""
+        with open(os.path.join(self.test_dir, "old.json"), 'w') as f:
+            json.dump(self.legacy_save(), f)
+        state = quiet(self.manager.load_game, "old")
+        self.assertIsNotNone(state)
+        with open(os.path.join(self.test_dir, "old.json"), 'rb') as f:
+            data = load_save_data(f.read())
+        self.assertEqual(schema_version(data), SAVE_SCHEMA_VERSION)
+        self.assertEqual(migrate_save_data(data), 0)
+        self.assertEqual(quiet(self.manager.load_game, "old").to_dict(), state.to_dict())
+
+    def test_newer_schema_rejected(self):
+        """Saves from a newer game version are refused, not misread."""
+        data = json.loads(json.dumps(self.template.to_dict()))
+        data['version'] = SAVE_SCHEMA_VERSION + 1
+        with self.assertRaises(SaveFileVersionError):
+            GameState.from_dict(data)
+
+    def test_migration_chain_complete(self):
+        """Every older schema has exactly one registered migration."""
+        self.assertEqual(sorted(MIGRATIONS), list(range(1, SAVE_SCHEMA_VERSION)))
+        with self.assertRaises(ValueError):
+            migration(1)(lambda data: None)
+
+    def test_legacy_trade_package(self):
+        """Trade files written before versioning still unpack."""
+        starter = self.template.player_team.creatures[0]
+        species = starter.species.to_dict()
+        for move in species['moves']:
+            move.pop('crit_rate')
+        package = TradePackage.from_dict({
+            'creature': self.legacy_creature(starter), 'species': species,
+            'source_save': "old", 'export_timestamp': "2024-01-01T00:00:00"
+        })
+        creature, _ = package.unpack(self.template.species_dict)
+        self.assertEqual(creature.level, starter.level)
+        self.assertEqual(creature.moves[0].crit_rate, 0)
+
+
+class TestSaveIntegrity(unittest.TestCase):
+    """Test section checksums, verification and recovery."""
+
+    @classmethod
+    def setUpClass(cls):
+        state = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "damaged", "Tester")
+        state.storage = [Creature(species=state.species_dict[i], level=10) for i in range(4, 20)]
+        cls.state = state
+        cls.data = state.to_dict()
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def edit_storage(self, codec, raw):
+        """Change a stored creature's level behind the checksums' back."""
+        if isinstance(codec, BinaryCodec):
+            offset, length, _ = codec.read_section_table(raw)['storage']
+            payload = zlib.compress(json.dumps({'storage': []}).encode('utf-8'))
+            self.assertLessEqual(len(payload), length)
+            return raw[:offset] + payload.ljust(length, b'\0') + raw[offset + length:]
+        document = json.loads(codec.unwrap(raw))
+        document['storage'][0]['level'] = 100
+        return codec.wrap(json.dumps(document).encode('utf-8'))
+
+    def test_intact_saves_verify(self):
+        """Freshly written saves verify clean and decode without checksums."""
+        for name, codec in SAVE_CODECS.items():
+            with self.subTest(codec=name):
+                raw = codec.encode(self.data)
+                self.assertEqual(verify_save_data(raw), [])
+                self.assertNotIn(CHECKSUMS_KEY, load_save_data(raw))
+
+    def test_edited_section_detected_and_recovered(self):
+        """A changed section fails to load, is reported, and is dropped on recovery."""
+        for name, codec in SAVE_CODECS.items():
+            with self.subTest(codec=name):
+                raw = self.edit_storage(codec, codec.encode(self.data))
+                with self.assertRaisesRegex(SaveFileCorruptedError, "storage"):
+                    load_save_data(raw)
+                self.assertEqual(verify_save_data(raw), ['storage'])
+                data, lost = recover_save_data(raw)
+                self.assertEqual(lost, ['storage'])
+                self.assertNotIn('storage', data)
+                self.assertEqual(data['player_team'], self.data['player_team'])
+                self.assertEqual(data['money'], self.data['money'])
+
+    def test_truncated_save_recovered(self):
+        """Sections before the point of truncation are salvaged."""
+        for name in ("json", "compact", "zlib", "gzip", "binary"):
+            codec = get_codec(name)
+            with self.subTest(codec=name):
+                raw = codec.encode(self.data)
+                cut = raw[:len(raw) * 2 // 3]
+                with self.assertRaises(SaveFileCorruptedError):
+                    load_save_data(cut)
+                data, lost = recover_save_data(cut)
+                self.assertEqual(data['seed'], self.data['seed'])
+                self.assertIn('progress', lost)
+                self.assertNotIn('header', lost)
+
+    def test_binary_version_1_still_loads(self):
+        """Binary saves written before section CRCs load and verify by decompressing."""
+        codec = BinaryCodec()
+        raw = codec.encode(self.data)
+        table = codec.read_section_table(raw)
+        header = struct.pack('>4sHH', codec.magic, 1, len(table))
+        entries = b''.join(bytes([len(name)]) + name.encode('ascii') for name in table)
+        shift = len(header) + len(entries) + 8 * len(table)
+        old = header + b''.join(
+            bytes([len(name)]) + name.encode('ascii') +
+            struct.pack('>II', shift + sum(length for _, length, _ in list(table.values())[:i]), length)
+            for i, (name, (_, length, _)) in enumerate(table.items())
+        ) + b''.join(raw[offset:offset + length] for offset, length, _ in table.values())
+        self.assertEqual(load_save_data(old), self.data)
+        self.assertEqual(verify_save_data(old), [])
+
+    def test_manager_verify_and_recover(self):
+        """The save manager reports damage, and recovery rewrites a loadable save."""
+        manager = SaveManager(self.test_dir, codec="binary")
+        quiet(manager.save_game, self.state)
+        other = GameState.from_dict(json.loads(json.dumps(self.data)))
+        other.save_name = "intact"
+        quiet(manager.save_game, other)
+
+        path = os.path.join(self.test_dir, "damaged.sav")
+        with open(path, 'rb') as f:
+            raw = f.read()
+        with open(path, 'wb') as f:
+            f.write(self.edit_storage(BinaryCodec(), raw))
+
+        reports = {r['save_name']: r for r in manager.verify_saves()}
+        self.assertTrue(reports['intact']['ok'])
+        self.assertEqual(reports['damaged']['damaged'], ['storage'])
+        with self.assertRaises(SaveFileCorruptedError):
+            quiet(manager.load_game, "damaged").storage  # Checked when first decoded
+
+        state, lost = quiet(manager.recover_save, "damaged")
+        self.assertEqual(lost, ['storage'])
+        self.assertEqual(len(state.storage), 0)
+        self.assertEqual(state.player_team.creatures[0].level,
+                         self.state.player_team.creatures[0].level)
+        self.assertTrue(os.path.exists(path + ".damaged"))
+        self.assertTrue(manager.verify_save("damaged")['ok'])
+        self.assertEqual(quiet(manager.load_game, "damaged").player_name, "Tester")
+
+
+class TestSaveMaintenance(unittest.TestCase):
+    """Test bulk validation, migration, re-encoding and compaction."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.template = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "bulk", "Tester")
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir, verbose=False)
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def write_saves(self, count, version=SAVE_SCHEMA_VERSION):
+        """Write count copies of the template save with the given schema version."""
+        data = self.template.to_dict()
+        data['version'] = version
+        for i in range(count):
+            data['save_name'] = f"save{i}"
+            with open(os.path.join(self.test_dir, f"save{i}.json"), 'w') as f:
+                json.dump(data, f)
+
+    def test_compact_collects_unused_sprites(self):
+        """Compacting deletes sprites no save, backup or trade file references."""
+        store = self.manager.sprite_store
+        kept = self.manager.create_new_game("kept", "Ash")
+        self.manager.save_game(kept)
+        gone = self.manager.create_new_game("gone", "Misty")
+        self.manager.save_game(gone)
+        trades = TradeManager(os.path.join(self.test_dir, "trades"))
+        path = trades.export_creature(gone.player_team.creatures[0], "gone", embed_sprites=False)
+        with open(path) as f:
+            traded_refs = set(json.load(f)['species'][SPRITE_REFS_KEY].values())
+        before = set(store.digests())
+
+        self.manager.delete_save("gone")
+        collected = run_maintenance(self.test_dir, "compact", jobs=1)['collected']
+        self.assertIsNone(collected['error'])
+        self.assertGreater(collected['sprites_removed'], 0)
+        self.assertGreater(collected['bytes_freed'], 0)
+        remaining = set(store.digests())
+        self.assertEqual(len(before - remaining), collected['sprites_removed'])
+        self.assertLessEqual(traded_refs, remaining)
+        loaded = SaveManager(self.test_dir, verbose=False).load_game("kept")
+        self.assertEqual(loaded.species_dict[4].sprite_data, kept.species_dict[4].sprite_data)
+
+    def test_collect_keeps_everything_if_a_save_is_unreadable(self):
+        """Sprites are not collected while a save's references are unknown."""
+        self.manager.save_game(self.template)
+        with open(os.path.join(self.test_dir, "broken.json"), 'w') as f:
+            f.write("{not json")
+        report = self.manager.collect_garbage()
+        self.assertIn("broken", report['error'])
+        self.assertEqual(report['sprites_removed'], 0)
+
+    def test_quiet_manager_prints_nothing(self):
+        """A non-verbose manager saves and loads silently."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.manager.save_game(self.template)
+            self.assertIsNotNone(self.manager.load_game("bulk"))
+        self.assertEqual(output.getvalue(), "")
+
+    def test_migrate_keeps_format(self):
+        """Old saves are upgraded in their own codec; current saves are left alone."""
+        self.write_saves(3, version='0.1.0')
+        report = run_maintenance(self.test_dir, "migrate", jobs=1)
+        self.assertEqual((report['saves'], report['ok'], report['changed']), (3, 3, 3))
+        self.assertEqual(report['results'][0]['schema'], 1)
+        with open(os.path.join(self.test_dir, "save0.json"), 'rb') as f:
+            raw = f.read()
+        self.assertEqual(detect_codec(raw).name, "json")
+        self.assertEqual(schema_version(load_save_data(raw)), SAVE_SCHEMA_VERSION)
+        self.assertEqual(run_maintenance(self.test_dir, "migrate", jobs=1)['changed'], 0)
+
+    def test_recode_in_worker_processes(self):
+        """Recoding across a process pool rewrites every save and the manifest."""
+        self.write_saves(6)
+        report = run_maintenance(self.test_dir, "recode", codec="binary", jobs=2)
+        self.assertEqual((report['ok'], report['changed'], report['jobs']), (6, 6, 2))
+        self.assertLess(report['bytes_after'], report['bytes_before'])
+        self.assertNotIn('summary', report['results'][0])
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "save0.json")))
+
+        manager = SaveManager(self.test_dir, verbose=False)
+        with mock.patch.object(manager, '_read_save_data', side_effect=AssertionError):
+            infos = manager.list_save_info()  # Served from the manifest alone
+        self.assertEqual(sorted(info['save_name'] for info in infos),
+                         [f"save{i}" for i in range(6)])
+        self.assertEqual(manager.load_game("save3").player_name, "Tester")
+
+    def test_compact_folds_journal(self):
+        """Compaction replaces snapshot plus journal with one snapshot."""
+        manager = SaveManager(self.test_dir, journal=True, verbose=False)
+        manager.save_game(self.template)
+        self.template.money += 1
+        manager.save_game(self.template)
+        self.assertTrue(os.path.exists(os.path.join(self.test_dir, "bulk.journal")))
+
+        report = self.manager.maintain_save("bulk", "compact")
+        self.assertTrue(report['ok'] and report['changed'])
+        self.assertFalse(os.path.exists(os.path.join(self.test_dir, "bulk.journal")))
+        self.assertEqual(self.manager.load_game("bulk").money, self.template.money)
+        self.assertFalse(self.manager.maintain_save("bulk", "compact")['changed'])
+
+    def test_validate_reports_failures(self):
+        """Damaged and too-new saves fail validation; the command exits 1."""
+        self.write_saves(3)
+        self.write_saves(1, version=SAVE_SCHEMA_VERSION + 1)
+        codec = get_codec("binary")
+        with open(os.path.join(self.test_dir, "save1.json"), 'rb') as f:
+            raw = bytearray(codec.encode(load_save_data(f.read())))
+        os.remove(os.path.join(self.test_dir, "save1.json"))
+        offset, length, _ = codec.read_section_table(bytes(raw))['progress']
+        raw[offset + length // 2] ^= 0xFF
+        with open(os.path.join(self.test_dir, "save1.sav"), 'wb') as f:
+            f.write(raw)
+
+        report = run_maintenance(self.test_dir, "validate", jobs=1)
+        results = {r['save_name']: r for r in report['results']}
+        self.assertFalse(results['save0']['ok'])
+        self.assertIn("schema", results['save0']['error'])
+        self.assertEqual(results['save1']['damaged'], ['progress'])
+        self.assertTrue(results['save2']['ok'])
+        self.assertEqual(report['changed'], 0)
+
+        report_path = os.path.join(self.test_dir, "report.json")
+        status = maintenance_main(["validate", "--dir", self.test_dir, "--quiet",
+                                   "--report", report_path])
+        self.assertEqual(status, 1)
+        with open(report_path) as f:
+            self.assertEqual(json.load(f)['failed'], 2)
+        self.assertEqual(maintenance_main(["validate", "save2", "--dir", self.test_dir,
+                                           "--quiet"]), 0)
+
+
+class TestMappedBinaryLoading(unittest.TestCase):
+    """Test binary saves whose large sections are decoded on first access."""
+
+    @classmethod
+    def setUpClass(cls):
+        state = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "mapped", "Tester")
+        state.storage = [Creature(species=state.species_dict[i], level=12) for i in range(4, 40)]
+        team = Team()
+        team.add_creature(Creature(species=state.species_dict[7], level=20))
+        state.trainer_teams = {"rival": team}
+        state.defeated_trainers = ["rival"]
+        state.pokedex_seen = {1, 4, 7}
+        cls.state = state
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir, codec="binary", verbose=False)
+        self.manager.save_game(self.state)
+        self.path = os.path.join(self.test_dir, "mapped.sav")
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_sections_deferred_until_used(self):
+        """Storage, trainers and pokedex are decoded on first access, unchanged."""
+        state = self.manager.load_game("mapped")
+        self.assertEqual(state.deferred_sections, {'storage', 'trainers', 'pokedex'})
+        self.assertEqual(len(state.storage), 36)
+        self.assertEqual(state.deferred_sections, {'trainers', 'pokedex'})
+        self.assertEqual(state.trainer_teams["rival"].creatures[0].level, 20)
+        self.assertFalse(state.is_dirty)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertEqual(state.deferred_sections, frozenset())
+
+    def test_assignment_loads_whole_section(self):
+        """Assigning one attribute of a deferred section keeps its siblings."""
+        state = self.manager.load_game("mapped")
+        state.pokedex_caught = {1}
+        self.assertEqual(state.pokedex_seen, {1, 4, 7})
+        self.assertEqual(state.dirty_sections, {'progress'})
+
+    def test_mapping_survives_file_replacement(self):
+        """Deferred sections come from the file as loaded, then saving works."""
+        state = self.manager.load_game("mapped")
+        other = self.manager.load_game("mapped")
+        other.storage = []
+        self.manager.save_game(other)
+        self.assertEqual(len(state.storage), 36)
+        self.assertTrue(self.manager.save_game(state))
+        self.assertEqual(len(self.manager.load_game("mapped").storage), 36)
+
+    def test_loaded_boxes_not_reencoded(self):
+        """The first save after loading encodes only the boxes changed since."""
+        state = self.manager.load_game("mapped")
+        self.assertEqual(state.storage.box_sizes, [30, 6])
+        state.storage[31] = Creature(species=state.species_dict[9], level=50)
+        with mock.patch.object(BinaryCodec, '_compress_box', autospec=True,
+                               side_effect=BinaryCodec._compress_box) as compress:
+            self.assertTrue(self.manager.save_game(state))
+        self.assertEqual(compress.call_count, 1)
+        loaded = self.manager.load_game("mapped")
+        self.assertEqual(loaded.storage[31].level, 50)
+        self.assertEqual(loaded.to_dict()['storage'], state.to_dict()['storage'])
+
+    def damage_section(self, name):
+        with open(self.path, 'rb') as f:
+            raw = bytearray(f.read())
+        offset, length, _ = BinaryCodec().read_section_table(bytes(raw))[name]
+        raw[offset + length // 2] ^= 0xFF
+        with open(self.path, 'wb') as f:
+            f.write(raw)
+
+    def test_damaged_deferred_section_fails_on_access(self):
+        """Deferred sections are checked against their CRCs when first decoded."""
+        self.damage_section('storage')
+        with MappedBinarySave(self.path) as mapped:
+            self.assertEqual(mapped.read(['header'])['seed'], self.state.seed)
+            with self.assertRaisesRegex(SaveFileCorruptedError, "storage"):
+                mapped.read(['storage'])
+        state = self.manager.load_game("mapped")
+        self.assertEqual(state.pokedex_seen, {1, 4, 7})
+        with self.assertRaisesRegex(SaveFileCorruptedError, "storage"):
+            state.storage
+        self.assertIn('storage', state.deferred_sections)
+
+    def test_damaged_eager_section_fails_load(self):
+        """Sections decoded at load are still checked at load."""
+        self.damage_section('team')
+        self.assertIsNone(quiet(self.manager.load_game, "mapped"))
+
+    def test_mapped_sections_match_codec(self):
+        """Sections read from the mapping match a whole-file decode."""
+        with open(self.path, 'rb') as f:
+            expected = load_save_data(f.read())
+        with MappedBinarySave(self.path) as mapped:
+            self.assertEqual(mapped.read(['team'])['player_team'], expected['player_team'])
+            self.assertEqual(mapped.read(), expected)
+        self.assertTrue(mapped.closed)
+
+    def test_other_saves_load_eagerly(self):
+        """JSON saves, and binary saves with journal records, are read whole."""
+        json_manager = SaveManager(self.test_dir, verbose=False)
+        json_manager.save_game(self.state)
+        self.assertEqual(json_manager.load_game("mapped").deferred_sections, frozenset())
+
+        journal_manager = SaveManager(self.test_dir, codec="binary", journal=True, verbose=False)
+        journal_manager.save_game(self.state)
+        self.state.money += 1
+        journal_manager.save_game(self.state)
+        state = journal_manager.load_game("mapped")
+        self.assertEqual(state.deferred_sections, frozenset())
+        self.assertEqual(state.money, self.state.money)
+
+
+class TestSaveBackups(unittest.TestCase):
+    """Test rotating backups that share unchanged sections."""
+
+    @classmethod
+    def setUpClass(cls):
+        state = quiet(SaveManager(tempfile.mkdtemp()).create_new_game, "backed", "Tester")
+        state.storage = [Creature(species=state.species_dict[i], level=8) for i in range(4, 150)]
+        cls.state = state
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = SaveManager(self.test_dir, backups=3, verbose=False)
+        self.state = GameState.from_dict(self.__class__.state.to_dict())
+        self.state.save_name = "backed"
+
+    def tearDown(self):
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def chunk_count(self):
+        return sum(len(files) for _, _, files in os.walk(self.manager.backups.chunks.root))
+
+    def test_backups_rotate(self):
+        """Only the newest backups are kept, listed newest first."""
+        for money in range(5):
+            self.state.money = money
+            self.manager.save_game(self.state)
+        self.assertEqual([b['id'] for b in self.manager.list_backups("backed")], [5, 4, 3])
+
+    def test_unchanged_sections_shared(self):
+        """A save changing only money and position stores just the changed chunks."""
+        self.manager.save_game(self.state)
+        first = self.chunk_count()
+        self.state.money += 50
+        self.state.player_x += 1
+        self.state.storage.append(Creature(species=self.state.species_dict[1], level=5))
+        self.manager.save_game(self.state)
+        # header, progress, the storage box sizes and the last box
+        self.assertEqual(self.chunk_count() - first, 4)
+
+    def test_dropped_chunks_collected(self):
+        """Chunks only referenced by dropped backups are deleted."""
+        for money in range(3):
+            self.state.money = money
+            self.manager.save_game(self.state)
+        full = self.chunk_count()
+        for money in range(3, 9):
+            self.state.money = money
+            self.manager.save_game(self.state)
+        self.assertEqual(self.chunk_count(), full)
+
+    def test_restore_backup(self):
+        """Restoring rolls the save back and keeps it loadable."""
+        self.manager.save_game(self.state)
+        original_id = self.manager.list_backups("backed")[0]['id']
+        self.state.money = 5
+        del self.state.storage[:100]
+        self.manager.save_game(self.state)
+
+        state = self.manager.restore_backup("backed", original_id)
+        self.assertEqual(state.money, self.__class__.state.money)
+        self.assertEqual(len(state.storage), 146)
+        self.assertEqual(len(self.manager.load_game("backed").storage), 146)
+        self.assertIsNone(quiet(self.manager.restore_backup, "backed", 99))
+
+    def test_chunks_shared_between_saves(self):
+        """Deleting a save keeps chunks another save's backups still use."""
+        self.manager.save_game(self.state)
+        self.state.save_name = "copy"
+        self.manager.save_game(self.state)
+        self.assertTrue(self.manager.delete_save("backed"))
+        self.assertEqual(self.manager.list_backups("backed"), [])
+        backup_id = self.manager.list_backups("copy")[0]['id']
+        self.assertEqual(len(self.manager.restore_backup("copy", backup_id).storage), 146)
+        self.manager.delete_save("copy")
+        self.assertEqual(self.chunk_count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
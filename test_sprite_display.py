@@ -0,0 +1,194 @@
+"""
+Test suite for terminal sprite display.
+
+Tests:
+1. Half-block renderer (truecolor, 256-color and plain modes)
+2. Frame caching per (sprite, scale, color_mode), invalidated by in-place changes
+3. Sprite viewer reading the real sprite_data keys
+4. ASCII sprite rendering (brightness tables, downsampling, memoization)
+"""
+
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from genemon.sprites.generator import SpriteGenerator
+from genemon.sprites.indexed import IndexedSprite
+from genemon.ui.display import Display
+from genemon.ui.sprite_renderer import (
+    SpriteRenderer, rgb_to_ansi256,
+    COLOR_TRUECOLOR, COLOR_256, COLOR_NONE, UPPER_HALF, LOWER_HALF, FULL_BLOCK
+)
+from genemon.creatures.generator import CreatureGenerator
+
+
+class CountingStream(io.StringIO):
+    """StringIO that counts write calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class TestHalfBlockRenderer(unittest.TestCase):
+    """Test SpriteRenderer output."""
+
+    def setUp(self):
+        self.renderer = SpriteRenderer()
+        self.sprites = SpriteGenerator(seed=99).generate_creature_sprites(
+            creature_id=4, types=["Leaf"], archetype="biped"
+        )
+
+    def test_two_pixel_rows_per_line(self):
+        """A 56-row sprite renders to 28 lines."""
+        frame = self.renderer.render(self.sprites['front'], color_mode=COLOR_NONE)
+        self.assertEqual(frame.count("\n"), 28)
+
+    def test_half_block_glyphs(self):
+        """Each top/bottom combination maps to the right glyph."""
+        sprite = [
+            ["#ff0000", "transparent", "#ff0000", "transparent"],
+            ["#ff0000", "#00ff00", "transparent", "transparent"],
+        ]
+        frame = self.renderer.render(sprite, color_mode=COLOR_NONE)
+        self.assertEqual(frame, FULL_BLOCK + LOWER_HALF + UPPER_HALF + "\n")
+
+    def test_truecolor_escapes(self):
+        """Truecolor mode emits 24-bit foreground and background escapes."""
+        sprite = [["#ff0000"], ["#00ff00"]]
+        frame = self.renderer.render(sprite, color_mode=COLOR_TRUECOLOR)
+        self.assertIn("\033[38;2;255;0;0m", frame)
+        self.assertIn("\033[48;2;0;255;0m", frame)
+        self.assertTrue(frame.rstrip("\n").endswith("\033[0m"))
+
+    def test_256_color_escapes(self):
+        """256-color mode maps colors onto the xterm palette."""
+        frame = self.renderer.render([["#ff0000"], ["#ff0000"]], color_mode=COLOR_256)
+        self.assertIn("\033[38;5;196m", frame)
+        self.assertEqual(rgb_to_ansi256(0, 0, 0), 16)
+        self.assertEqual(rgb_to_ansi256(255, 255, 255), 231)
+
+    def test_scale(self):
+        """Scaling repeats pixels in both directions."""
+        frame = self.renderer.render([["#ff0000"]], scale=2, color_mode=COLOR_NONE)
+        self.assertEqual(frame, FULL_BLOCK * 2 + "\n")
+
+    def test_unknown_color_mode(self):
+        """Unknown color modes are rejected."""
+        with self.assertRaises(ValueError):
+            self.renderer.render(self.sprites['mini'], color_mode="cga")
+
+
+class TestFrameCache(unittest.TestCase):
+    """Test rendered frame caching."""
+
+    def setUp(self):
+        self.renderer = SpriteRenderer()
+        self.sprite = SpriteGenerator(seed=5).generate_creature_sprites(
+            creature_id=1, types=["Flame"]
+        )['front']
+
+    def test_frame_reused(self):
+        """Repeat renders return the cached frame object."""
+        first = self.renderer.render(self.sprite, color_mode=COLOR_256)
+        second = self.renderer.render(self.sprite, color_mode=COLOR_256)
+        self.assertIs(first, second)
+
+    def test_key_includes_scale_and_mode(self):
+        """Different scales and color modes are cached separately."""
+        a = self.renderer.render(self.sprite, scale=1, color_mode=COLOR_256)
+        b = self.renderer.render(self.sprite, scale=2, color_mode=COLOR_256)
+        c = self.renderer.render(self.sprite, scale=1, color_mode=COLOR_TRUECOLOR)
+        self.assertNotEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_draw_single_write(self):
+        """Drawing a sprite costs one write call."""
+        stream = CountingStream()
+        self.renderer.draw(self.sprite, color_mode=COLOR_TRUECOLOR, stream=stream)
+        self.renderer.draw(self.sprite, color_mode=COLOR_TRUECOLOR, stream=stream)
+        self.assertEqual(stream.writes, 2)
+
+    def test_cache_bounded(self):
+        """The cache evicts least recently used frames."""
+        renderer = SpriteRenderer(max_cached_frames=2)
+        sprites = [[["#ff0000"]], [["#00ff00"]], [["#0000ff"]]]
+        for sprite in sprites:
+            renderer.render(sprite, color_mode=COLOR_NONE)
+        self.assertEqual(len(renderer._frames), 2)
+
+    def test_changed_sprite_rerendered(self):
+        """Changing a hex array in place invalidates its cached frames."""
+        sprite = [["#ff0000", "#ff0000"], ["#ff0000", "#ff0000"]]
+        first = self.renderer.render(sprite, color_mode=COLOR_TRUECOLOR)
+        sprite[1][0] = "#0000ff"
+        second = self.renderer.render(sprite, color_mode=COLOR_TRUECOLOR)
+        self.assertNotEqual(first, second)
+        self.assertEqual(second, SpriteRenderer().render(
+            [list(row) for row in sprite], color_mode=COLOR_TRUECOLOR))
+
+
+class TestSpriteViewer(unittest.TestCase):
+    """Test the sprite viewer uses species.sprite_data."""
+
+    def test_viewer_shows_all_views(self):
+        """Front, back and mini sprites are all displayed."""
+        species = CreatureGenerator(seed=7).generate_all_creatures()[0]
+        species.sprite_data = SpriteGenerator(seed=7).generate_creature_sprites(
+            species.id, species.types
+        )
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            Display.show_sprite_viewer(species.id, {species.id: species}, {species.id})
+
+        text = output.getvalue()
+        self.assertIn("FRONT SPRITE", text)
+        self.assertIn("BACK SPRITE", text)
+        self.assertIn("MINI SPRITE", text)
+
+
+class TestAsciiSprites(unittest.TestCase):
+    """Test SpriteGenerator.sprite_to_ascii."""
+
+    def setUp(self):
+        self.generator = SpriteGenerator(seed=3)
+        self.sprite = self.generator.generate_creature_sprites(2, ["Aqua"], "fish")['front']
+
+    def test_brightness_characters(self):
+        """Pixels map to characters by brightness."""
+        sprite = [["transparent", "#ffffff", "#aaaaaa", "#787878", "#404040", "#101010"]]
+        self.assertEqual(self.generator.sprite_to_ascii(sprite), " #+*.:")
+
+    def test_downsampling(self):
+        """Scales below 1 shrink the rendering."""
+        lines = self.generator.sprite_to_ascii(self.sprite, scale=0.5).split("\n")
+        self.assertEqual(len(lines), 28)
+        self.assertTrue(all(len(line) == 28 for line in lines))
+
+    def test_memoized_per_sprite_and_scale(self):
+        """Repeat renders reuse the cached string."""
+        first = self.generator.sprite_to_ascii(self.sprite, scale=0.5)
+        self.assertIs(self.generator.sprite_to_ascii(self.sprite, scale=0.5), first)
+        self.assertNotEqual(self.generator.sprite_to_ascii(self.sprite, scale=1), first)
+
+    def test_changed_sprite_rerendered(self):
+        """Changing a hex array in place is not served from the cache."""
+        sprite = [["#ffffff", "#ffffff"]]
+        self.assertEqual(self.generator.sprite_to_ascii(sprite), "##")
+        sprite[0][1] = "#101010"
+        self.assertEqual(self.generator.sprite_to_ascii(sprite), "#:")
+
+    def test_indexed_sprite_input(self):
+        """IndexedSprites render the same as their hex arrays."""
+        indexed = IndexedSprite.from_hex_array(self.sprite)
+        self.assertEqual(self.generator.sprite_to_ascii(indexed, scale=0.25),
+                         SpriteGenerator(seed=3).sprite_to_ascii(self.sprite, scale=0.25))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,451 @@
+"""
+Test suite for indexed sprites and sprite encoding.
+
+Tests:
+1. IndexedSprite conversions (hex arrays, Color arrays)
+2. Palette PNG encoding (color type 3 + tRNS, scaling, compression level)
+3. Shiny sprites via palette swap
+4. Content-addressed sprite store (saves and trade packages)
+5. Compact sprite set encoding in CreatureSpecies serialization
+6. Memory-mapped sprite pack files
+7. Parallel bulk PNG export
+"""
+
+import contextlib
+import filecmp
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+from genemon.sprites.generator import SpriteGenerator, Color, TRANSPARENT
+from genemon.sprites.indexed import IndexedSprite
+from genemon.sprites.png import encode_indexed_png, PNG_SIGNATURE
+from genemon.sprites.store import SpriteStore, SPRITE_REFS_KEY
+from genemon.sprites.codec import (
+    encode_sprite_set, decode_sprite_set, is_encoded_sprite_set, SPRITE_SET_PREFIX
+)
+from genemon.sprites.pack import SpritePack, build_sprite_pack, sprite_fingerprint
+from genemon.core.creature import CreatureSpecies, CreatureStats, Move
+from genemon.creatures.generator import CreatureGenerator
+from genemon.creatures.generator import ARCHETYPES
+from genemon.core.save_system import SaveManager
+from genemon.core.trading import TradeManager
+
+
+def read_png_chunks(png_data: bytes) -> dict:
+    """Parse a PNG into {chunk_type: data}, verifying every CRC."""
+    assert png_data[:8] == PNG_SIGNATURE
+    chunks = {}
+    pos = 8
+    while pos < len(png_data):
+        length = struct.unpack('>I', png_data[pos:pos + 4])[0]
+        chunk_type = png_data[pos + 4:pos + 8]
+        data = png_data[pos + 8:pos + 8 + length]
+        crc = struct.unpack('>I', png_data[pos + 8 + length:pos + 12 + length])[0]
+        assert crc == zlib.crc32(chunk_type + data) & 0xffffffff, f"Bad CRC in {chunk_type}"
+        chunks[chunk_type] = chunks.get(chunk_type, b'') + data
+        pos += 12 + length
+    return chunks
+
+
+def decode_palette_png(png_data: bytes):
+    """Decode an unfiltered 8-bit palette PNG into (width, height, rows, chunks)."""
+    chunks = read_png_chunks(png_data)
+    width, height, depth, color_type = struct.unpack('>IIBB', chunks[b'IHDR'][:10])
+    assert depth == 8 and color_type == 3
+    raw = zlib.decompress(chunks[b'IDAT'])
+    stride = width + 1
+    rows = []
+    for y in range(height):
+        line = raw[y * stride:(y + 1) * stride]
+        assert line[0] == 0, "Expected filter type 0"
+        rows.append(line[1:])
+    return width, height, rows, chunks
+
+
+class TestIndexedSprite(unittest.TestCase):
+    """Test IndexedSprite conversions."""
+
+    def setUp(self):
+        self.sprites = SpriteGenerator(seed=12345).generate_creature_sprites(
+            creature_id=1, types=["Flame"], archetype="quadruped"
+        )
+
+    def test_hex_round_trip(self):
+        """Hex arrays survive conversion to indexed form and back."""
+        for view in ('front', 'back', 'mini'):
+            indexed = IndexedSprite.from_hex_array(self.sprites[view])
+            self.assertEqual(indexed.to_hex_array(), self.sprites[view])
+
+    def test_transparent_is_index_zero(self):
+        """Transparent pixels map to index 0."""
+        indexed = IndexedSprite.from_hex_array(self.sprites['front'])
+        self.assertEqual(indexed.pixels[0], 0)
+        self.assertEqual(indexed.width, 56)
+        self.assertEqual(indexed.height, 56)
+
+    def test_from_color_array(self):
+        """Color arrays convert with TRANSPARENT as index 0."""
+        red = Color(255, 0, 0)
+        sprite = [[TRANSPARENT, red], [Color(255, 0, 0), TRANSPARENT]]
+        indexed = IndexedSprite.from_color_array(sprite)
+        self.assertEqual(bytes(indexed.pixels), bytes([0, 1, 1, 0]))
+        self.assertEqual(indexed.palette, ((255, 0, 0),))
+
+    def test_invalid_buffer_size(self):
+        """A pixel buffer of the wrong size is rejected."""
+        with self.assertRaises(ValueError):
+            IndexedSprite(2, 2, b'\x00', [])
+
+
+class TestPaletteEncoder(unittest.TestCase):
+    """Test palette PNG encoding."""
+
+    def setUp(self):
+        sprites = SpriteGenerator(seed=42).generate_creature_sprites(
+            creature_id=7, types=["Aqua"], archetype="fish"
+        )
+        self.indexed = IndexedSprite.from_hex_array(sprites['front'])
+
+    def test_palette_png_structure(self):
+        """Encoder writes PLTE and tRNS chunks with index 0 transparent."""
+        png_data = encode_indexed_png(self.indexed)
+        width, height, rows, chunks = decode_palette_png(png_data)
+
+        self.assertEqual((width, height), (56, 56))
+        self.assertEqual(len(chunks[b'PLTE']), 3 * (len(self.indexed.palette) + 1))
+        self.assertEqual(chunks[b'tRNS'], b'\x00')
+        self.assertEqual(rows, self.indexed.rows())
+
+    def test_scaled_pixels(self):
+        """Scaled output repeats each pixel horizontally and vertically."""
+        scale = 3
+        width, height, rows, _ = decode_palette_png(encode_indexed_png(self.indexed, scale))
+
+        self.assertEqual((width, height), (56 * scale, 56 * scale))
+        for y in range(0, height, 7):
+            source = self.indexed.row(y // scale)
+            expected = bytes(source[x // scale] for x in range(width))
+            self.assertEqual(rows[y], expected)
+
+    def test_compression_level(self):
+        """Compression level is tunable and does not change pixels."""
+        fast = encode_indexed_png(self.indexed, 4, compression_level=1)
+        small = encode_indexed_png(self.indexed, 4, compression_level=9)
+        self.assertEqual(decode_palette_png(fast)[2], decode_palette_png(small)[2])
+        self.assertLessEqual(len(small), len(fast))
+
+    def test_color_array_export_is_palette_png(self):
+        """Legacy Color array export now produces palette PNGs."""
+        color_sprite = SpriteGenerator.hex_array_to_color_array(self.indexed.to_hex_array())
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sprite.png")
+            SpriteGenerator.export_sprite_to_png(color_sprite, path, scale=2)
+            with open(path, 'rb') as f:
+                _, _, rows, _ = decode_palette_png(f.read())
+        self.assertEqual(len(rows), 112)
+
+
+class TestShinyPaletteSwap(unittest.TestCase):
+    """Test shiny sprites derived by palette swap."""
+
+    def test_swap_matches_full_rasterization(self):
+        """Palette swap and full shiny rasterization produce identical pixels."""
+        gen = SpriteGenerator(seed=2024)
+        for creature_id, (types, archetype) in enumerate([
+            (["Flame"], "quadruped"), (["Aqua"], "fish"), (["Volt"], "bird"),
+            (["Shadow"], "serpent"), (["Mystic"], "blob")
+        ]):
+            shiny_palette = gen._get_palette(types, is_shiny=True)
+            rasterized = gen._rasterize(creature_id, shiny_palette, archetype)
+
+            swapped = gen.generate_shiny_indexed_sprites(creature_id, types, archetype)
+            for view in ('front', 'back', 'mini'):
+                self.assertEqual(
+                    swapped[view].to_hex_array(),
+                    gen._sprite_to_hex_array(rasterized[view]),
+                    f"{types[0]}/{archetype}/{view} differs"
+                )
+
+    def test_shares_index_buffer(self):
+        """Shiny sprites reuse the cached normal index buffer."""
+        gen = SpriteGenerator(seed=3)
+        normal = gen.generate_indexed_sprites(10, ["Leaf"], "biped")
+        shiny = gen.generate_shiny_indexed_sprites(10, ["Leaf"], "biped")
+        self.assertIs(shiny['front'].pixels, normal['front'].pixels)
+        self.assertNotEqual(shiny['front'].palette, normal['front'].palette)
+
+    def test_every_archetype_has_shiny_variant(self):
+        """generate_creature_sprites(is_shiny=True) recolors every archetype."""
+        gen = SpriteGenerator(seed=8)
+        for archetype in ARCHETYPES:
+            normal = gen.generate_creature_sprites(1, ["Terra"], archetype)
+            shiny = gen.generate_creature_sprites(1, ["Terra"], archetype, is_shiny=True)
+            self.assertNotEqual(normal['front'], shiny['front'])
+
+
+class TestSpriteStore(unittest.TestCase):
+    """Test the content-addressed sprite store."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = SpriteStore(os.path.join(self.test_dir, "sprites"))
+        self.sprites = SpriteGenerator(seed=11).generate_creature_sprites(3, ["Frost"], "bird")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def count_sprite_files(self, root):
+        return sum(len(files) for _, _, files in os.walk(root))
+
+    def test_put_get_round_trip(self):
+        """Stored sprites load back identically."""
+        digest = self.store.put(self.sprites['front'])
+        fresh = SpriteStore(self.store.root)
+        self.assertEqual(fresh.get(digest).to_hex_array(), self.sprites['front'])
+
+    def test_identical_sprites_stored_once(self):
+        """Equal sprites share one digest and one file."""
+        copy = [list(row) for row in self.sprites['front']]
+        self.assertEqual(self.store.put(self.sprites['front']), self.store.put(copy))
+        self.assertEqual(self.count_sprite_files(self.store.root), 1)
+
+    def test_changed_sprite_gets_new_digest(self):
+        """A hex array changed in place after being stored is stored again."""
+        sprite = [list(row) for row in self.sprites['front']]
+        first = self.store.put(sprite)
+        sprite[0][0] = "#123456"
+        second = self.store.put(sprite)
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.store.get(second).to_hex_array(), sprite)
+
+    def test_missing_and_corrupt_sprites(self):
+        """Missing sprites raise KeyError, tampered files raise ValueError."""
+        with self.assertRaises(KeyError):
+            self.store.get("0" * 64)
+
+        digest = self.store.put(self.sprites['mini'])
+        with open(self.store._path(digest), 'wb') as f:
+            f.write(zlib.compress(b'\x00\x01\x00\x01\x00\x00'))
+        with self.assertRaises(ValueError):
+            SpriteStore(self.store.root).get(digest)
+
+    def test_saves_reference_shared_sprites(self):
+        """Saves store digests and share sprite files across saves."""
+        manager = SaveManager(self.test_dir)
+        state = manager.create_new_game("first", "Ash", 0)
+        manager.save_game(state)
+        file_count = self.count_sprite_files(manager.sprite_store.root)
+
+        state.save_name = "second"
+        manager.save_game(state)
+        self.assertEqual(self.count_sprite_files(manager.sprite_store.root), file_count)
+
+        with open(os.path.join(self.test_dir, "second.json")) as f:
+            species = json.load(f)['species']['1']
+        self.assertIsNone(species['sprite_data'])
+        self.assertEqual(set(species[SPRITE_REFS_KEY]), {'front', 'back', 'mini'})
+
+        loaded = SaveManager(self.test_dir).load_game("second")
+        self.assertEqual(loaded.species_dict[1].sprite_data, state.species_dict[1].sprite_data)
+
+    def test_trade_package_references_sprites(self):
+        """Trade files embed sprites unless asked to reference the store."""
+        manager = SaveManager(self.test_dir)
+        state = manager.create_new_game("trader", "Misty", 1)
+        creature = state.player_team.creatures[0]
+        trades = TradeManager(os.path.join(self.test_dir, "trades"))
+        self.assertEqual(os.path.abspath(trades.sprite_store.root),
+                         os.path.abspath(manager.sprite_store.root))
+
+        path = trades.export_creature(creature, "trader", filename="by_ref", embed_sprites=False)
+        with open(path) as f:
+            self.assertIn(SPRITE_REFS_KEY, json.load(f)['species'])
+        imported, species = trades.import_creature(path, state.species_dict, "other")
+        self.assertEqual(species.sprite_data, creature.species.sprite_data)
+
+        path = trades.export_creature(creature, "trader", filename="portable")
+        with open(path) as f:
+            embedded = json.load(f)['species']['sprite_data']
+        self.assertEqual(decode_sprite_set(embedded), creature.species.sprite_data)
+
+    def test_trade_file_imports_into_other_directory(self):
+        """A default trade file imports where the sprite store is not shared."""
+        manager = SaveManager(os.path.join(self.test_dir, "host_a"))
+        state = manager.create_new_game("trader", "Misty", 1)
+        creature = state.player_team.creatures[0]
+        path = TradeManager(os.path.join(manager.save_dir, "trades")).export_creature(creature, "trader")
+
+        other_dir = os.path.join(self.test_dir, "host_b")
+        other = SaveManager(other_dir).create_new_game("receiver", "Brock", 2)
+        trades = TradeManager(os.path.join(other_dir, "trades"))
+        imported, species = trades.import_creature(path, other.species_dict, "receiver")
+        self.assertEqual(species.sprite_data, creature.species.sprite_data)
+        self.assertEqual(imported.level, creature.level)
+
+
+class TestSpriteSetEncoding(unittest.TestCase):
+    """Test the compact sprite set encoding."""
+
+    def setUp(self):
+        self.sprites = SpriteGenerator(seed=21).generate_creature_sprites(9, ["Toxin"], "serpent")
+        self.species = CreatureSpecies(
+            id=9, name="Testmon", types=["Toxin"],
+            base_stats=CreatureStats(hp=50, attack=50, defense=50, special=50, speed=50),
+            moves=[Move("Tackle", "Beast", 40, 100, 35, 35, "A tackle.")],
+            flavor_text="Test", sprite_data=self.sprites
+        )
+
+    def test_round_trip(self):
+        """Encoded sprite sets decode to the original hex arrays."""
+        encoded = encode_sprite_set(self.sprites)
+        self.assertTrue(encoded.startswith(SPRITE_SET_PREFIX))
+        self.assertEqual(decode_sprite_set(encoded), self.sprites)
+
+    def test_much_smaller_than_hex_arrays(self):
+        """The encoded form is a small fraction of the JSON hex arrays."""
+        encoded = encode_sprite_set(self.sprites)
+        self.assertLess(len(encoded) * 10, len(json.dumps(self.sprites)))
+
+    def test_species_serialization(self):
+        """CreatureSpecies.to_dict writes a string and from_dict decodes it."""
+        data = json.loads(json.dumps(self.species.to_dict()))
+        self.assertTrue(is_encoded_sprite_set(data['sprite_data']))
+        self.assertEqual(CreatureSpecies.from_dict(data).sprite_data, self.sprites)
+
+    def test_legacy_hex_arrays_still_load(self):
+        """Species saved with nested hex arrays load unchanged."""
+        data = json.loads(json.dumps(self.species.to_dict()))
+        data['sprite_data'] = self.sprites
+        self.assertEqual(CreatureSpecies.from_dict(data).sprite_data, self.sprites)
+
+    def test_corrupt_data_rejected(self):
+        """Damaged encodings raise ValueError."""
+        with self.assertRaises(ValueError):
+            decode_sprite_set(SPRITE_SET_PREFIX + "not-base64-zlib")
+
+
+class TestSpritePack(unittest.TestCase):
+    """Test memory-mapped sprite packs."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, "seed_8.gspk")
+        self.roster = [(1, ["Flame"], "biped"), (2, ["Aqua", "Frost"], "fish"), (5, ["Gale"], "bird")]
+        self.generator = SpriteGenerator(seed=8)
+        build_sprite_pack(self.path, self.generator, self.roster)
+        self.pack = SpritePack(self.path)
+
+    def tearDown(self):
+        self.pack.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_records_match_generator(self):
+        """Pack records decode to the generator's sprites."""
+        self.assertEqual(len(self.pack), 3)
+        self.assertEqual(self.pack.ids(), [1, 2, 5])
+        for creature_id, types, archetype in self.roster:
+            self.assertEqual(self.pack.get(creature_id),
+                             self.generator.generate_indexed_sprites(creature_id, types, archetype))
+
+    def test_zero_copy(self):
+        """Pixel buffers are slices of the mapping."""
+        self.assertIsInstance(self.pack.get(1)['front'].pixels, memoryview)
+
+    def test_generator_serves_from_pack(self):
+        """An attached pack replaces rasterization for matching records."""
+        generator = SpriteGenerator(seed=8)
+        generator.use_pack(self.pack)
+        generator._rasterize = None  # Any rasterization would fail
+        self.assertEqual(generator.generate_creature_sprites(2, ["Aqua", "Frost"], "fish", is_shiny=True),
+                         self.generator.generate_creature_sprites(2, ["Aqua", "Frost"], "fish", is_shiny=True))
+
+    def test_fingerprint_mismatch_falls_back(self):
+        """Records built for other inputs are ignored."""
+        generator = SpriteGenerator(seed=8)
+        generator.use_pack(self.pack)
+        self.assertNotEqual(self.pack.fingerprint(1), sprite_fingerprint(["Flame"], "serpent"))
+        self.assertEqual(generator.generate_indexed_sprites(1, ["Flame"], "serpent"),
+                         SpriteGenerator(seed=8).generate_indexed_sprites(1, ["Flame"], "serpent"))
+
+    def test_seed_mismatch_rejected(self):
+        """A pack cannot be attached to a generator with another seed."""
+        with self.assertRaises(ValueError):
+            SpriteGenerator(seed=9).use_pack(self.pack)
+
+    def test_invalid_file_rejected(self):
+        """Files that are not sprite packs raise ValueError."""
+        bad_path = os.path.join(self.test_dir, "bad.gspk")
+        with open(bad_path, 'wb') as f:
+            f.write(b"not a sprite pack at all")
+        with self.assertRaises(ValueError):
+            SpritePack(bad_path)
+
+
+class TestParallelExport(unittest.TestCase):
+    """Test the process pool PNG export."""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        sprite_gen = SpriteGenerator(seed=13)
+        self.species = {}
+        for species in CreatureGenerator(seed=13).generate_all_creatures()[:6]:
+            species.sprite_data = sprite_gen.generate_creature_sprites(species.id, species.types)
+            self.species[species.id] = species
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_matches_sequential_export(self):
+        """Parallel export writes the same files as the sequential export."""
+        sequential = os.path.join(self.test_dir, "sequential")
+        parallel = os.path.join(self.test_dir, "parallel")
+        SpriteGenerator.export_all_creatures_to_png(self.species, sequential, scale=2)
+        stats = SpriteGenerator.export_all_creatures_to_png_parallel(
+            self.species, parallel, scale=2, workers=2
+        )
+
+        names = sorted(os.listdir(sequential))
+        self.assertEqual(names, sorted(os.listdir(parallel)))
+        match, mismatch, errors = filecmp.cmpfiles(sequential, parallel, names, shallow=False)
+        self.assertEqual((mismatch, errors), ([], []))
+
+        self.assertEqual(stats['exported'], 6)
+        self.assertEqual(stats['files'], 18)
+        self.assertEqual(stats['bytes'], sum(
+            os.path.getsize(os.path.join(parallel, name)) for name in names
+        ))
+        self.assertGreater(stats['creatures_per_second'], 0)
+
+    def test_workers_index_sprites(self):
+        """The calling process hands hex sprites to the workers without indexing them."""
+        with mock.patch.object(IndexedSprite, 'from_hex_array',
+                               side_effect=IndexedSprite.from_hex_array) as index:
+            stats = SpriteGenerator.export_all_creatures_to_png_parallel(
+                self.species, self.test_dir, workers=2
+            )
+        self.assertEqual(index.call_count, 0)
+        self.assertEqual(stats['exported'], 6)
+
+    def test_skips_species_without_sprites(self):
+        """Species without sprite data are skipped, not counted as exported."""
+        first = min(self.species)
+        self.species[first].sprite_data = None
+        progress = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = SpriteGenerator.export_all_creatures_to_png_parallel(
+                self.species, self.test_dir, workers=1,
+                progress_callback=lambda current, total, name: progress.append(current)
+            )
+        self.assertEqual(stats['exported'], 5)
+        self.assertEqual(progress, [1, 2, 3, 4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()